@@ -0,0 +1,93 @@
+'''
+Created on Oct 17, 2026
+
+@package: tests
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Explains the blog posts listing queries against a database and prints the queries that read whole tables, used for
+checking the database indexes. The queries have the same filters and ordering as the blog post service listings.
+'''
+
+# Required in order to register the package extender whenever the script is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from livedesk.core.impl.query_plan import captureQueries, adviseQueries
+from livedesk.meta.blog import BlogMapped
+from livedesk.meta.blog_post import BlogPostMapped
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.sql.operators import desc_op
+import argparse
+import sys
+
+# --------------------------------------------------------------------
+
+LIMIT = 15
+# The page size used for the listings.
+
+# --------------------------------------------------------------------
+
+def listBlogPosts(session, blogId, sourceId=None):
+    '''
+    Runs the blog posts listings of the blog, the published and unpublished posts from the start and since a change id,
+    and the unpublished posts of the source if provided.
+    '''
+    def ordered(sql): return sql.order_by(desc_op(BlogPostMapped.Order), desc_op(BlogPostMapped.Id)).distinct()
+
+    sql = session.query(BlogPostMapped).filter(BlogPostMapped.Blog == blogId)
+    published = sql.filter(BlogPostMapped.WasPublished == True)
+    current = published.filter((BlogPostMapped.PublishedOn != None) & (BlogPostMapped.DeletedOn == None))
+    ordered(current).limit(LIMIT).all()
+    ordered(published.filter(BlogPostMapped.CId != None).filter(BlogPostMapped.CId > 0)).all()
+    ordered(sql.filter((BlogPostMapped.PublishedOn == None) & (BlogPostMapped.DeletedOn == None))).limit(LIMIT).all()
+    ordered(sql.filter(BlogPostMapped.CId != None).filter(BlogPostMapped.CId > 0)).all()
+
+    if sourceId is None: return
+    sql = session.query(BlogPostMapped).filter(BlogPostMapped.Feed == sourceId)
+    sql = sql.filter((BlogPostMapped.PublishedOn == None) & (BlogPostMapped.DeletedOn == None))
+    sql.order_by(desc_op(BlogPostMapped.Order)).limit(LIMIT).distinct().all()
+
+def advise(database, blogId=None, sourceId=None):
+    '''
+    Prints the blog posts listing queries that read whole tables.
+
+    @return: boolean
+        True if there are queries that read whole tables.
+    '''
+    engine = create_engine(database)
+    session = sessionmaker(bind=engine)()
+    try:
+        if blogId is None: blogId = session.query(BlogMapped.Id).order_by(BlogMapped.Id).limit(1).scalar()
+        if blogId is None:
+            print('No blog to explain the queries on', file=sys.stderr)
+            return False
+        captured = captureQueries(engine, lambda: listBlogPosts(session, blogId, sourceId), 'livedesk_post')
+    finally: session.close()
+
+    found, connection = False, engine.connect()
+    try:
+        for statement, scanned, plan in adviseQueries(connection, captured):
+            found = True
+            print('=' * 50, 'Full scan of %s for query:' % ', '.join(scanned))
+            print(statement)
+            print('-' * 50, 'With plan:')
+            for row in plan: print(row)
+    finally: connection.close()
+    if not found: print('No full scans for the blog %s posts listings' % blogId)
+    return found
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Explains the blog posts listing queries and prints the full scans.')
+    parser.add_argument('database', help='The database URL, as used by the application configuration')
+    parser.add_argument('--blog', type=int, help='The blog id to run the listings on, by default the first blog')
+    parser.add_argument('--source', type=int, help='The source id to also run the source listing on')
+    options = parser.parse_args()
+    sys.exit(1 if advise(options.database, options.blog, options.source) else 0)
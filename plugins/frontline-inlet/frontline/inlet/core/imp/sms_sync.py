@@ -11,12 +11,9 @@ API implementation of sms sync.
 
 
 import logging
-import time
-import datetime
-from sched import scheduler
-from threading import Thread
 from superdesk.source.api.source import ISourceService, Source
 from livedesk.api.blog_post import IBlogPostService
+from livedesk.core.spec import IBlogPostIngestService, IngestPost
 from sqlalchemy.sql.functions import current_timestamp
 from superdesk.collaborator.api.collaborator import ICollaboratorService,\
     Collaborator
@@ -28,6 +25,12 @@ from superdesk.post.api.post import Post, IPostService, QPost
 from superdesk.collaborator.meta.collaborator import CollaboratorMapped
 from sqlalchemy.orm.exc import NoResultFound
 from livedesk.api.blog_sync import IBlogSyncService, BlogSync
+from livedesk.meta.blog_sync import BlogSyncMapped
+from superdesk.source.core.spec import ISyncProcess, ISyncScheduler, ISyncJob, SYNC_CHANGED, \
+    SYNC_UNCHANGED, SYNC_FAILED, SYNC_SKIPPED
+from superdesk.source.core.impl.sync_engine import SyncEngine
+from ally.exception import InputError
+from functools import partial
 
 
 # --------------------------------------------------------------------
@@ -38,11 +41,14 @@ log = logging.getLogger(__name__)
 
 @injected
 @setup(name='smsSynchronizer')
-class SmsSyncProcess:
+class SmsSyncProcess(ISyncProcess):
     '''
     Sms sync process.
     '''
 
+    syncScheduler = ISyncScheduler; wire.entity('syncScheduler')
+    # the scheduler that runs the sms sync
+
     blogSyncService = IBlogSyncService; wire.entity('blogSyncService')
     # blog sync service used to retrieve blogs set on auto publishing
 
@@ -55,19 +61,17 @@ class SmsSyncProcess:
     blogPostService = IBlogPostService; wire.entity('blogPostService') 
     # blog post service used to insert blog posts
 
+    blogPostIngestService = IBlogPostIngestService; wire.entity('blogPostIngestService')
+    # blog post ingest service used to store the sms posts in one transaction
+
     collaboratorService = ICollaboratorService; wire.entity('collaboratorService')
     # blog post service used to retrieve collaborator
 
     userService = IUserService; wire.entity('userService')
 
-    syncThreads = {}
-    # dictionary of threads that perform synchronization
-
     sync_interval = 63; wire.config('sync_interval', doc='''
-    The number of seconds to perform sync for sms.''')
-    
-    timeout_inteval = 4#; wire.config('timeout_interval', doc='''
-    #The number of seconds after the sync ownership can be taken.''')
+    The number of seconds to perform sync for sms, the sources that have new sms are synced more often and the idle
+    ones less often.''')
     
     user_type_key = 'sms'; wire.config('user_type_key', doc='''
     The user type that is used for the anonymous users of sms posts''')
@@ -75,58 +79,86 @@ class SmsSyncProcess:
     sms_provider_type = 'smsfeed'; wire.config('sms_provider_type', doc='''
     Key of the source type for SMS providers''') 
 
+    sync_fetchers = 2; wire.config('sync_fetchers', doc='''
+    The maximum number of sms sources that are read at the same time.''')
+
+    sync_writers = 2; wire.config('sync_writers', doc='''
+    The maximum number of sms sources for which the read sms are stored at the same time.''')
+
+    sync_write_queue = 4; wire.config('sync_write_queue', doc='''
+    The maximum number of read sms batches that are not stored yet, when the queue is full the reading waits for the
+    storing.''')
+
+    def __init__(self):
+        '''
+        Construct the sms sync process.
+        '''
+        assert isinstance(self.sync_fetchers, int), 'Invalid sync fetchers %s' % self.sync_fetchers
+        assert isinstance(self.sync_writers, int), 'Invalid sync writers %s' % self.sync_writers
+        assert isinstance(self.sync_write_queue, int), 'Invalid sync write queue %s' % self.sync_write_queue
+
+        self._engine = SyncEngine(self.sync_fetchers, self.sync_fetchers, self.sync_writers,
+                                  max(self.sync_write_queue, self.sync_writers))
+
     @app.deploy
-    def startSmsSyncThread(self):
+    def startSmsSync(self):
         '''
-        Starts the SMS sync thread.
+        Registers the SMS synchronization.
         '''
-        schedule = scheduler(time.time, time.sleep)
-        def syncSmss():
-            self.syncSmss()
-            schedule.enter(self.sync_interval, 1, syncSmss, ())
-        schedule.enter(self.sync_interval, 1, syncSmss, ())
-        scheduleRunner = Thread(name='sms sync', target=schedule.run)
-        scheduleRunner.daemon = True
-        scheduleRunner.start()
-        log.info('Started the sms automatic synchronization.')
-
-    def syncSmss(self):
+        self.syncScheduler.register('sms', self, self.sync_interval)
+
+    def syncSources(self):
         '''
-        Read all sms blog sync entries.
+        @see: ISyncProcess.syncSources
         '''
-        log.info('Start sms blog synchronization')
-        
-        for blogSync in self.blogSyncService.getBySourceType(self.sms_provider_type):
-            assert isinstance(blogSync, BlogSync)
-            key = (blogSync.Blog, blogSync.Source)
-            thread = self.syncThreads.get(key)
-            if thread:
-                assert isinstance(thread, Thread), 'Invalid thread %s' % thread
-                if thread.is_alive(): continue
-
-            if not self.blogSyncService.checkTimeout(blogSync.Id, self.timeout_inteval * self.sync_interval): continue         
-
-            self.syncThreads[key] = Thread(name='sms %d sync' % blogSync.Blog,
-                                           target=self._syncSms, args=(blogSync,))
-            self.syncThreads[key].daemon = True
-            self.syncThreads[key].start()
-            log.info('Sms thread started for blog id %d and source id %d', blogSync.Blog, blogSync.Source)
-        log.info('End sms blog synchronization')    
-
-    def _syncSms(self, blogSync):
+        return {(blogSync.Blog, blogSync.Source): blogSync
+                for blogSync in self.blogSyncService.getBySourceType(self.sms_provider_type)}
+
+    def syncMetrics(self):
         '''
-        Synchronize the sms for the given sync entry.
+        @see: ISyncProcess.syncMetrics
+        '''
+        return self._engine.metrics()
 
-        @param smsSync: SmsSync
-            The sms sync entry declaring the blog and source from which the blog
-            has to be updated.
+    def syncSource(self, key, blogSync, job):
+        '''
+        @see: ISyncProcess.syncSource
         '''
         assert isinstance(blogSync, BlogSync), 'Invalid blog sync %s' % blogSync
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        if self._engine.isActive(key):
+            log.info('Sms sync for blog %d is running', blogSync.Blog)
+            return job.report(SYNC_SKIPPED)
+
+        log.info('Sms sync started for blog id %d and source id %d', blogSync.Blog, blogSync.Source)
         source = self.sourceService.getById(blogSync.Source)
         assert isinstance(source, Source)
+        # the sms are read by the fetching threads and stored by the writing threads, the write reports the outcome, or
+        # the engine if the read or the write raises
+        self._engine.submit(key, None, partial(self._readSms, blogSync, source),
+                            partial(self._syncSms, blogSync, source, job), partial(job.report, SYNC_FAILED))
+
+    def _readSms(self, blogSync, source):
+        '''
+        Reads the new sms of the source and prepares the sms posts, nothing is stored.
+
+        @param blogSync: BlogSync
+            The blog sync entry declaring the blog and source from which the blog
+            has to be updated.
+        @param source: Source
+            The source of the blog sync entry.
+        @return: tuple(list[Post], integer)|None
+            The sms posts, without the author collaborator, followed by the biggest sms id. None if the sms cannot be
+            read.
+        '''
+        assert isinstance(blogSync, BlogSync), 'Invalid blog sync %s' % blogSync
+        assert isinstance(source, Source), 'Invalid source %s' % source
+
+        try: providerId = self.sourceService.getOriginalSource(source.Id)
+        except InputError as e:
+            log.error('Cannot read the provider of source %s: %s' % (source.URI, e))
+            return
 
-        providerId = self.sourceService.getOriginalSource(source.Id)
-        
         log.info("sync sms for sourceId=%i, providerId=%i, blogId=%i, lastId=%i" %(blogSync.Source, providerId, blogSync.Blog, blogSync.CId))
 
         q=QPost()
@@ -134,6 +166,7 @@ class SmsSyncProcess:
         
         posts = self.postService.getAllBySource(providerId, q=q)
 
+        smsPosts, lastId = [], blogSync.CId
         for post in posts:
             try:
                 
@@ -149,32 +182,64 @@ class SmsSyncProcess:
                 smsPost.Content = post.Content
                 smsPost.CreatedOn = current_timestamp()   
                 
-                # make the collaborator
+                # prepare the sms sync model to update the change identifier
+                lastId = post.Id if post.Id > lastId else lastId
+                smsPosts.append(smsPost)
+                                
+            except Exception as e:
+                log.error('Error in source %s post: %s' % (source.URI, e))
+
+        return smsPosts, lastId
+
+    def _syncSms(self, blogSync, source, job, read):
+        '''
+        Stores the read sms for the given sync entry, in one batch, and reports the outcome of the sync.
+
+        @param blogSync: BlogSync
+            The blog sync entry declaring the blog and source from which the blog
+            has to be updated.
+        @param source: Source
+            The source of the blog sync entry.
+        @param job: ISyncJob
+            The job of the sync, the sms are stored only if it still holds the lease.
+        @param read: tuple(list[Post], integer)|None
+            The sms posts and the biggest sms id, as provided by @see: _readSms.
+        '''
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        if read is None: return job.report(SYNC_FAILED)
+        if not job.isLeased():
+            log.warning('Sms sync for blog %d lost its lease, the read sms are dropped', blogSync.Blog)
+            return job.report(SYNC_SKIPPED)
+
+        smsPosts, lastId = read
+        collaborators, ingests = {}, []
+        for smsPost in smsPosts:
+            # make the collaborator, resolved once for each creator of the batch
+            collaboratorId = collaborators.get(smsPost.Creator)
+            if collaboratorId is None:
                 sql = self.collaboratorService.session().query(CollaboratorMapped.Id)
                 sql = sql.filter(CollaboratorMapped.Source == blogSync.Source)
-                sql = sql.filter(CollaboratorMapped.User == post.Creator)
+                sql = sql.filter(CollaboratorMapped.User == smsPost.Creator)
                 try:
                     collaboratorId, = sql.one()
                 except NoResultFound:
                     collaborator = Collaborator()
                     collaborator.Source = blogSync.Source
-                    collaborator.User = post.Creator
-                    collaboratorId = self.collaboratorService.insert(collaborator)   
-                    
-                smsPost.Author = collaboratorId            
-                
-                # prepare the sms sync model to update the change identifier
-                blogSync.CId = post.Id if post.Id > blogSync.CId else blogSync.CId
-
-                # insert post from remote source
-                self.blogPostService.insert(blogSync.Blog, smsPost)
-                
-                # update blog sync entry
-                blogSync.LastActivity = datetime.datetime.now().replace(microsecond=0) 
-                self.blogSyncService.update(blogSync)
-                                
-            except Exception as e:
-                log.error('Error in source %s post: %s' % (source.URI, e))
-
-        blogSync.LastActivity = None 
-        self.blogSyncService.update(blogSync)       
\ No newline at end of file
+                    collaborator.User = smsPost.Creator
+                    collaboratorId = self.collaboratorService.insert(collaborator)
+                collaborators[smsPost.Creator] = collaboratorId
+
+            smsPost.Author = collaboratorId
+            ingests.append(IngestPost(smsPost))
+
+        # insert the posts from remote source
+        count = self.blogPostIngestService.ingest(blogSync.Blog, source.Id, ingests)
+        for ingest in ingests:
+            if ingest.error is not None: log.error('Error in source %s post: %s' % (source.URI, ingest.error))
+
+        # update blog sync entry, only if the lease is still held
+        blogSync.CId = lastId
+        if not job.store(BlogSyncMapped, BlogSyncMapped.Id == blogSync.Id, {BlogSyncMapped.CId: lastId}):
+            log.warning('Sms sync for blog %d lost its lease, the last sms id is not stored', blogSync.Blog)
+            return job.report(SYNC_SKIPPED)
+        job.report(SYNC_CHANGED if count else SYNC_UNCHANGED)
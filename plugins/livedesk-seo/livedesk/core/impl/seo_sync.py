@@ -11,9 +11,6 @@ API implementation of liveblog seo.
 
 import datetime
 import logging
-from sched import scheduler
-from threading import Thread
-import time
 from urllib.error import HTTPError
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 from urllib.request import urlopen, Request
@@ -22,12 +19,17 @@ from ally.container import wire, app
 from ally.container.ioc import injected
 from ally.container.support import setup
 from livedesk.api.blog_seo import BlogSeo, IBlogSeoService, QBlogSeo
+from livedesk.meta.blog_seo import BlogSeoMapped
 from livedesk.api.blog_theme import IBlogThemeService
 from ally.cdm.spec import ICDM
 from livedesk.api.blog import IBlogService
 from superdesk.language.api.language import ILanguageService
-from random import randint
 from os.path import dirname
+from io import BytesIO
+from functools import partial
+from superdesk.source.core.impl.sync_engine import SyncEngine
+from superdesk.source.core.spec import ISyncProcess, ISyncScheduler, ISyncJob, SYNC_CHANGED, \
+    SYNC_FAILED, SYNC_SKIPPED
 
 
 # --------------------------------------------------------------------
@@ -37,11 +39,14 @@ log = logging.getLogger(__name__)
 
 @injected
 @setup(name='seoSynchronizer')
-class SeoSyncProcess:
+class SeoSyncProcess(ISyncProcess):
     '''
     Seo sync process.
     '''
 
+    syncScheduler = ISyncScheduler; wire.entity('syncScheduler')
+    # the scheduler that runs the seo sync
+
     blogSeoService = IBlogSeoService; wire.entity('blogSeoService')
     # blog seo service used to retrieve blogs set on auto publishing
 
@@ -57,14 +62,8 @@ class SeoSyncProcess:
     htmlCDM = ICDM; wire.entity('htmlCDM')
     # cdm service used to store the generated HTML files
     
-    syncThreads = {}
-    # dictionary of threads that perform synchronization
-
     sync_interval = 59; wire.config('sync_interval', doc='''
-    The number of seconds to perform sync for seo blogs.''')
-    
-    timeout_inteval = 4#; wire.config('timeout_interval', doc='''
-    #The number of seconds after the sync ownership can be taken.''')
+    The number of seconds to look for new seo blogs, each blog is synced at its own refresh interval.''')
     
     html_generation_server = 'http://nodejs-dev.sourcefabric.org/'; wire.config('html_generation_server', doc='''
     The partial path used to construct the URL for blog html generation''')
@@ -78,71 +77,79 @@ class SeoSyncProcess:
     format_file_name = '%(blog_id)s.html'
     #default file format
 
-    @app.deploy
-    def startSeoSyncThread(self):
+    sync_fetchers = 4; wire.config('sync_fetchers', doc='''
+    The maximum number of blogs HTML that are generated at the same time.''')
+
+    sync_writers = 2; wire.config('sync_writers', doc='''
+    The maximum number of generated blogs HTML that are published at the same time.''')
+
+    sync_write_queue = 4; wire.config('sync_write_queue', doc='''
+    The maximum number of generated blogs HTML that are not published yet, when the queue is full the generation waits
+    for the publishing.''')
+
+    def __init__(self):
         '''
-        Starts the seo sync thread.
+        Construct the seo sync process.
         '''
-        schedule = scheduler(time.time, time.sleep)
-        def syncSeoBlogs():
-            self.syncSeoBlogs()
-            schedule.enter(self.sync_interval, 1, syncSeoBlogs, ())
-        schedule.enter(self.sync_interval, 1, syncSeoBlogs, ())
-        scheduleRunner = Thread(name='blog html for seo', target=schedule.run)
-        scheduleRunner.daemon = True
-        scheduleRunner.start()
-        log.info('Started the seo html synchronization.')
+        assert isinstance(self.sync_fetchers, int), 'Invalid sync fetchers %s' % self.sync_fetchers
+        assert isinstance(self.sync_writers, int), 'Invalid sync writers %s' % self.sync_writers
+        assert isinstance(self.sync_write_queue, int), 'Invalid sync write queue %s' % self.sync_write_queue
 
-    def syncSeoBlogs(self):
+        self._engine = SyncEngine(self.sync_fetchers, self.sync_fetchers, self.sync_writers,
+                                  max(self.sync_write_queue, self.sync_writers))
+
+    @app.deploy
+    def startSeoSync(self):
         '''
-        Read all chained blog sync entries and sync with the corresponding blogs.
+        Registers the seo synchronization.
         '''
-        log.info('Start seo blog synchronization')
-        
-        sleep_time = randint(0, 1000) * 0.001
-        time.sleep(sleep_time)
-        
-        crtTime = datetime.datetime.now().replace(microsecond=0) 
-        
-        q = QBlogSeo(refreshActive=True)
-        q.nextSync.until = crtTime
-        
-        for blogSeo in self.blogSeoService.getAll(q=q): 
-            assert isinstance(blogSeo, BlogSeo)
-            
-            nextSync = crtTime + datetime.timedelta(seconds=blogSeo.RefreshInterval)
-            self.blogSeoService.updateNextSync(blogSeo.Id, nextSync) 
-            
-            existsChanges = self.blogSeoService.existsChanges(blogSeo.Blog, blogSeo.LastCId)
-            
-            if blogSeo.LastSync is not None and not existsChanges: 
-                log.info('Skip blog seo %d for blog %d', blogSeo.Id, blogSeo.Blog)
-                continue
-            
-            key = blogSeo.Id
-            thread = self.syncThreads.get(key)
-            if thread:
-                assert isinstance(thread, Thread), 'Invalid thread %s' % thread
-                if thread.is_alive(): continue
+        self.syncScheduler.register('blog html for seo', self, self.sync_interval)
 
-            if not self.blogSeoService.checkTimeout(blogSeo.Id, self.timeout_inteval * self.sync_interval): continue
+    def syncSources(self):
+        '''
+        @see: ISyncProcess.syncSources
+        '''
+        return {blogSeo.Id: blogSeo for blogSeo in self.blogSeoService.getAll(q=QBlogSeo(refreshActive=True))}
 
-            self.syncThreads[key] = Thread(name='blog seo %d for blog %d' % (blogSeo.Id, blogSeo.Blog),
-                                           target=self._syncSeoBlog, args=(blogSeo,))
-            self.syncThreads[key].daemon = True
-            self.syncThreads[key].start()
-            log.info('Seo thread started for blog seo %d, blog %d and theme %d', blogSeo.Id, blogSeo.Blog, blogSeo.BlogTheme)   
-        log.info('End seo blog synchronization')
+    def syncInterval(self, blogSeo):
+        '''
+        @see: ISyncProcess.syncInterval
+        '''
+        assert isinstance(blogSeo, BlogSeo), 'Invalid blog seo %s' % blogSeo
+        return blogSeo.RefreshInterval
 
-    def _syncSeoBlog(self, blogSeo):
+    def syncMetrics(self):
         '''
-        Synchronize the blog for the given sync entry.
+        @see: ISyncProcess.syncMetrics
+        '''
+        return self._engine.metrics()
 
-        @param blogSync: BlogSync
-            The blog sync entry declaring the blog and source from which the blog
-            has to be updated.
+    def syncSource(self, key, blogSeo, job):
         '''
-        assert isinstance(blogSeo, BlogSeo), 'Invalid blog seo %s' % blogSeo
+        @see: ISyncProcess.syncSource
+        '''
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        if self._engine.isActive(key):
+            log.info('Seo sync for blog seo %d is running', key)
+            return job.report(SYNC_SKIPPED)
+        crtTime = datetime.datetime.now().replace(microsecond=0) 
+        
+        # the blog seo is read again since the next sync is shared with the other processes
+        blogSeo = self.blogSeoService.getById(key)
+        assert isinstance(blogSeo, BlogSeo)
+        if blogSeo.NextSync is not None and blogSeo.NextSync > crtTime: return job.report(SYNC_SKIPPED)
+            
+        nextSync = crtTime + datetime.timedelta(seconds=blogSeo.RefreshInterval)
+        self.blogSeoService.updateNextSync(blogSeo.Id, nextSync) 
+        
+        existsChanges = self.blogSeoService.existsChanges(blogSeo.Blog, blogSeo.LastCId)
+        
+        # the generation is cheap to skip, so a blog without changes keeps its refresh interval
+        if blogSeo.LastSync is not None and not existsChanges: 
+            log.info('Skip blog seo %d for blog %d', blogSeo.Id, blogSeo.Blog)
+            return job.report(SYNC_SKIPPED)
+
+        log.info('Seo sync started for blog seo %d, blog %d and theme %d', blogSeo.Id, blogSeo.Blog, blogSeo.BlogTheme)
         
         (scheme, netloc, path, params, query, fragment) = urlparse(self.host_url)
         if not scheme: scheme = 'http'
@@ -167,76 +174,145 @@ class SeoSyncProcess:
             q.append(('liveblog[limit]', blogSeo.MaxPosts))
 
         url = urlunparse((scheme, netloc, path, params, urlencode(q), fragment))
+        # the HTML is generated by the fetching threads and published by the writing threads, the write reports the
+        # outcome, or the engine if a generation or a write raises
+        self._engine.submit(key, netloc, partial(self._generateHtml, url),
+                            partial(self._syncSeoBlog, blogSeo, job, lastCId, blog, theme, host_url),
+                            partial(job.report, SYNC_FAILED))
+
+    def _generateHtml(self, url):
+        '''
+        Reads the HTML generated for the blog, it does not use the database.
+
+        @param url: string
+            The URL of the HTML generation.
+        @return: tuple(bytes|None, string|None)
+            The HTML, or None if it cannot be generated, followed by the status of the failed generation.
+        '''
         req = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType,
                                     'User-Agent' : 'LiveBlog REST'})
         
-        try: resp = urlopen(req)
+        try:
+            resp = urlopen(req)
+            try: return resp.read(), None
+            finally: resp.close()
         except HTTPError as e:
-            blogSeo.CallbackStatus = e.read().decode(encoding='UTF-8')
-            blogSeo.LastBlocked = None 
-            blogSeo.LastCId = lastCId
-            self.blogSeoService.update(blogSeo)
-            log.error('Read problem on %s, error code with message: %s ' % (str(url), blogSeo.CallbackStatus))
-            return
+            status = e.read().decode(encoding='UTF-8')
+            log.error('Read problem on %s, error code with message: %s ' % (str(url), status))
         except Exception as e:  
-            blogSeo.CallbackStatus = 'Can\'t access the HTML generation server: ' + self.html_generation_server
+            status = 'Can\'t access the HTML generation server: ' + self.html_generation_server
+            log.error('Read problem on accessing %s' % (self.html_generation_server, ))
+        return None, status
+
+    def _syncSeoBlog(self, blogSeo, job, lastCId, blog, theme, host_url, generated):
+        '''
+        Publishes the generated HTML for the given sync entry, the callback is then called by the fetching threads.
+
+        @param blogSeo: BlogSeo
+            The blog seo entry for which the HTML has been generated.
+        @param job: ISyncJob
+            The job of the sync, the HTML is published only if it still holds the lease.
+        @param lastCId: integer
+            The last change id of the previous sync, kept if the HTML is not published.
+        @param generated: tuple(bytes|None, string|None)
+            The generated HTML and the status, as provided by @see: _generateHtml.
+        @return: tuple(callable, callable)|None
+            The callback call and the write of its status, None if there is no callback.
+        '''
+        assert isinstance(blogSeo, BlogSeo), 'Invalid blog seo %s' % blogSeo
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        
+        html, status = generated
+        if html is None:
+            blogSeo.CallbackStatus = status
             blogSeo.LastBlocked = None 
             blogSeo.LastCId = lastCId
-            self.blogSeoService.update(blogSeo)
-            log.error('Read problem on accessing %s' % (self.html_generation_server, ))
-            return
+            self._storeStatus(job, blogSeo)
+            return job.report(SYNC_FAILED)
  
+        if not job.isLeased():
+            log.warning('Seo sync for blog seo %d lost its lease, the HTML is not published', blogSeo.Id)
+            return job.report(SYNC_SKIPPED)
+
         try: 
             baseContent = self.htmlCDM.getURI('')
             path = blogSeo.HtmlURL[len(baseContent):]
-            self.htmlCDM.publishContent(path, resp)
+            self.htmlCDM.publishContent(path, BytesIO(html))
             
             default_name = self.format_file_name % {'blog_id': blogSeo.Blog}
             if not path.endswith('/' + default_name) and self.blogSeoService.isFirstSEO(blogSeo.Id, blogSeo.Blog):                   
-                url = host_url + blogSeo.HtmlURL          
-                req = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType,
-                                    'User-Agent' : 'LiveBlog REST'})
-                resp = urlopen(req)
+                # the default file has the same content as the published one
                 path = dirname(path) + '/' + default_name
-                self.htmlCDM.publishContent(path, resp) 
+                self.htmlCDM.publishContent(path, BytesIO(html)) 
         except ValueError as e:
             log.error('Fail to publish the HTML file on CDM %s' % e)
             blogSeo.CallbackStatus = 'Fail to publish the HTML file on CDM'
             blogSeo.LastBlocked = None 
             blogSeo.LastCId = lastCId
-            self.blogSeoService.update(blogSeo)
-            return
+            self._storeStatus(job, blogSeo)
+            return job.report(SYNC_FAILED)
         
         blogSeo.CallbackStatus = None  
 
         if blogSeo.CallbackActive and blogSeo.CallbackURL:
-            (scheme, netloc, path, params, query, fragment) = urlparse(blogSeo.CallbackURL)
-            
-            if not scheme: scheme = 'http'
-            if not netloc: 
-                netloc = path
-                path = ''
-    
-            q = parse_qsl(query, keep_blank_values=True)
-            q.append(('blogId', blogSeo.Blog))
-            q.append(('blogTitle', blog.Title))
-            q.append(('theme', theme.Name))
-            q.append(('htmlFile', host_url + blogSeo.HtmlURL))
-                
-            url = urlunparse((scheme, netloc, path, params, urlencode(q), fragment))
-            req = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType,
-                                        'User-Agent' : 'Magic Browser'})
+            return (partial(self._callCallback, blogSeo, blog, theme, host_url),
+                    partial(self._syncSeoStatus, blogSeo, job))
+        self._syncSeoStatus(blogSeo, job, None)
+
+    def _callCallback(self, blogSeo, blog, theme, host_url):
+        '''
+        Calls the callback of the published HTML, it does not use the database.
+
+        @return: string|None
+            The status of the failed callback, None if the callback succeeded.
+        '''
+        (scheme, netloc, path, params, query, fragment) = urlparse(blogSeo.CallbackURL)
+        
+        if not scheme: scheme = 'http'
+        if not netloc: 
+            netloc = path
+            path = ''
+
+        q = parse_qsl(query, keep_blank_values=True)
+        q.append(('blogId', blogSeo.Blog))
+        q.append(('blogTitle', blog.Title))
+        q.append(('theme', theme.Name))
+        q.append(('htmlFile', host_url + blogSeo.HtmlURL))
             
-            try: resp = urlopen(req)
-            except HTTPError as e:
-                log.error('Error opening URL %s; error status: %s' % (blogSeo.CallbackURL, resp.status))
-                blogSeo.CallbackStatus = 'Error opening callback URL: ' + blogSeo.CallbackURL + '; error status: ' + resp.status
-            except Exception as e:
-                log.error('Error opening URL %s: %s' % (blogSeo.CallbackURL, e))
-                blogSeo.CallbackStatus = 'Error opening callback URL:' + blogSeo.CallbackURL 
-            else: 
-                blogSeo.CallbackStatus = None    
+        url = urlunparse((scheme, netloc, path, params, urlencode(q), fragment))
+        req = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType,
+                                    'User-Agent' : 'Magic Browser'})
         
+        try: urlopen(req).close()
+        except HTTPError as e:
+            log.error('Error opening URL %s; error status: %s' % (blogSeo.CallbackURL, e.code))
+            return 'Error opening callback URL: ' + blogSeo.CallbackURL + '; error status: ' + str(e.code)
+        except Exception as e:
+            log.error('Error opening URL %s: %s' % (blogSeo.CallbackURL, e))
+            return 'Error opening callback URL:' + blogSeo.CallbackURL 
+
+    def _syncSeoStatus(self, blogSeo, job, status):
+        '''
+        Stores the status of the published blog seo and reports the outcome of the sync.
+        '''
+        blogSeo.CallbackStatus = status
         blogSeo.LastSync = datetime.datetime.now().replace(microsecond=0) 
         blogSeo.LastBlocked = None 
-        self.blogSeoService.update(blogSeo)
+        job.report(SYNC_CHANGED if self._storeStatus(job, blogSeo) else SYNC_SKIPPED)
+
+    def _storeStatus(self, job, blogSeo):
+        '''
+        Stores the last change id and the status of the sync entry, only if the job still holds the lease.
+
+        @return: boolean
+            True if the sync entry has been updated.
+        '''
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        assert isinstance(blogSeo, BlogSeo), 'Invalid blog seo %s' % blogSeo
+
+        stored = job.store(BlogSeoMapped, BlogSeoMapped.Id == blogSeo.Id,
+                           {BlogSeoMapped.LastCId: blogSeo.LastCId, BlogSeoMapped.LastSync: blogSeo.LastSync,
+                            BlogSeoMapped.CallbackStatus: blogSeo.CallbackStatus,
+                            BlogSeoMapped.LastBlocked: blogSeo.LastBlocked})
+        if not stored: log.warning('Seo sync for blog seo %d lost its lease, the status is not stored', blogSeo.Id)
+        return stored
@@ -16,6 +16,7 @@ from ally.api.extension import IterPart
 from ally.container.support import setup
 from ally.support.sqlalchemy.util_service import buildQuery, buildLimits
 from livedesk.api.blog_seo import IBlogSeoService, QBlogSeo, BlogSeo
+from livedesk.core.spec import ILastCIdTracker
 from livedesk.meta.blog_post import BlogPostMapped
 from livedesk.meta.blog_seo import BlogSeoMapped
 from sql_alchemy.impl.entity import EntityServiceAlchemy
@@ -40,6 +41,8 @@ class BlogSeoServiceAlchemy(EntityServiceAlchemy, IBlogSeoService):
     
     htmlCDM = ICDM; wire.entity('htmlCDM')
     # cdm service used to store the generated HTML files
+    lastCIdTracker = ILastCIdTracker; wire.entity('lastCIdTracker')
+    # the tracker used for checking the blog changes
 
     def __init__(self):
         '''
@@ -128,11 +131,8 @@ class BlogSeoServiceAlchemy(EntityServiceAlchemy, IBlogSeoService):
         @see IBlogSeoService.checkChanges
         '''  
         
-        sql = self.session().query(BlogPostMapped)
-        sql = sql.filter(BlogPostMapped.Blog == blogSeoId)
-        sql = sql.filter(BlogPostMapped.CId > lastCId)
-        
-        return sql.first() != None       
+        last = self.lastCIdTracker.lastCId(self.session(), blogSeoId)
+        return last is not None and last > lastCId
     
     def isFirstSEO(self, blogSeoId, blogSeoBlog):
         '''
@@ -9,10 +9,18 @@ Created on April 26, 2013
 Contains the services for livedesk sync.
 '''
 
-from ally.container import support
+from ..superdesk.db_superdesk import alchemySessionCreator
+from ally.container import support, ioc, wire
+from livedesk.core.impl.chained_icon import ChainedIcons
 from livedesk.core.impl.chained_sync import ChainedSyncProcess
 
 # --------------------------------------------------------------------
 
-support.createEntitySetup(ChainedSyncProcess)
+@wire.wire(ChainedIcons)
+@ioc.entity
+def chainedIcons() -> ChainedIcons:
+    b = ChainedIcons()
+    b.sessionCreator = alchemySessionCreator()
+    return b
 
+support.createEntitySetup(ChainedSyncProcess)
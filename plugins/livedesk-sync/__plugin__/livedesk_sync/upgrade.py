@@ -29,3 +29,18 @@ def upgradeBlogSyncCid():
     session.commit()
     session.close()
 
+
+@app.populate(priority=PRIORITY_LAST)
+def upgradeBlogSyncPosts():
+    creator = alchemySessionCreator()
+    session = creator()
+    assert isinstance(session, Session)
+
+    try:
+        session.execute("ALTER TABLE livedesk_blog_sync ADD COLUMN posts_uri VARCHAR(1024)")
+        session.execute("ALTER TABLE livedesk_blog_sync ADD COLUMN posts_etag VARCHAR(255)")
+        session.execute("ALTER TABLE livedesk_blog_sync ADD COLUMN posts_modified VARCHAR(100)")
+    except (ProgrammingError, OperationalError): pass
+
+    session.commit()
+    session.close()
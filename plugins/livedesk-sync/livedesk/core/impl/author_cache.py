@@ -0,0 +1,103 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk-sync
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the cache for the authors and creators of the chained blog posts.
+'''
+
+from collections import OrderedDict
+from threading import Lock
+import time
+
+# --------------------------------------------------------------------
+
+class AuthorCache:
+    '''
+    Keeps the resolved authors and creators of the chained posts for a limited time. The entries carry the change id
+    (Cid) of the remote user, an entry is used only if the remote user has not changed since, otherwise it is resolved
+    again. When the cache is full the least recently used entries are dropped.
+    '''
+
+    def __init__(self, timeToLive, maxEntries):
+        '''
+        Construct the author cache.
+
+        @param timeToLive: integer|float
+            The number of seconds an entry is kept.
+        @param maxEntries: integer
+            The maximum number of entries kept, 0 disables the cache.
+        '''
+        assert isinstance(timeToLive, (int, float)), 'Invalid time to live %s' % timeToLive
+        assert isinstance(maxEntries, int) and maxEntries >= 0, 'Invalid maximum entries %s' % maxEntries
+
+        self.timeToLive = timeToLive
+        self.maxEntries = maxEntries
+        self._lock = Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, cid=None):
+        '''
+        Provides the cached value.
+
+        @param key: object
+            The key of the value, usually the href or Uuid of the remote user.
+        @param cid: integer|None
+            The change id of the remote user as currently known, None if unknown.
+        @return: object|None
+            The value or None if there is no entry, if it expired or if the remote user changed since it was cached.
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None
+            value, cached, expires = entry
+            if expires < time.time() or (cid is not None and (cached is None or cached < cid)):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, cid=None):
+        '''
+        Caches the value.
+
+        @param key: object
+            The key of the value.
+        @param value: object
+            The value to cache, not None.
+        @param cid: integer|None
+            The change id of the remote user the value is for, None if unknown.
+        '''
+        assert value is not None, 'Invalid value %s' % value
+        if not self.maxEntries: return
+        with self._lock:
+            self._entries[key] = (value, cid, time.time() + self.timeToLive)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxEntries: self._entries.popitem(last=False)
+
+    def drop(self, key):
+        '''
+        Drops the cached value.
+
+        @param key: object
+            The key of the value.
+        '''
+        with self._lock: self._entries.pop(key, None)
+
+# --------------------------------------------------------------------
+
+def cidOf(userJSON):
+    '''
+    Provides the change id of the remote user.
+
+    @param userJSON: dictionary|None
+        The remote user data in JSON decoded format.
+    @return: integer|None
+        The change id or None if not available.
+    '''
+    if not isinstance(userJSON, dict): return None
+    try: return int(userJSON['Cid'])
+    except (KeyError, ValueError, TypeError): return None
@@ -0,0 +1,178 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk-sync
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the registry of the chained blogs users icons.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from ally.exception import InputError
+from livedesk.meta.chained_icon import ChainedIconMapped
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.expression import not_
+from superdesk.media_archive.api.meta_info import IMetaInfoService
+from superdesk.media_archive.meta.meta_data import MetaDataMapped
+from superdesk.media_archive.meta.meta_info import MetaInfoMapped
+from superdesk.person_icon.meta.person_icon import PersonIconMapped
+from superdesk.source.core.spec import ISyncProcess, ISyncJob, SYNC_CHANGED, SYNC_UNCHANGED
+from superdesk.user.meta.user import UserMapped
+from superdesk.user.meta.user_type import UserTypeMapped
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+@injected
+class ChainedIcons(ISyncProcess):
+    '''
+    Keeps for each chained blog user the URL, the ETag and the content hash of the icon, so an icon that did not change
+    is not read again and the same icon content is archived only once. The icons archived for the chained blogs users
+    that are not used anymore are collected, as a synchronization process with a single source, so that only one
+    process collects them at a time.
+    '''
+
+    icon_gc_interval = 3600; wire.config('icon_gc_interval', doc='''
+    The number of seconds between the collections of the unused icons of the chained blogs users.''')
+    icon_gc_batch = 100; wire.config('icon_gc_batch', doc='''
+    The maximum number of unused icons deleted in one collection.''')
+    user_type_key = 'chained blog'; wire.config('user_type_key', doc='''
+    The user type key of the chained blogs users, only their unused icons are collected.''')
+    metaInfoService = IMetaInfoService; wire.entity('metaInfoService')
+    # The meta info service used for deleting the unused icons.
+    sessionCreator = None
+    # The session creator used for the icons transactions, it has to be set.
+
+    def __init__(self):
+        '''
+        Construct the chained icons.
+        '''
+        assert isinstance(self.icon_gc_interval, int) and self.icon_gc_interval > 0, \
+        'Invalid icon collection interval %s' % self.icon_gc_interval
+        assert isinstance(self.icon_gc_batch, int) and self.icon_gc_batch > 0, \
+        'Invalid icon collection batch %s' % self.icon_gc_batch
+        assert isinstance(self.metaInfoService, IMetaInfoService), 'Invalid meta info service %s' % self.metaInfoService
+        assert callable(self.sessionCreator), 'Invalid session creator %s' % self.sessionCreator
+        assert isinstance(self.user_type_key, str), 'Invalid user type key %s' % self.user_type_key
+
+    def get(self, userId):
+        '''
+        Provides the icon of the user, only if it is still the icon of the user.
+
+        @param userId: integer
+            The user id.
+        @return: ChainedIconMapped|None
+            The icon or None if the user has no icon read from a chained blog.
+        '''
+        def get(session):
+            sql = session.query(ChainedIconMapped).filter(ChainedIconMapped.user == userId)
+            sql = sql.join(PersonIconMapped, (PersonIconMapped.Id == ChainedIconMapped.user) &
+                           (PersonIconMapped.MetaData == ChainedIconMapped.metaData))
+            icon = sql.first()
+            if icon is not None: session.expunge(icon)
+            return icon
+        return self._transaction(get)
+
+    def find(self, hash):
+        '''
+        Provides the archived icon with the content hash.
+
+        @param hash: string
+            The content hash.
+        @return: integer|None
+            The meta data id of the icon, None if no icon has the hash.
+        '''
+        sql = lambda session: session.query(ChainedIconMapped.metaData).filter(ChainedIconMapped.hash == hash).first()
+        found = self._transaction(sql)
+        return found[0] if found else None
+
+    def put(self, userId, metaDataId, url, etag, hash):
+        '''
+        Keeps the icon of the user.
+
+        @param userId: integer
+            The user id.
+        @param metaDataId: integer
+            The meta data id of the archived icon.
+        @param url: string
+            The URL the icon has been read from.
+        @param etag: string|None
+            The ETag of the icon response.
+        @param hash: string
+            The content hash.
+        '''
+        icon = ChainedIconMapped(user=userId, metaData=metaDataId, url=url, etag=etag, hash=hash)
+        self._transaction(lambda session: session.merge(icon))
+
+    def drop(self, userId):
+        '''
+        Drops the icon of the user, the archived icon is collected later if no other user has it.
+
+        @param userId: integer
+            The user id.
+        '''
+        self._transaction(lambda session:
+                          session.query(ChainedIconMapped).filter(ChainedIconMapped.user == userId).delete())
+
+    # ----------------------------------------------------------------
+
+    def syncSources(self):
+        '''
+        @see: ISyncProcess.syncSources
+        '''
+        return {'unused icons': None}
+
+    def syncSource(self, key, source, job):
+        '''
+        @see: ISyncProcess.syncSource
+        Deletes the archived icons of the chained blogs users that no user has anymore.
+        '''
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+
+        metaInfoIds, deleted = self._transaction(self._unused), 0
+        for metaInfoId in metaInfoIds:
+            if not job.isLeased(): break
+            try:
+                self.metaInfoService.delete(metaInfoId)
+                deleted += 1
+            except InputError:
+                log.warning('Cannot delete the unused chained icon info %s', metaInfoId)
+        if deleted: log.info('Deleted %d unused chained icons', deleted)
+        job.report(SYNC_CHANGED if len(metaInfoIds) >= self.icon_gc_batch else SYNC_UNCHANGED)
+
+    def _unused(self, session):
+        '''
+        Provides the meta info ids of the icons archived for the chained blogs users and not used anymore.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+
+        used = session.query(PersonIconMapped.MetaData).filter(PersonIconMapped.MetaData != None)
+        sql = session.query(MetaInfoMapped.Id).join(MetaDataMapped, MetaDataMapped.Id == MetaInfoMapped.MetaData)
+        sql = sql.join(UserMapped, UserMapped.Id == MetaDataMapped.Creator)
+        sql = sql.join(UserTypeMapped, UserTypeMapped.id == UserMapped.typeId)
+        sql = sql.filter(UserTypeMapped.Key == self.user_type_key)
+        sql = sql.filter(not_(MetaDataMapped.Id.in_(used)))
+        sql = sql.filter(not_(MetaDataMapped.Id.in_(session.query(ChainedIconMapped.metaData))))
+        return [metaInfoId for metaInfoId, in sql.limit(self.icon_gc_batch).all()]
+
+    def _transaction(self, call):
+        '''
+        Calls the function with a new session and commits.
+        '''
+        session = self.sessionCreator()
+        assert isinstance(session, Session)
+        try:
+            result = call(session)
+            session.commit()
+            return result
+        except:
+            session.rollback()
+            raise
+        finally: session.close()
@@ -12,16 +12,16 @@ API implementation of liveblog sync.
 import socket
 import json
 import logging
-import time
 import codecs
 from datetime import datetime
-from sched import scheduler
-from threading import Thread
-from urllib.request import urlopen, Request
-from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
-from livedesk.api.blog_sync import IBlogSyncService, BlogSync
+from http.client import HTTPException
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse, urlsplit, urlunsplit, quote
+from hashlib import sha256
+from livedesk.api.blog_sync import IBlogSyncService
+from livedesk.meta.blog_sync import BlogSyncMapped
 from superdesk.source.api.source import ISourceService, Source, QSource
 from livedesk.api.blog_post import IBlogPostService
+from livedesk.core.spec import IBlogPostIngestService, IngestPost
 from sqlalchemy.sql.functions import current_timestamp
 from superdesk.collaborator.api.collaborator import ICollaboratorService, Collaborator
 from ally.container import wire, app
@@ -29,14 +29,20 @@ from ally.container.ioc import injected
 from ally.container.support import setup
 from superdesk.user.api.user import IUserService, User
 from ally.exception import InputError
-from urllib.error import HTTPError
 from superdesk.media_archive.api.meta_data import IMetaDataUploadService
 from superdesk.media_archive.api.meta_info import IMetaInfoService
 from superdesk.person_icon.api.person_icon import IPersonIconService
 from .icon_content import ChainedIconContent
+from .chained_icon import ChainedIcons
 from superdesk.post.api.post import Post, IPostService
 from uuid import uuid4
-from random import randint
+from functools import partial
+from superdesk.source.core.impl.http_pool import HttpPool
+from superdesk.source.core.impl.json_stream import iterateList
+from .author_cache import AuthorCache, cidOf
+from superdesk.source.core.impl.sync_engine import SyncEngine
+from superdesk.source.core.spec import ISyncProcess, ISyncScheduler, ISyncJob, SYNC_CHANGED, \
+    SYNC_UNCHANGED, SYNC_FAILED, SYNC_SKIPPED
 
 # --------------------------------------------------------------------
 
@@ -46,11 +52,14 @@ log = logging.getLogger(__name__)
 
 @injected
 @setup(name='chainedSynchronizer')
-class ChainedSyncProcess:
+class ChainedSyncProcess(ISyncProcess):
     '''
     Chained sync process.
     '''
 
+    syncScheduler = ISyncScheduler; wire.entity('syncScheduler')
+    # the scheduler that runs the chained blogs sync
+
     blogSyncService = IBlogSyncService; wire.entity('blogSyncService')
     # blog sync service used to retrieve blogs set on auto publishing
 
@@ -59,6 +68,9 @@ class ChainedSyncProcess:
 
     blogPostService = IBlogPostService; wire.entity('blogPostService')
     # blog post service used to insert blog posts
+
+    blogPostIngestService = IBlogPostIngestService; wire.entity('blogPostIngestService')
+    # blog post ingest service used to store the chained posts in batches
     
     postService = IPostService; wire.entity('postService')
     # post service used to insert/update posts
@@ -74,14 +86,12 @@ class ChainedSyncProcess:
 
     personIconService = IPersonIconService; wire.entity('personIconService')
 
-    syncThreads = {}
-    # dictionary of threads that perform synchronization
+    chainedIcons = ChainedIcons; wire.entity('chainedIcons')
+    # the icons read for the chained blogs users
 
     sync_interval = 53; wire.config('sync_interval', doc='''
-    The number of seconds to perform sync for blogs.''')
-    
-    timeout_inteval = 4#; wire.config('timeout_interval', doc='''
-    #The number of seconds after the sync ownership can be taken.''')
+    The number of seconds to perform sync for blogs, the blogs that have new posts are synced more often and the idle
+    ones less often.''')
     
     published_posts_field = 'PostPublished'; wire.config('published_posts_field', doc='''
     The field that contains URI for published posts retrieval''')
@@ -92,144 +102,290 @@ class ChainedSyncProcess:
     blog_provider_type = 'blog provider'; wire.config('blog_provider_type', doc='''
     Key of the source type for blog providers''')
 
+    sync_fetchers = 10; wire.config('sync_fetchers', doc='''
+    The maximum number of chained blogs that are read at the same time, whatever the number of chained blogs.''')
+
+    sync_host_fetchers = 2; wire.config('sync_host_fetchers', doc='''
+    The maximum number of chained blogs that are read at the same time from the same host.''')
+
+    sync_writers = 2; wire.config('sync_writers', doc='''
+    The maximum number of chained blogs for which the read posts are stored at the same time.''')
+
+    sync_write_queue = 8; wire.config('sync_write_queue', doc='''
+    The maximum number of read pages of chained posts that are not stored yet, when the queue is full the reading waits
+    for the storing.''')
+
+    http_pool_size = 4; wire.config('http_pool_size', doc='''
+    The maximum number of idle connections kept open for each remote host.''')
+
+    http_idle_timeout = 30; wire.config('http_idle_timeout', doc='''
+    The number of seconds after which an idle connection to a remote host is closed.''')
+
+    http_timeout = 20; wire.config('http_timeout', doc='''
+    The number of seconds after which a connect or read on a remote host fails.''')
+
+    author_cache_ttl = 600; wire.config('author_cache_ttl', doc='''
+    The number of seconds for which the authors and creators of the chained posts are kept, together with their local
+    users and collaborators, a remote user that changed is read again before this time.''')
+
+    author_cache_entries = 10000; wire.config('author_cache_entries', doc='''
+    The maximum number of authors, creators, users and collaborators kept for the chained posts, 0 disables the
+    cache.''')
+
+    sync_batch_size = 100; wire.config('sync_batch_size', doc='''
+    The maximum number of chained posts that are stored in one transaction.''')
+
+    sync_page_size = 200; wire.config('sync_page_size', doc='''
+    The number of chained posts read with one request, a blog with more new posts is read page by page and each page
+    is stored before the next one is read.''')
+
+    icon_max_size = 5 * 1024 * 1024; wire.config('icon_max_size', doc='''
+    The maximum number of bytes of a chained blog user icon, the larger icons are not archived.''')
+
     acceptType = 'text/json'
     # mime type accepted for response from remote blog
     encodingType = 'UTF-8'
     # character encoding type accepted for response from remove blog
     
-
+    def __init__(self):
+        '''
+        Construct the chained sync process.
+        '''
+        assert isinstance(self.sync_fetchers, int), 'Invalid sync fetchers %s' % self.sync_fetchers
+        assert isinstance(self.sync_host_fetchers, int), 'Invalid sync host fetchers %s' % self.sync_host_fetchers
+        assert isinstance(self.sync_writers, int), 'Invalid sync writers %s' % self.sync_writers
+        assert isinstance(self.sync_write_queue, int), 'Invalid sync write queue %s' % self.sync_write_queue
+        assert isinstance(self.http_pool_size, int), 'Invalid HTTP pool size %s' % self.http_pool_size
+        assert isinstance(self.http_idle_timeout, int), 'Invalid HTTP idle timeout %s' % self.http_idle_timeout
+        assert isinstance(self.http_timeout, int), 'Invalid HTTP timeout %s' % self.http_timeout
+        assert isinstance(self.author_cache_ttl, int), 'Invalid author cache time to live %s' % self.author_cache_ttl
+        assert isinstance(self.author_cache_entries, int), 'Invalid author cache entries %s' % self.author_cache_entries
+        assert isinstance(self.sync_batch_size, int) and self.sync_batch_size > 0, \
+        'Invalid sync batch size %s' % self.sync_batch_size
+        assert isinstance(self.sync_page_size, int) and self.sync_page_size > 0, \
+        'Invalid sync page size %s' % self.sync_page_size
+        assert isinstance(self.icon_max_size, int) and self.icon_max_size > 0, \
+        'Invalid icon max size %s' % self.icon_max_size
+        assert isinstance(self.chainedIcons, ChainedIcons), 'Invalid chained icons %s' % self.chainedIcons
+
+        self._engine = SyncEngine(self.sync_fetchers, self.sync_host_fetchers, self.sync_writers,
+                                  max(self.sync_write_queue, self.sync_writers))
+        self._httpPool = HttpPool(self.http_pool_size, self.http_idle_timeout, self.http_timeout)
+        self._authorCache = AuthorCache(self.author_cache_ttl, self.author_cache_entries)
 
     @app.deploy
-    def startChainSyncThread(self):
-        '''
-        Starts the chain sync thread.
+    def startChainSync(self):
         '''
-        schedule = scheduler(time.time, time.sleep)
-        def syncChains():
-            self.syncChains()
-            schedule.enter(self.sync_interval, 1, syncChains, ())
-        schedule.enter(self.sync_interval, 1, syncChains, ())
-        scheduleRunner = Thread(name='chained sync', target=schedule.run)
-        scheduleRunner.daemon = True
-        scheduleRunner.start()
-        log.info('Started the chained blogs automatic synchronization.')
-
-    def syncChains(self):
+        Registers the chained blogs synchronization and the collection of the unused chained icons.
         '''
-        Read all chained blog sync entries and sync with the corresponding blogs.
-        '''        
-        log.info('Start chained blog synchronization')
-        
-        sleep_time = randint(0, 1000) * 0.001
-        time.sleep(sleep_time)
-        
-        for blogSync in self.blogSyncService.getBySourceType(self.blog_provider_type): 
-            assert isinstance(blogSync, BlogSync)
-            key = (blogSync.Blog, blogSync.Source)
-            thread = self.syncThreads.get(key)
-            if thread:
-                assert isinstance(thread, Thread), 'Invalid thread %s' % thread
-                if thread.is_alive(): 
-                    log.info('Chained thread for blog %d is alive', blogSync.Blog)
-                    continue
+        self.syncScheduler.register('chained blogs', self, self.sync_interval)
+        self.syncScheduler.register('chained icons', self.chainedIcons, self.chainedIcons.icon_gc_interval)
 
+    def syncSources(self):
+        '''
+        @see: ISyncProcess.syncSources
+        The source of each blog sync entry is read here, once for all the syncs made until the next discovery. The entries
+        are the mapped ones, which also keep the published posts URI and validators that are not in the REST model.
+        '''
+        sources = {}
+        for blogSync in self.blogSyncService.getBySourceType(self.blog_provider_type):
+            try: sources[(blogSync.Blog, blogSync.Source)] = blogSync, self.sourceService.getById(blogSync.Source)
+            except InputError: log.error('No source %d for the chained blog %d', blogSync.Source, blogSync.Blog)
+        return sources
 
-            if not self.blogSyncService.checkTimeout(blogSync.Id, self.timeout_inteval * self.sync_interval): 
-                log.info('Chained thread for blog %d is already taken', blogSync.Blog)
-                continue
-            
-            self.syncThreads[key] = Thread(name='blog %d sync' % blogSync.Blog,
-                                           target=self._syncChain, args=(blogSync,))
-            self.syncThreads[key].daemon = True
-            self.syncThreads[key].start()
-            log.info('Chained thread started for blog id %d and source id %d', blogSync.Blog, blogSync.Source)
-            
-        log.info('End chained blog synchronization')
+    def syncMetrics(self):
+        '''
+        @see: ISyncProcess.syncMetrics
+        '''
+        return self._engine.metrics()
 
-    def _syncChain(self, blogSync):
+    def syncSource(self, key, item, job):
+        '''
+        @see: ISyncProcess.syncSource
+        '''
+        assert isinstance(item, tuple), 'Invalid item %s' % item
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        blogSync, source = item
+        assert isinstance(blogSync, BlogSyncMapped), 'Invalid blog sync %s' % blogSync
+        assert isinstance(source, Source), 'Invalid source %s' % source
+        if self._engine.isActive(key):
+            log.info('Chained sync for blog %d is running', blogSync.Blog)
+            return job.report(SYNC_SKIPPED)
+
+        # the outcome is reported by the write, or by the engine if a fetch or a write raises
+        since = blogSync.CId if blogSync.CId is not None else 0
+        self._engine.submit(key, urlparse(source.URI).netloc, partial(self._fetchChain, blogSync, source, since, 0),
+                            partial(self._writeLeased, job, blogSync, source, since, 0, False, blogSync.CId),
+                            partial(job.report, SYNC_FAILED))
+        running, waiting = self._engine.counts()
+        log.info('Chained sync scheduled for blog id %d and source id %d, %d running of which %d waiting for their host',
+                 blogSync.Blog, blogSync.Source, running, waiting)
+
+    def _fetchChain(self, blogSync, source, since, offset):
         '''
-        Synchronize the blog for the given sync entry.
+        Reads a page of remote posts for the given sync entry, it does not use the database.
 
-        @param blogSync: BlogSync
+        @param blogSync: BlogSyncMapped
             The blog sync entry declaring the blog and source from which the blog
             has to be updated.
+        @param source: Source
+            The source of the blog sync entry.
+        @param since: integer
+            The change id after which the posts are read, the same for all the pages of a sync.
+        @param offset: integer
+            The offset of the page.
+        @return: tuple(list[dictionary]|None, string|None, string|None, boolean)|None
+            The remote posts with the Author and Creator read, or None if the posts did not change since the last read,
+            followed by the ETag and Last-Modified of the posts response and True if this is the last page. None if the
+            posts cannot be read.
         '''
-        assert isinstance(blogSync, BlogSync), 'Invalid blog sync %s' % blogSync
-        source = self.sourceService.getById(blogSync.Source)
+        assert isinstance(blogSync, BlogSyncMapped), 'Invalid blog sync %s' % blogSync
+        assert isinstance(source, Source), 'Invalid source %s' % source
         
-        log.info('_syncChain blogId=%d, sourceId=%d', blogSync.Blog, blogSync.Source)
+        log.info('_fetchChain blogId=%d, sourceId=%d', blogSync.Blog, blogSync.Source)
         
-        assert isinstance(source, Source)
         (scheme, netloc, path, params, query, fragment) = urlparse(source.URI)
         
         if not scheme: scheme  = 'http'
 
         blogUrl = urlunparse((scheme, netloc, path, params, query, fragment))
-        blogPublishedPostsURI = self._readPublishedPostsUrl(blogUrl, self.published_posts_field)
+        # the published posts URI is discovered once and kept on the blog sync entry
+        blogPublishedPostsURI = blogSync.postsURI
         if not blogPublishedPostsURI:
-            log.error('Unable to sync blog: %s' % (source.URI,))
-            return
+            blogPublishedPostsURI = self._readPublishedPostsUrl(blogUrl, self.published_posts_field)
+            if not blogPublishedPostsURI:
+                log.error('Unable to sync blog: %s' % (source.URI,))
+                return
+            blogSync.postsURI = blogPublishedPostsURI
+            blogSync.postsETag = blogSync.postsModified = None
 
         (scheme, netloc, path, params, query, fragment) = urlparse(blogPublishedPostsURI)
         if not scheme: scheme  = 'http'
 
         q = parse_qsl(query, keep_blank_values=True)
         q.append(('asc', 'order'))
-        q.append(('cId.since', blogSync.CId if blogSync.CId is not None else 0))
+        q.append(('cId.since', since))
+        q.append(('offset', offset))
+        q.append(('limit', self.sync_page_size))
 
         url = urlunparse((scheme, netloc, path, params, urlencode(q), fragment))
-        req = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType,
-                                    'X-Filter' : '*,Creator.*,Author.User.*,Author.Source.*', 'User-Agent' : 'Magic Browser'})
+        headers = {'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType,
+                   'X-Filter' : '*,Creator.*,Author.User.*,Author.Source.*', 'User-Agent' : 'Magic Browser'}
+        # only the first page is conditional, the validators are kept only for syncs that fit in one page
+        if offset == 0 and blogSync.postsETag: headers['If-None-Match'] = blogSync.postsETag
+        if offset == 0 and blogSync.postsModified: headers['If-Modified-Since'] = blogSync.postsModified
         
-        try: resp = urlopen(req)
-        except (HTTPError, socket.error) as e:
+        try: resp = self._httpPool.request(url, headers)
+        except (HTTPException, socket.error) as e:
             log.error('Read error on %s: %s' % (source.URI, e))
-            blogSync.LastActivity = None 
-            self.blogSyncService.update(blogSync)
             return
         
+        if str(resp.status) == '304':
+            resp.close()
+            return None, blogSync.postsETag, blogSync.postsModified, True
+
         if str(resp.status) != '200':
             log.error('Read problem on %s, status: %s' % (source.URI, resp.status))
-            blogSync.LastActivity = None 
-            self.blogSyncService.update(blogSync)
+            resp.close()
+            # the published posts URI might have changed, it is discovered again on the next sync
+            blogSync.postsURI = blogSync.postsETag = blogSync.postsModified = None
             return
+        etag, lastModified = resp.getheader('ETag'), resp.getheader('Last-Modified')
 
-        try: msg = json.load(codecs.getreader(self.encodingType)(resp))
+        # the posts are parsed one at a time as they are read, the authors are read while the page is downloaded
+        posts, resolved, count = [], {}, 0
+        try:
+            for post in iterateList(resp, 'PostList', self.encodingType):
+                count += 1
+                try:
+                    if ('DeletedOn' not in post) and post['IsPublished'] == 'True':
+                        #TODO: workaround, read again the Author because sometimes we get access denied
+                        author, creator = post['Author'], post['Creator']
+                        post['Author'] = self._resolve(resolved, 'author', author['href'], cidOf(author.get('User')),
+                                                       self._readAuthor)
+                        post['Creator'] = self._resolve(resolved, 'creator', creator['href'], cidOf(creator),
+                                                        self._readCreator)
+                except (KeyError, TypeError) as e:
+                    log.error('Post from source %s is missing attribute %s' % (source.URI, e))
+                else: posts.append(post)
+            resp.read()
         except ValueError as e:
             log.error('Invalid JSON data %s' % e)
-            blogSync.LastActivity = None 
-            self.blogSyncService.update(blogSync)
             return
+        except (HTTPException, socket.error) as e:
+            log.error('Read error on %s: %s' % (source.URI, e))
+            return
+        finally: resp.close()
+        return posts, etag, lastModified, count < self.sync_page_size
+
+    def _writeLeased(self, job, blogSync, source, since, offset, changed, cId, fetched):
+        '''
+        Stores a page of remote posts if the sync job still holds the lease of the blog sync entry, then continues with
+        the next page or reports the outcome. The biggest change id of the stored pages is passed on to the next page,
+        the blog sync entry gets it only once the last page is stored.
+        '''
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        # the posts did not change since the last read, there is nothing to store
+        if fetched is not None and fetched[0] is None: return job.report(SYNC_UNCHANGED)
+        if not job.isLeased():
+            log.warning('Chained sync for blog %d lost its lease, the read posts are dropped', blogSync.Blog)
+            return job.report(SYNC_SKIPPED)
+
+        outcome, cId = self._writeChain(job, blogSync, source, offset, cId, fetched)
+        if outcome in (SYNC_FAILED, SYNC_SKIPPED): return job.report(outcome)
+        changed = changed or outcome == SYNC_CHANGED
+        if not fetched[3]:
+            offset += self.sync_page_size
+            return (partial(self._fetchChain, blogSync, source, since, offset),
+                    partial(self._writeLeased, job, blogSync, source, since, offset, changed, cId))
+        job.report(SYNC_CHANGED if changed else outcome)
+
+    def _writeChain(self, job, blogSync, source, offset, cId, fetched):
+        '''
+        Stores the remote posts in the blog for the given sync entry.
 
-        usersForIcons = {}
-        for post in msg['PostList']:
+        @param job: ISyncJob
+            The job of the sync, the sync entry is updated only if it still holds the lease.
+        @param blogSync: BlogSyncMapped
+            The blog sync entry declaring the blog and source from which the blog
+            has to be updated.
+        @param source: Source
+            The source of the blog sync entry.
+        @param offset: integer
+            The offset of the page.
+        @param cId: integer|None
+            The biggest change id of the previous pages of the sync.
+        @param fetched: tuple(list[dictionary], string|None, string|None, boolean)|None
+            The page of remote posts as provided by @see: _fetchChain, None if the posts cannot be read.
+        @return: tuple(string, integer|None)
+            The outcome of the sync, one of the SYNC_* outcomes, and the biggest change id including this page.
+        '''
+        assert isinstance(blogSync, BlogSyncMapped), 'Invalid blog sync %s' % blogSync
+        assert isinstance(source, Source), 'Invalid source %s' % source
+        
+        if fetched is None:
+            # a failed sync starts again from the first page, only the reset posts URI is stored
+            self._storeCursor(job, blogSync, blogSync.CId, blogSync.postsETag, blogSync.postsModified)
+            return SYNC_FAILED, cId
+        posts, etag, lastModified, last = fetched
+
+        usersForIcons, ingests = {}, []
+        for post in posts:
             try:
                 toUnpublish = False
                 if post['IsPublished'] != 'True': toUnpublish = True
                 
-                insert = False 
-                if 'Uuid' in post: 
-                    uuid = post['Uuid']
-                    localPost = self.postService.getByUuidAndSource(uuid, source.Id) 
-                else: 
-                    #To support old instances that don't have Uuid attribute
-                    uuid = str(uuid4().hex)
-                    localPost = None 
-                    
-                if localPost == None:  
-                    if 'DeletedOn' in post: continue    
-                    if toUnpublish: continue
-                    localPost = Post()
-                    localPost.Uuid = uuid
-                    insert = True
+                localPost = Post()
+                if 'Uuid' in post: localPost.Uuid = post['Uuid']
+                #To support old instances that don't have Uuid attribute
+                else: localPost.Uuid = str(uuid4().hex)
+                # a post that is not local yet is inserted only if it is published and not deleted
+                ingest = IngestPost(localPost, insert=('DeletedOn' not in post) and (not toUnpublish),
+                                    unpublish=toUnpublish, moveUp=('PutUp' in post) and (post['PutUp'] in (True, 'True')))
                 
                 if ('DeletedOn' not in post) and (not toUnpublish):
                     localPost.DeletedOn = None
 
-                    #TODO: workaround, read again the Author because sometimes we get access denied
-                    post['Author'] = self._readAuthor(post['Author']['href'])   
-                    post['Creator'] = self._readCreator(post['Creator']['href'])
-                    
                     #if exists local, update it, otherwise continue the original insert
                     localPost.Type = post['Type']['Key']
                     localPost.Author, localPost.Creator, needUpdate, isAuthor = self._getCollaboratorForAuthor(post['Author'], post['Creator'], source)
@@ -254,32 +410,50 @@ class ChainedSyncProcess:
                 elif 'DeletedOn' in post:
                     localPost.DeletedOn = datetime.strptime(post['DeletedOn'], '%m/%d/%y %I:%M %p')
 
-                # prepare the blog sync model to update the change identifier
-                blogSync.CId = int(post['CId']) if blogSync.CId is None or int(post['CId']) > blogSync.CId else blogSync.CId
-
-                if insert: self.blogPostService.insert(blogSync.Blog, localPost)
-                else:
-                    self.blogPostService.update(blogSync.Blog, localPost)
-                    if ('PutUp' in post) and (post['PutUp'] in (True, 'True')):
-                        self.blogPostService.moveUp(blogSync.Blog, localPost.Id)
-
-                if toUnpublish and localPost.PublishedOn:
-                    self.blogPostService.unpublish(blogSync.Blog, localPost.Id)
-
-                # update blog sync entry
-                blogSync.LastActivity = datetime.now().replace(microsecond=0)
-                self.blogSyncService.update(blogSync)
+                # the change identifier is stored on the blog sync entry with the last page
+                cId = int(post['CId']) if cId is None or int(post['CId']) > cId else cId
+                ingests.append(ingest)
                 
             except KeyError as e:
                 log.error('Post from source %s is missing attribute %s' % (source.URI, e))
             except Exception as e:
                 log.error('Error in source %s post: %s' % (source.URI, e))
 
+        for k in range(0, len(ingests), self.sync_batch_size):
+            batch = ingests[k:k + self.sync_batch_size]
+            self.blogPostIngestService.ingest(blogSync.Blog, source.Id, batch)
+            for ingest in batch:
+                if ingest.error is not None: log.error('Error in source %s post: %s' % (source.URI, ingest.error))
+
         self._updateIcons(usersForIcons)
         
-        blogSync.LastActivity = None 
-        self.blogSyncService.update(blogSync)
-   
+        # the change id and the validators are kept only after all the pages are stored, otherwise the missed posts
+        # would not be read again
+        if last:
+            if offset != 0: etag = lastModified = None
+            if not self._storeCursor(job, blogSync, cId, etag, lastModified): return SYNC_SKIPPED, cId
+        if any(ingest.postId is not None for ingest in ingests): return SYNC_CHANGED, cId
+        return SYNC_UNCHANGED, cId
+
+
+    def _storeCursor(self, job, blogSync, cId, etag, lastModified):
+        '''
+        Stores the change id and the posts URI and validators of the sync entry, only if the job still holds the lease.
+        The sync entry, which is kept by the scheduler for the next syncs, gets the change id and validators only once
+        they are stored.
+
+        @return: boolean
+            True if the sync entry has been updated.
+        '''
+        assert isinstance(job, ISyncJob), 'Invalid job %s' % job
+        assert isinstance(blogSync, BlogSyncMapped), 'Invalid blog sync %s' % blogSync
+
+        stored = job.store(BlogSyncMapped, BlogSyncMapped.Id == blogSync.Id,
+                           {BlogSyncMapped.CId: cId, BlogSyncMapped.postsURI: blogSync.postsURI,
+                            BlogSyncMapped.postsETag: etag, BlogSyncMapped.postsModified: lastModified})
+        if not stored: log.warning('Chained sync for blog %d lost its lease, the change id is not stored', blogSync.Blog)
+        else: blogSync.CId, blogSync.postsETag, blogSync.postsModified = cId, etag, lastModified
+        return stored
 
     def _getCollaboratorForAuthor(self, author, creator, source):
         '''
@@ -322,36 +496,86 @@ class ChainedSyncProcess:
 
         
         needUpdate = True
-        try: userId = self.userService.insert(user)
-        except InputError:
-            localUser = self.userService.getByUuid(user.Uuid)
-            userId = localUser.Id
-            if localUser.Type == self.user_type_key and (cid is None or localUser.Cid < cid): 
-                user.Id = localUser.Id
-                user.Type = localUser.Type
+        # the users already known locally are not inserted again, only the new users go through the insert
+        local = self._authorCache.get(('user', user.Uuid)) if 'Uuid' in userJSON else None
+        if local is not None:
+            userId, userType, localCid = local
+            if userType == self.user_type_key and (cid is None or localCid is None or localCid < cid):
+                user.Id = userId
                 user.Cid = cid
                 self.userService.update(user)
-            else: needUpdate = False    
+            else: needUpdate = False
+        else:
+            try:
+                userId = self.userService.insert(user)
+                userType, localCid = user.Type, cid
+            except InputError:
+                localUser = self.userService.getByUuid(user.Uuid)
+                userId, userType, localCid = localUser.Id, localUser.Type, localUser.Cid
+                if localUser.Type == self.user_type_key and (cid is None or localUser.Cid < cid): 
+                    user.Id = localUser.Id
+                    user.Type = localUser.Type
+                    user.Cid = cid
+                    self.userService.update(user)
+                else: needUpdate = False    
+        if needUpdate and cid is not None: localCid = cid
+        if 'Uuid' in userJSON: self._authorCache.put(('user', user.Uuid), (userId, userType, localCid))
             
-        collaborator = Collaborator()
-        collaborator.User, collaborator.Source = userId, source.Id
-        try: collaboratorId = self.collaboratorService.insert(collaborator)
-        except InputError:
-            collaborators = self.collaboratorService.getAll(userId, source.Id)
-            collaboratorId = collaborators[0].Id
+        collaboratorId = self._authorCache.get(('collaborator', userId, source.Id))
+        if collaboratorId is None:
+            collaborator = Collaborator()
+            collaborator.User, collaborator.Source = userId, source.Id
+            try: collaboratorId = self.collaboratorService.insert(collaborator)
+            except InputError:
+                collaborators = self.collaboratorService.getAll(userId, source.Id)
+                collaboratorId = collaborators[0].Id
+            self._authorCache.put(('collaborator', userId, source.Id), collaboratorId)
         
         if isAuthor:
             return [collaboratorId, userId, needUpdate, isAuthor]
         else:    
-            q = QSource(name=author['Source']['Name'], isModifiable=False)
+            sourceName = author['Source']['Name']
+            collaboratorId = self._authorCache.get(('source', sourceName))
+            if collaboratorId is not None: return [collaboratorId, userId, needUpdate, isAuthor]
+            q = QSource(name=sourceName, isModifiable=False)
             sources = self.sourceService.getAll(q=q)
             if not sources: raise Exception('Invalid source %s' % q.name)
             collaborators = self.collaboratorService.getAll(userId=None, sourceId=sources[0].Id)
-            if collaborators: return [collaborators[0].Id, userId, needUpdate, isAuthor]
+            if collaborators: collaboratorId = collaborators[0].Id
             else:
                 collaborator = Collaborator()
                 collaborator.Source = sources[0].Id
-                return [self.collaboratorService.insert(collaborator), userId, needUpdate, isAuthor]
+                collaboratorId = self.collaboratorService.insert(collaborator)
+            self._authorCache.put(('source', sourceName), collaboratorId)
+            return [collaboratorId, userId, needUpdate, isAuthor]
+
+    def _resolve(self, resolved, kind, href, cid, read):
+        '''
+        Provides the remote author or creator, each href is read once for a batch of posts and then kept in the cache
+        for the next batches as long as the remote user does not change.
+
+        @param resolved: dictionary{tuple(string, string): dictionary|None}
+            The authors and creators resolved for the current batch of posts.
+        @param kind: string
+            The kind of the resolved user, either 'author' or 'creator'.
+        @param href: string
+            The URL of the author or creator.
+        @param cid: integer|None
+            The change id of the remote user as provided in the post, None if not available.
+        @param read: callable(string)
+            The function used for reading the author or creator.
+        @return: dictionary|None
+            The author or creator data in JSON decoded format, None if it cannot be read.
+        '''
+        key = (kind, href)
+        if key in resolved: return resolved[key]
+
+        value = self._authorCache.get(key, cid)
+        if value is None:
+            value = read(href)
+            if value is not None: self._authorCache.put(key, value, cid)
+        resolved[key] = value
+        return value
 
     def _updateIcons(self, usersData):
         '''
@@ -372,12 +596,13 @@ class ChainedSyncProcess:
                 if not scheme: 
                     metaDataIconURL = urlunparse(('http', netloc, path, params, query, fragment))
 
-                req = Request(metaDataIconURL, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser'})
+                headers = {'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser'}
                 try:
-                    resp = urlopen(req)
-                except (HTTPError, socket.error) as e:
+                    resp = self._httpPool.request(metaDataIconURL, headers)
+                except (HTTPException, socket.error) as e:
                     continue
                 if str(resp.status) != '200':
+                    resp.close()
                     continue
 
                 try:
@@ -403,71 +628,83 @@ class ChainedSyncProcess:
 
     def _synchronizeIcon(self, userId, iconInfo):
         '''
-        Synchronizing local icon according to the remote one
+        Synchronizing local icon according to the remote one, the icon is read again only if the URL or the ETag changed
+        and it is archived only if no icon with the same content has been archived before.
         '''
         if not userId:
             return
 
-        shouldRemoveOld = False
-        needToUploadNew = False
-
-        try:
-            metaDataLocal = self.personIconService.getByPersonId(userId, 'http')
-        except InputError:
-            metaDataLocal = None
-
-        if metaDataLocal:
-            localId = metaDataLocal.Id
-            localName = metaDataLocal.Name
-        else:
-            localId = None
-            localName = None
-
-        if not localId:
-            if iconInfo['url']:
-                needToUploadNew = True
-
-        else:
-            if iconInfo['url']:
-                #on changed avatar the name of the file is changed
-                if (not iconInfo['name']) or (not localName) or (localName != iconInfo['name']):
-                    shouldRemoveOld = True
-                    needToUploadNew = True
-            else:
-                shouldRemoveOld = True
-
-        if shouldRemoveOld:
+        local = self.chainedIcons.get(userId)
+        if not iconInfo['url']:
+            if local is None: return
             try:
                 self.personIconService.detachIcon(userId)
-                #self.metaInfoService.delete(localId)
+                self.chainedIcons.drop(userId)
             except InputError:
                 log.error('Can not remove old icon for chained user %s' % userId)
+            return
 
-        if needToUploadNew:
-            try:
-                iconContent = ChainedIconContent(iconInfo['url'], iconInfo['name'])
-                imageData = self.metaDataService.insert(userId, iconContent, 'http')
+        etag = local.etag if local is not None and local.url == iconInfo['url'] else None
+        try: icon = self._readIcon(iconInfo['url'], etag)
+        except (HTTPException, socket.error, ValueError) as e:
+            log.error('Can not read icon image data for chained user %s: %s' % (userId, e))
+            return
+        if icon is None: return
+        data, etag, contentType = icon
+
+        hash = sha256(data).hexdigest()
+        if local is not None and local.hash == hash:
+            self.chainedIcons.put(userId, local.metaData, iconInfo['url'], etag, hash)
+            return
+
+        try:
+            metaDataId = self.chainedIcons.find(hash)
+            if metaDataId is None:
+                imageData = self.metaDataService.insert(userId, ChainedIconContent(data, iconInfo['name'], contentType),
+                                                        'http')
                 if (not imageData) or (not imageData.Id):
                     return
-                self.personIconService.setIcon(userId, imageData.Id, False)
-            except InputError:
-                log.error('Can not upload icon for chained user %s' % userId)
-                
-                
+                metaDataId = imageData.Id
+            self.personIconService.setIcon(userId, metaDataId, False)
+            self.chainedIcons.put(userId, metaDataId, iconInfo['url'], etag, hash)
+        except InputError:
+            log.error('Can not upload icon for chained user %s' % userId)
+
+    def _readIcon(self, url, etag):
+        '''
+        Reads the icon data, conditionally if the ETag of the previous read is known.
+
+        @return: tuple(bytes, string|None, string|None)|None
+            The icon data, ETag and content type, None if the icon did not change.
+        '''
+        headers = {'User-Agent' : 'Magic Browser'}
+        if etag: headers['If-None-Match'] = etag
+        (scheme, netloc, path, query, fragment) = urlsplit(url)
+        resp = self._httpPool.request(urlunsplit((scheme or 'http', netloc, quote(path), quote(query), fragment)),
+                                      headers)
+        try:
+            if resp.status == 304: return
+            if resp.status != 200: raise ValueError('Icon response status %s' % resp.status)
+            data = resp.read(self.icon_max_size + 1)
+            if len(data) > self.icon_max_size: raise ValueError('Icon larger than %d bytes' % self.icon_max_size)
+        finally: resp.close()
+        return data, resp.getheader('ETag'), resp.getheader('Content-Type')
+
     def _readAuthor(self, url):
         
         (scheme, netloc, path, params, query, fragment) = urlparse(url)
         if not scheme: 
             url = urlunparse(('http', netloc, path, params, query, fragment))
         
-        request = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser', 'X-Filter' : '*,User.*,Source.*'})
+        headers = {'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser', 'X-Filter' : '*,User.*,Source.*'}
         
         try:
-            response = urlopen(request)
-        except (HTTPError, socket.error) as e:
+            response = self._httpPool.request(url, headers)
+        except (HTTPException, socket.error) as e:
             return None
         
         if str(response.status) != '200':
+            response.close()
             return None
         
         try:
@@ -482,14 +719,15 @@ class ChainedSyncProcess:
         if not scheme: 
             url = urlunparse(('http', netloc, path, params, query, fragment))
         
-        request = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser', 'X-Filter' : '*'})
+        headers = {'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser', 'X-Filter' : '*'}
         
         try:
-            response = urlopen(request)
-        except (HTTPError, socket.error) as e:
+            response = self._httpPool.request(url, headers)
+        except (HTTPException, socket.error) as e:
             return None
         
         if str(response.status) != '200':
+            response.close()
             return None
         
         try:
@@ -499,14 +737,15 @@ class ChainedSyncProcess:
             return None               
 
     def _readPublishedPostsUrl(self, url, field):
-        request = Request(url, headers={'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser'})
+        headers = {'Accept' : self.acceptType, 'Accept-Charset' : self.encodingType, 'User-Agent' : 'Magic Browser'}
 
         try:
-            response = urlopen(request)
-        except (HTTPError, socket.error) as e:
+            response = self._httpPool.request(url, headers)
+        except (HTTPException, socket.error) as e:
             return None
 
         if str(response.status) != '200':
+            response.close()
             return None
 
         try:
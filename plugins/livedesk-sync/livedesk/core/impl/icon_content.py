@@ -9,82 +9,39 @@ Created on August 19, 2013
 Content for icons of collaborators of chained blogs.
 '''
 
-import socket
-import logging
-from urllib.request import urlopen
 from ally.api.model import Content
-from urllib.error import HTTPError
-from ally.exception import InputError, Ref
-from ally.internationalization import _
-from urllib.request import Request
-from urllib.parse import quote, urlsplit, SplitResult, urlunsplit
-
-# --------------------------------------------------------------------
-
-log = logging.getLogger(__name__)
+from io import BytesIO
 
 # --------------------------------------------------------------------
 
 class ChainedIconContent(Content):
     '''
-    Simple remote icon content taking
+    Simple icon content over the icon data already downloaded from the chained blog, the data is downloaded before
+    archiving so that it can be compared with the icons already archived.
     '''
-    __slots__ = ('_url', '_response')
+    __slots__ = ('_data',)
 
-    def __init__(self, contentURL, fileName):
+    def __init__(self, data, fileName, contentType=None):
         '''
         Initialize the content.
 
-        @param contentURL: string
-            The URL of the icon to be downloaded.
+        @param data: bytes
+            The icon data.
         @param fileName: string
             The name of file under that the icon should be saved.
+        @param contentType: string|None
+            The content type of the icon.
         '''
-        Content.__init__(self, fileName, 'image', 'binary', 0)
-
-        (scheme, netloc, path, query, fragment) = urlsplit(contentURL if not isinstance(contentURL, Request) else contentURL.full_url)
-        if not scheme: scheme = 'http'
-        parsed = SplitResult(scheme, netloc, quote(path), quote(query), fragment)
-        if isinstance(contentURL, Request): contentURL.full_url = urlunsplit(parsed)
-        else: contentURL = urlunsplit(parsed)
+        assert isinstance(data, bytes), 'Invalid data %s' % data
+        Content.__init__(self, fileName, contentType or 'image', 'binary', len(data))
 
-        self._url = contentURL
-        self._response = None
+        self._data = BytesIO(data)
 
     def read(self, nbytes=None):
         '''
         @see: Content.read
         '''
-        if not self._response:
-            try: 
-                req = Request(self._url, headers={'User-Agent' : 'Magic Browser'})
-                self._response = urlopen(req)
-            except (HTTPError, socket.error) as e:
-                log.error('Can not read icon image data %s' % e)
-                raise InputError(Ref(_('Can not open icon URL'),))
-            if not self._response:
-                log.error('Can not read icon image data %s' % e)
-                raise InputError(Ref(_('Can not open icon URL'),))
-            if str(self._response.status) != '200':
-                raise InputError(Ref(_('Can not open icon URL'),))
-
-            self.type = self._response.getheader('Content-Type')
-            if not self.type:
-                self.type = 'image'
-            self.length = self._response.getheader('Content-Length')
-            if not self.length:
-                self.length = 0
-
-        if (not self._response) or self._response.closed:
-            return ''
-
-        try:
-            if nbytes:
-                return self._response.read(nbytes)
-            return self._response.read()
-        except (HTTPError, socket.error) as e:
-            log.error('Can not read icon image data %s' % e)
-            raise InputError(Ref(_('Can not read from icon URL'),))
+        return self._data.read(nbytes)
 
     def next(self):
         '''
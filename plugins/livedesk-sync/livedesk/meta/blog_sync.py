@@ -11,7 +11,7 @@ API implementation for liveblog sync.
 from sqlalchemy.schema import Column, ForeignKey, UniqueConstraint
 from livedesk.meta.blog import BlogMapped
 from sqlalchemy.dialects.mysql.base import INTEGER, BIGINT
-from sqlalchemy.types import DateTime, Boolean
+from sqlalchemy.types import DateTime, Boolean, String
 from livedesk.api.blog_sync import BlogSync
 from superdesk.meta.metadata_superdesk import Base
 from superdesk.source.meta.source import SourceMapped
@@ -32,3 +32,8 @@ class BlogSyncMapped(Base, BlogSync):
     CId = Column('id_change', BIGINT(unsigned=True))
     LastActivity = Column('last_activity', DateTime)
     Auto = Column('auto', Boolean, nullable=False)
+    postsURI = Column('posts_uri', String(1024))
+    # The published posts URI of the chained blog, discovered once by the chained sync.
+    postsETag = Column('posts_etag', String(255))
+    postsModified = Column('posts_modified', String(100))
+    # The validators of the last read published posts, used for the conditional requests of the chained sync.
@@ -0,0 +1,33 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk-sync
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the SQL alchemy meta for the icons of the chained blogs users.
+'''
+
+from sqlalchemy.schema import Column, ForeignKey
+from sqlalchemy.types import String
+from superdesk.media_archive.meta.meta_data import MetaDataMapped
+from superdesk.meta.metadata_superdesk import Base
+from superdesk.user.meta.user import UserMapped
+
+# --------------------------------------------------------------------
+
+class ChainedIconMapped(Base):
+    '''
+    Provides the mapping for the icons of the chained blogs users, it keeps for each user where the icon was read from
+    and the hash of its content. This is not a REST model.
+    '''
+    __tablename__ = 'livedesk_chained_icon'
+    __table_args__ = dict(mysql_engine='InnoDB', mysql_charset='utf8')
+
+    user = Column('fk_user_id', ForeignKey(UserMapped.Id, ondelete='CASCADE'), primary_key=True)
+    metaData = Column('fk_metadata_id', ForeignKey(MetaDataMapped.Id, ondelete='CASCADE'), nullable=False)
+    url = Column('url', String(1024), nullable=False)
+    etag = Column('etag', String(255))
+    hash = Column('hash', String(64), nullable=False, index=True)
+    # The SHA-256 of the icon content in hexadecimal.
@@ -0,0 +1,15 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk-sync
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the unit tests.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
@@ -0,0 +1,82 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk-sync
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the unit testing for the chained posts author cache.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from livedesk.core.impl.author_cache import AuthorCache, cidOf
+import unittest
+
+# --------------------------------------------------------------------
+
+class TestAuthorCache(unittest.TestCase):
+
+    def testCached(self):
+        cache = AuthorCache(60, 10)
+        self.assertIsNone(cache.get('user/1'))
+        cache.put('user/1', 1)
+        self.assertEqual(1, cache.get('user/1'))
+        self.assertEqual(1, cache.get('user/1', None))
+
+    def testExpired(self):
+        cache = AuthorCache(-1, 10)
+        cache.put('user/1', 1)
+        self.assertIsNone(cache.get('user/1'))
+
+    def testCid(self):
+        cache = AuthorCache(60, 10)
+        cache.put('user/1', 1, 3)
+        self.assertEqual(1, cache.get('user/1', 2))
+        self.assertEqual(1, cache.get('user/1', 3))
+        self.assertIsNone(cache.get('user/1', 4), 'The value of a changed user is provided')
+        self.assertIsNone(cache.get('user/1'), 'The value of a changed user is kept')
+
+        cache.put('user/2', 2)
+        self.assertEqual(2, cache.get('user/2'))
+        self.assertIsNone(cache.get('user/2', 1), 'The value without a change id is provided for a known change id')
+
+    def testLeastRecentlyUsed(self):
+        cache = AuthorCache(60, 2)
+        cache.put('user/1', 1)
+        cache.put('user/2', 2)
+        self.assertEqual(1, cache.get('user/1'))
+        cache.put('user/3', 3)
+        self.assertIsNone(cache.get('user/2'))
+        self.assertEqual(1, cache.get('user/1'))
+        self.assertEqual(3, cache.get('user/3'))
+
+    def testDisabled(self):
+        cache = AuthorCache(60, 0)
+        cache.put('user/1', 1)
+        self.assertIsNone(cache.get('user/1'))
+
+    def testDrop(self):
+        cache = AuthorCache(60, 10)
+        cache.put('user/1', 1)
+        cache.drop('user/1')
+        cache.drop('user/2')
+        self.assertIsNone(cache.get('user/1'))
+
+    def testCidOf(self):
+        self.assertEqual(5, cidOf({'Cid': '5'}))
+        self.assertEqual(5, cidOf({'Cid': 5}))
+        self.assertIsNone(cidOf({'Cid': 'x'}))
+        self.assertIsNone(cidOf({'Cid': None}))
+        self.assertIsNone(cidOf({}))
+        self.assertIsNone(cidOf(None))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
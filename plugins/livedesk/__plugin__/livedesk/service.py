@@ -12,12 +12,15 @@ Contains the services for livedesk.
 from ..cdm import contentDeliveryManager
 from ..plugin.registry import addService
 from ..superdesk.db_superdesk import bindSuperdeskSession, \
-    bindSuperdeskValidations
+    bindSuperdeskValidations, alchemySessionCreator
 from ally.cdm.spec import ICDM
-from ally.container import support, bind, ioc, app
+from ally.container import support, bind, ioc, app, wire
 from ally.internationalization import NC_
 from itertools import chain
-from livedesk.core.spec import IBlogCollaboratorGroupCleanupService
+from livedesk.core.impl.change_id import ChangeIdAllocator
+from livedesk.core.impl.last_cid import LastCIdTracker
+from livedesk.core.spec import IBlogCollaboratorGroupCleanupService, \
+    IChangeIdAllocator, ILastCIdTracker, IBlogPostIngestService
 from livedesk.impl.blog_collaborator import CollaboratorSpecification
 from sched import scheduler
 from threading import Thread
@@ -31,7 +34,8 @@ def binders(): return [bindSuperdeskSession]
 @ioc.entity
 def bindersService(): return list(chain((bindSuperdeskValidations,), binders()))
 
-bind.bindToEntities('livedesk.impl.**.*Alchemy', IBlogCollaboratorGroupCleanupService, binders=binders)
+bind.bindToEntities('livedesk.impl.**.*Alchemy', IBlogCollaboratorGroupCleanupService, IBlogPostIngestService,
+                    binders=binders)
 support.createEntitySetup('livedesk.impl.**.*')
 
 support.listenToEntities(SERVICES, listeners=addService(bindersService))
@@ -57,6 +61,22 @@ def collaboratorSpecification() -> CollaboratorSpecification:
 
 # --------------------------------------------------------------------
 
+@wire.wire(ChangeIdAllocator)
+@ioc.entity
+def changeIdAllocator() -> IChangeIdAllocator:
+    b = ChangeIdAllocator()
+    b.sessionCreator = alchemySessionCreator()
+    return b
+
+@wire.wire(LastCIdTracker)
+@ioc.entity
+def lastCIdTracker() -> ILastCIdTracker:
+    b = LastCIdTracker()
+    b.sessionCreator = alchemySessionCreator()
+    return b
+
+# --------------------------------------------------------------------
+
 @ioc.config
 def perform_group_cleanup() -> bool:
     '''
@@ -17,10 +17,14 @@ from internationalization.api.source import TYPE_PYTHON, TYPE_JAVA_SCRIPT, TYPE_
 from ally.container import app, support
 from ally.container.support import entityFor
 from livedesk.api.blog_theme import IBlogThemeService, QBlogTheme, BlogTheme
+from livedesk.core.impl.change_id import SEQUENCE_CID
 from livedesk.meta.blog_media import BlogMediaTypeMapped
+from livedesk.meta.blog_post import BlogPostMapped, BlogPostEntry
+from livedesk.meta.sequence import SequenceMapped
+from sqlalchemy.engine.reflection import Inspector
 from sqlalchemy.exc import ProgrammingError, OperationalError
 from sqlalchemy.orm.session import Session
-from sqlalchemy.sql.expression import exists
+from sqlalchemy.sql.expression import exists, func
 from superdesk.collaborator.api.collaborator import ICollaboratorService, \
     Collaborator
 from superdesk.source.api.source import ISourceService, QSource, Source
@@ -36,6 +40,11 @@ from superdesk.verification.meta.status import VerificationStatusMapped
 from superdesk.general_setting.meta.general_setting import GeneralSettingMapped
 from superdesk.general_setting.api.general_setting import GeneralSetting,\
     IGeneralSettingService
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------
 
@@ -86,6 +95,46 @@ def upgradeBlogPostCid():
     session.commit()
     session.close()
 
+@app.populate(priority=PRIORITY_LAST)
+def upgradeBlogPostCidSequence():
+    creator = alchemySessionCreator()
+    session = creator()
+    assert isinstance(session, Session)
+
+    # the change ids sequence has to start after the change ids already assigned
+    if not session.query(exists().where(SequenceMapped.name == SEQUENCE_CID)).scalar():
+        last = session.query(func.max(BlogPostMapped.CId)).scalar()
+        session.add(SequenceMapped(name=SEQUENCE_CID, value=last or 0))
+
+    session.commit()
+    session.close()
+
+@app.populate(priority=PRIORITY_LAST)
+def upgradeBlogPostIndexes():
+    creator = alchemySessionCreator()
+    session = creator()
+    assert isinstance(session, Session)
+
+    # the indexes are created by the tables creation only for new databases
+    connection, tables = session.connection(), (BlogPostEntry.__table__, PostMapped.__table__)
+    for table in tables:
+        existing = {index['name'] for index in Inspector.from_engine(connection).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing: continue
+            try:
+                index.create(connection)
+                log.info('Created index %s on %s', index.name, table.name)
+            except (ProgrammingError, OperationalError): log.exception('Cannot create index %s', index.name)
+
+    session.commit()
+
+    for table in tables:
+        existing = {index['name'] for index in Inspector.from_engine(session.connection()).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing: log.error('Missing index %s on %s', index.name, table.name)
+
+    session.close()
+
 # --------------------------------------------------------------------
 
 @app.populate
@@ -79,9 +79,15 @@ class IterPost(IterPart):
     '''
     The post iterable that provides extended information on the posts collection.
     The offsetMore parameter was removed to limit the query count that the client generates otherwise.
+    The total of the listings with criteria can be configured to be counted only up to a maximum, above it the total is
+    estimated.
+    The next cursor continues the listing after the provided posts without using an offset, it is provided only if there
+    might be more posts and the listing is not ordered or searched by criteria.
     '''
     lastCId = int
     sinceLastCId = int
+    estimated = bool
+    nextCursor = str
 
 # --------------------------------------------------------------------
 
@@ -99,16 +105,28 @@ class IBlogPostService:
 
     @call(webName='Published')
     def getPublished(self, blogId:Blog, typeId:PostType=None, creatorId:User=None, authorId:Collaborator=None, thumbSize:str=None,
-                     offset:int=None, limit:int=None, detailed:bool=True, q:QBlogPostPublished=None) -> Iter(BlogPost):
+                     offset:int=None, limit:int=None, cursor:str=None, detailed:bool=True,
+                     q:QBlogPostPublished=None) -> Iter(BlogPost):
         '''
-        Provides all the blogs published posts. The detailed iterator will return a @see: IterPost.
+        Provides all the blogs published posts. The detailed iterator will return a @see: IterPost, the cursor continues
+        the listing from the iterator next cursor.
+        '''
+
+    @call(webName='PublishedWait')
+    def getPublishedWait(self, blogId:Blog, typeId:PostType=None, creatorId:User=None, authorId:Collaborator=None,
+                         thumbSize:str=None, timeout:int=None, offset:int=None, limit:int=None, detailed:bool=True,
+                         q:QBlogPostPublished=None) -> Iter(BlogPost):
+        '''
+        Provides the blogs published posts same as @see: getPublished, but if the query has the cId since criteria the
+        response is held until the blog has posts changed after that change id or until the timeout in seconds expires.
         '''
 
     @call(webName='Unpublished')
     def getUnpublished(self, blogId:Blog, typeId:PostType=None, creatorId:User=None, authorId:Collaborator=None, thumbSize:str=None,
-                       offset:int=None, limit:int=None, detailed:bool=True, q:QBlogPostUnpublished=None) -> Iter(BlogPost):
+                       offset:int=None, limit:int=None, cursor:str=None, detailed:bool=True,
+                       q:QBlogPostUnpublished=None) -> Iter(BlogPost):
         '''
-        Provides all the unpublished blogs posts.
+        Provides all the unpublished blogs posts, the cursor continues the listing from the @see: IterPost next cursor.
         '''
         
     @call(webName='SourceUnpublished')
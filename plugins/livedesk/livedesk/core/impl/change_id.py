@@ -0,0 +1,127 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the blog post change id allocator.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from livedesk.core.spec import IChangeIdAllocator
+from livedesk.meta.blog_post import BlogPostMapped
+from livedesk.meta.sequence import SequenceMapped
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql import functions as fn
+from threading import Lock
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+SEQUENCE_CID = 'blog_post_change'
+# The name of the sequence that keeps the blog post change ids.
+
+# --------------------------------------------------------------------
+
+@injected
+class ChangeIdAllocator(IChangeIdAllocator):
+    '''
+    Implementation for @see: IChangeIdAllocator that keeps the last reserved change id in the livedesk sequence table.
+    The change ids are reserved in blocks in a separate transaction, so the sequence row is updated once per block, and
+    then handed out from memory without any database access. Each process hands out increasing change ids, but the
+    change ids of processes that write posts at the same time interleave by block.
+    '''
+
+    cid_block_size = 50; wire.config('cid_block_size', doc='''
+    The number of blog post change ids that a process reserves at once, the bigger the block the fewer sequence updates.
+    If several processes write posts at the same time a process can hand out change ids lower than the ones already
+    handed out by another process, so the clients that poll for changes since a change id can miss posts, set it to 1
+    in order to have the change ids increasing across processes.''')
+    sessionCreator = None
+    # The session creator used for the sequence transactions, it has to be set.
+
+    def __init__(self):
+        '''
+        Construct the change id allocator.
+        '''
+        assert isinstance(self.cid_block_size, int) and self.cid_block_size > 0, \
+        'Invalid change id block size %s' % self.cid_block_size
+        assert callable(self.sessionCreator), 'Invalid session creator %s' % self.sessionCreator
+
+        self._lock = Lock()
+        # no change id is reserved yet, so the first change id always reserves a block after the sequence value
+        self._next, self._last = 1, 0
+
+    def nextCId(self, session=None, count=1):
+        '''
+        @see: IChangeIdAllocator.nextCId
+        '''
+        assert isinstance(count, int) and count > 0, 'Invalid count %s' % count
+        if session is not None and session.bind.dialect.name == 'sqlite':
+            # SQLite locks the database for the ongoing transaction, so no other transaction can reserve change ids
+            return self._reserve(session, count) - count + 1
+
+        with self._lock:
+            if self._next + count - 1 > self._last:
+                # the change ids left in the block are dropped if there are not enough for the count
+                size = max(count, self.cid_block_size)
+                last = self._reserveBlock(size)
+                assert last - size >= self._last, 'Reserved change ids %s to %s before the change id %s' % \
+                (last - size + 1, last, self._last)
+                self._next, self._last = last - size + 1, last
+                log.debug('Reserved change ids %s to %s', self._next, self._last)
+
+            cid = self._next
+            self._next += count
+            return cid
+
+    # ----------------------------------------------------------------
+
+    def _reserveBlock(self, size):
+        '''
+        Reserves the size of change ids in a separate transaction.
+
+        @return: integer
+            The last reserved change id.
+        '''
+        session = self.sessionCreator()
+        assert isinstance(session, Session)
+        try:
+            try: last = self._reserve(session, size)
+            except IntegrityError:
+                # The sequence has been created by another process in the meantime
+                session.rollback()
+                last = self._reserve(session, size)
+            session.commit()
+            return last
+        except:
+            session.rollback()
+            raise
+        finally: session.close()
+
+    def _current(self, session):
+        '''
+        Provides the last change id reserved by any process.
+        '''
+        return session.query(SequenceMapped.value).filter(SequenceMapped.name == SEQUENCE_CID).scalar()
+
+    def _reserve(self, session, count):
+        '''
+        Reserves the count of change ids in the provided session.
+
+        @return: integer
+            The last reserved change id.
+        '''
+        sql = session.query(SequenceMapped).filter(SequenceMapped.name == SEQUENCE_CID)
+        if not sql.update({SequenceMapped.value: SequenceMapped.value + count}, synchronize_session=False):
+            last = session.query(fn.max(BlogPostMapped.CId)).scalar()
+            session.add(SequenceMapped(name=SEQUENCE_CID, value=(last or 0) + count))
+            session.flush()
+
+        return self._current(session)
@@ -0,0 +1,164 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the tracker for the last blog post change ids.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from livedesk.core.spec import ILastCIdTracker
+from livedesk.meta.blog_post import BlogPostMapped
+from sqlalchemy import event
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql import functions as fn
+from threading import Condition
+from weakref import WeakKeyDictionary
+import logging
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+@injected
+class LastCIdTracker(ILastCIdTracker):
+    '''
+    Implementation for @see: ILastCIdTracker that keeps the last change id of each blog in memory. The last change ids
+    of all blogs are loaded with one query on the first use, afterwards the change ids assigned in this process are
+    applied when their transaction commits. Since other processes also change posts, a blog last change id is read again
+    from the database when it has not been checked for longer than the refresh interval.
+    The callers that wait for a blog change are woken when a change of this process is committed, the changes of other
+    processes are noticed at the refresh interval.
+    '''
+
+    last_cid_refresh = 2; wire.config('last_cid_refresh', doc='''
+    The number of seconds after which the last change id of a blog is checked against the database, this is the longest
+    time in which the posts changed by other processes are not reflected in the last change id, and so in the published
+    posts cache, the posts totals and the waiting requests. If several processes write posts set it to 0 in order to
+    check the database on every use.''')
+    sessionCreator = None
+    # The session creator used for checking the blog changes while waiting, it has to be set.
+
+    def __init__(self):
+        '''
+        Construct the last change id tracker.
+        '''
+        assert isinstance(self.last_cid_refresh, (int, float)) and self.last_cid_refresh >= 0, \
+        'Invalid last change id refresh %s' % self.last_cid_refresh
+        assert callable(self.sessionCreator), 'Invalid session creator %s' % self.sessionCreator
+
+        self._lock = Condition()
+        self._blogs = None
+        self._others = {}
+        self._pending = WeakKeyDictionary()
+
+        event.listen(Session, 'after_commit', self._committed)
+        event.listen(Session, 'after_rollback', self._rolledback)
+
+    def lastCId(self, session, blogId):
+        '''
+        @see: ILastCIdTracker.lastCId
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        if self._blogs is None: self._warmUp(session)
+
+        with self._lock: cId, checked = self._blogs.get(blogId, (None, 0))
+        if time.time() - checked < self.last_cid_refresh: return cId
+
+        last = session.query(fn.max(BlogPostMapped.CId)).filter(BlogPostMapped.Blog == blogId).scalar()
+        with self._lock:
+            cId, _checked = self._blogs.get(blogId, (None, 0))
+            if cId is None or (last is not None and last > cId): cId = last
+            self._blogs[blogId] = (cId, time.time())
+        return cId
+
+    def lastCIdFor(self, session, key, sql):
+        '''
+        @see: ILastCIdTracker.lastCIdFor
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        assert isinstance(key, tuple), 'Invalid key %s' % key
+        assert callable(sql), 'Invalid sql %s' % sql
+
+        with self._lock: cId, checked = self._others.get(key, (None, 0))
+        if time.time() - checked < self.last_cid_refresh: return cId
+
+        cId = sql(session)
+        with self._lock: self._others[key] = (cId, time.time())
+        return cId
+
+    def waitChange(self, blogId, cId, timeout):
+        '''
+        @see: ILastCIdTracker.waitChange
+        '''
+        assert isinstance(cId, int), 'Invalid change id %s' % cId
+        assert isinstance(timeout, (int, float)), 'Invalid timeout %s' % timeout
+
+        deadline = time.time() + timeout
+        while True:
+            session = self.sessionCreator()
+            assert isinstance(session, Session)
+            try: last = self.lastCId(session, blogId)
+            finally:
+                session.rollback()
+                session.close()
+            if last is not None and last > cId: return True
+
+            remaining = deadline - time.time()
+            if remaining <= 0: return False
+            with self._lock:
+                last, _checked = self._blogs.get(blogId, (None, 0))
+                if last is None or last <= cId: self._lock.wait(min(remaining, max(self.last_cid_refresh, 0.1)))
+
+    def changed(self, session, blogId, cId):
+        '''
+        @see: ILastCIdTracker.changed
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        assert isinstance(cId, int), 'Invalid change id %s' % cId
+        with self._lock:
+            pending = self._pending.get(session)
+            if pending is None: pending = self._pending[session] = {}
+            if pending.get(blogId, 0) < cId: pending[blogId] = cId
+
+    # ----------------------------------------------------------------
+
+    def _warmUp(self, session):
+        '''
+        Loads the last change ids of all the blogs.
+        '''
+        sql = session.query(BlogPostMapped.Blog, fn.max(BlogPostMapped.CId)).group_by(BlogPostMapped.Blog)
+        checked = time.time()
+        blogs = {blogId: (cId, checked) for blogId, cId in sql.all()}
+        with self._lock:
+            if self._blogs is None:
+                self._blogs = blogs
+                log.info('Loaded the last change ids of %s blogs', len(blogs))
+
+    def _committed(self, session):
+        '''
+        Applies the change ids of the committed session.
+        '''
+        with self._lock:
+            pending = self._pending.pop(session, None)
+            if not pending: return
+            for blogId, cId in pending.items():
+                if self._blogs is not None:
+                    last, checked = self._blogs.get(blogId, (None, 0))
+                    if last is None or last < cId: self._blogs[blogId] = (cId, checked)
+            # The change ids of the other posts sets are unknown, they need to be read again
+            self._others.clear()
+            self._lock.notify_all()
+
+    def _rolledback(self, session):
+        '''
+        Drops the change ids of the rolled back session.
+        '''
+        with self._lock: self._pending.pop(session, None)
@@ -0,0 +1,185 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the ordering engine for the posts that are kept in a container (blog, blog type).
+'''
+
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql import functions as fn
+from sqlalchemy.sql.expression import case
+from sqlalchemy.sql.operators import desc_op
+from threading import Lock
+import logging
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+class OrderingEngine:
+    '''
+    Provides the orders for posts, the posts are ordered by a float value and a post is placed between two other posts by
+    taking the middle of their orders. When the orders of neighbour posts get too close all the container posts are
+    renumbered with one batched update.
+    The highest order given in each container is kept and new posts get the top order from it. The highest order in the
+    database is read again only once the kept order is older than the refresh interval, so the orders given by other
+    processes are picked up within that interval.
+    '''
+
+    def __init__(self, mapped, identifier, container, order, cid=None, nextCIds=None, minGap=1e-6, refresh=2):
+        '''
+        Construct the ordering engine.
+
+        @param mapped: class
+            The mapped class of the post entries table.
+        @param identifier: InstrumentedAttribute
+            The post identifier column.
+        @param container: InstrumentedAttribute
+            The container identifier column, the posts are ordered within the container.
+        @param order: InstrumentedAttribute
+            The float order column.
+        @param cid: InstrumentedAttribute|None
+            The change id column to update for the renumbered posts, None if the posts have no change ids.
+        @param nextCIds: callable(containerId, count)|None
+            Provides the first of count consecutive change ids for the container posts, required if a change id column
+            is provided.
+        @param minGap: float
+            The minimum difference between the orders of neighbour posts, below it the container posts are renumbered.
+        @param refresh: integer|float
+            The number of seconds the highest order of a container is kept before it is read again from the database.
+        '''
+        assert cid is None or callable(nextCIds), 'Invalid next change ids %s' % nextCIds
+        assert isinstance(minGap, float) and minGap > 0, 'Invalid minimum gap %s' % minGap
+        assert isinstance(refresh, (int, float)) and refresh >= 0, 'Invalid refresh %s' % refresh
+
+        self.mapped = mapped
+        self.identifier = identifier
+        self.container = container
+        self.order = order
+        self.cid = cid
+        self.nextCIds = nextCIds
+        self.minGap = minGap
+        self.refresh = refresh
+
+        self._lock = Lock()
+        self._highest = {}
+        # The highest order and the time it was read from the database, by container id
+
+    def nextOrder(self, session, containerId, count=1):
+        '''
+        Provides the order that places a post on top of the container posts, or the first of count consecutive orders
+        that place posts on top of the container posts, each above the previous one.
+
+        @param session: Session
+            The session to use.
+        @param containerId: integer
+            The container identifier.
+        @param count: integer
+            The number of orders to reserve.
+        @return: float
+            The (first) top order.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        assert isinstance(count, int) and count > 0, 'Invalid count %s' % count
+        with self._lock:
+            highest, checked = self._highest.get(containerId, (None, None))
+            if highest is not None and time.time() - checked <= self.refresh:
+                self._highest[containerId] = highest + count, checked
+                return highest + 1
+
+        stored = session.query(fn.max(self.order)).filter(self.container == containerId).scalar() or 0
+        with self._lock:
+            highest = max(self._highest.get(containerId, (0, None))[0], stored)
+            self._highest[containerId] = highest + count, time.time()
+            return highest + 1
+
+    def orderNear(self, session, containerId, postId, refPostId, above):
+        '''
+        Provides the order that places the post right above or below the reference post, if the reference post order
+        is too close to its neighbour order the container posts are renumbered first.
+
+        @param session: Session
+            The session to use.
+        @param containerId: integer
+            The container identifier.
+        @param postId: integer
+            The identifier of the post to be placed.
+        @param refPostId: integer
+            The identifier of the reference post.
+        @param above: boolean
+            True to place the post above (higher order than) the reference post, False to place it below.
+        @return: float|None
+            The order for the post, None if the reference post is not in the container.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        order, neighbour = self._neighbours(session, containerId, postId, refPostId, above)
+        if order is None: return None
+
+        if neighbour is not None and abs(order - neighbour) < self.minGap:
+            self.rebalance(session, containerId)
+            order, neighbour = self._neighbours(session, containerId, postId, refPostId, above)
+
+        if neighbour is not None: return (order + neighbour) / 2
+        if not above: return order - 1
+
+        order += 1
+        with self._lock:
+            highest, checked = self._highest.get(containerId, (None, None))
+            if highest is not None and highest < order: self._highest[containerId] = order, checked
+        return order
+
+    def rebalance(self, session, containerId):
+        '''
+        Renumbers the container posts with consecutive orders keeping the current order, only the posts that have the
+        order changed are updated and have a new change id assigned.
+
+        @param session: Session
+            The session to use.
+        @param containerId: integer
+            The container identifier.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        session.flush()
+
+        sql = session.query(self.identifier, self.order).filter(self.container == containerId)
+        sql = sql.order_by(self.order, self.identifier)
+
+        orders, position = {}, 0
+        for position, (identifier, order) in enumerate(sql.all(), 1):
+            if order != position: orders[identifier] = position
+
+        if orders:
+            values = {self.order: case(value=self.identifier, whens=orders)}
+            if self.cid is not None:
+                cid = self.nextCIds(containerId, len(orders))
+                values[self.cid] = case(value=self.identifier, whens={identifier: cid + k
+                                                                       for k, identifier in enumerate(sorted(orders))})
+            sql = session.query(self.mapped).filter(self.identifier.in_(list(orders)))
+            sql.update(values, synchronize_session=False)
+            # The loaded posts have now outdated orders and change ids
+            session.expire_all()
+            log.info('Renumbered %s posts of container %s', len(orders), containerId)
+
+        with self._lock: self._highest[containerId] = position, time.time()
+
+    # ----------------------------------------------------------------
+
+    def _neighbours(self, session, containerId, postId, refPostId, above):
+        '''
+        Provides the reference post order and the order of its neighbour on the requested side.
+        '''
+        sql = session.query(self.order).filter(self.container == containerId).filter(self.identifier == refPostId)
+        order = sql.scalar()
+        if order is None: return None, None
+
+        sql = session.query(self.order).filter(self.container == containerId).filter(self.identifier != postId)
+        if above: sql = sql.filter(self.order > order).order_by(self.order)
+        else: sql = sql.filter(self.order < order).order_by(desc_op(self.order))
+        return order, sql.limit(1).scalar()
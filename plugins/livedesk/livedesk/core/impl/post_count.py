@@ -0,0 +1,113 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the counting of the blog posts for the detailed posts listings.
+'''
+
+from livedesk.core.impl.timeline_cache import TimelineCache
+from livedesk.meta.blog_post import BlogPostMapped
+from sqlalchemy.orm.query import Query
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql import functions as fn
+from sqlalchemy.sql.expression import case
+from superdesk.post.core.impl.count import countFor
+
+# --------------------------------------------------------------------
+
+STATE_PUBLISHED = 1
+# The state of the published posts that are listed in the blog timeline.
+STATE_UNPUBLISHED = 2
+# The state of the posts that are not published or deleted.
+STATE_DELETED = 3
+# The state of the deleted posts that are not published.
+STATE_OTHER = 0
+# The state of the posts that are not in any of the listings without criteria.
+
+# --------------------------------------------------------------------
+
+class PostCounter:
+    '''
+    Provides the totals for the blog posts listings. The number of posts in each state of a blog is read with one grouped
+    query and kept until the last change id of the blog changes, so every post change refreshes the counters once instead
+    of counting for every request. The totals of the listings with criteria are kept the same way per query, and are
+    counted only up to a maximum, above it the total is estimated.
+    '''
+
+    def __init__(self, maxEntries, maximum):
+        '''
+        Construct the post counter.
+
+        @param maxEntries: integer
+            The maximum number of cached counts.
+        @param maximum: integer
+            The maximum number of posts counted for a listing with criteria, 0 to count all the posts.
+        '''
+        assert isinstance(maximum, int) and maximum >= 0, 'Invalid maximum %s' % maximum
+
+        self.maximum = maximum
+        self._counts = TimelineCache(maxEntries)
+
+    def countState(self, session, blogId, lastCId, state):
+        '''
+        Provides the number of blog posts in the state.
+
+        @param session: Session
+            The session to use.
+        @param blogId: integer
+            The blog id.
+        @param lastCId: integer|None
+            The last change id of the blog posts.
+        @param state: integer
+            One of the STATE_* values.
+        @return: integer
+            The number of posts.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        key = (blogId, lastCId)
+        states = self._counts.get(key)
+        if states is None:
+            stateOf = case([((BlogPostMapped.DeletedOn == None) & (BlogPostMapped.PublishedOn != None) &
+                             (BlogPostMapped.WasPublished == True), STATE_PUBLISHED),
+                            ((BlogPostMapped.DeletedOn == None) & (BlogPostMapped.PublishedOn == None), STATE_UNPUBLISHED),
+                            ((BlogPostMapped.DeletedOn != None) & (BlogPostMapped.PublishedOn == None), STATE_DELETED)],
+                           else_=STATE_OTHER)
+            sql = session.query(stateOf, fn.count(BlogPostMapped.Id)).filter(BlogPostMapped.Blog == blogId)
+            states = dict(sql.group_by(stateOf).all())
+            self._counts.put(key, states, 1)
+        return states.get(state, 0)
+
+    def count(self, key, lastCId, sql):
+        '''
+        Provides the number of posts of the listing query.
+
+        @param key: object
+            The key of the posts set that the query is made on, usually the blog id.
+        @param lastCId: integer|None
+            The last change id of the posts set.
+        @param sql: Query
+            The distinct listing query.
+        @return: tuple(integer, boolean)
+            The number of posts and True if the number is estimated.
+        '''
+        assert isinstance(sql, Query), 'Invalid query %s' % sql
+        statement = sql.statement.compile()
+        key = (key, lastCId, str(statement), tuple(sorted(statement.params.items())))
+        total = self._counts.get(key)
+        if total is None:
+            total = countFor(sql, self.maximum)
+            self._counts.put(key, total, 1)
+        return total
+
+    def invalidate(self, key):
+        '''
+        Drops the counts of the posts set.
+
+        @param key: object
+            The key of the posts set, usually the blog id.
+        '''
+        self._counts.invalidate(key)
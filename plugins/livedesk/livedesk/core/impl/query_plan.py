@@ -0,0 +1,108 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the query plans of the SQL statements, used for finding the queries that scan whole tables.
+'''
+
+from sqlalchemy import event
+import re
+
+# --------------------------------------------------------------------
+
+REGEX_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(?!SUBQUERY|CONSTANT)(\w+)(?:(?! USING ).)*$')
+# The regex used for finding the tables scanned without an index in the SQLite query plans.
+
+# --------------------------------------------------------------------
+
+def explain(connection, statement, parameters):
+    '''
+    Provides the query plan of the statement.
+
+    @param connection: Connection
+        The connection to explain the statement on.
+    @param statement: string
+        The SQL statement as sent to the database.
+    @param parameters: tuple|list|dictionary
+        The statement parameters.
+    @return: list[dictionary{string: object}]
+        The query plan rows as provided by the database, by column name.
+    '''
+    if connection.dialect.name == 'sqlite': sql = 'EXPLAIN QUERY PLAN %s'
+    else: sql = 'EXPLAIN %s'
+    result = connection.connection.cursor()
+    try:
+        result.execute(sql % statement, parameters)
+        names = [column[0] for column in result.description]
+        return [dict(zip(names, row)) for row in result.fetchall()]
+    finally: result.close()
+
+def fullScans(connection, statement, parameters):
+    '''
+    Provides the tables that the statement reads completely.
+
+    @param connection: Connection
+        The connection to explain the statement on.
+    @param statement: string
+        The SQL statement as sent to the database.
+    @param parameters: tuple|list|dictionary
+        The statement parameters.
+    @return: list[string]
+        The names of the tables scanned without an index.
+    '''
+    if connection.dialect.name not in ('sqlite', 'mysql'): return []
+
+    scanned = []
+    for row in explain(connection, statement, parameters):
+        if connection.dialect.name == 'sqlite':
+            match = REGEX_SQLITE_SCAN.match(str(row.get('detail', '')))
+            if match: scanned.append(match.group(1))
+        elif row.get('type') == 'ALL': scanned.append(row.get('table'))
+    return scanned
+
+def captureQueries(engine, call, table=None):
+    '''
+    Provides the statements executed by the call on the engine.
+
+    @param engine: Engine
+        The engine to capture the statements on.
+    @param call: callable()
+        The call that executes the statements.
+    @param table: string|None
+        If provided only the statements that use the table are captured.
+    @return: list[tuple(string, object)]
+        The captured statements and parameters, in the order they have been executed.
+    '''
+    assert callable(call), 'Invalid call %s' % call
+    assert table is None or isinstance(table, str), 'Invalid table %s' % table
+
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and (table is None or table in statement): captured.append((statement, parameters))
+        return statement, parameters
+    # the listener is registered with retval so it is not wrapped and can be removed once the queries are captured
+    event.listen(engine, 'before_cursor_execute', capture, retval=True)
+    try: call()
+    finally:
+        # event.remove does not handle the engine events in SQLAlchemy 0.7, the listener is removed from the dispatch
+        engine.dispatch.before_cursor_execute.remove(capture, engine)
+    return captured
+
+def adviseQueries(connection, queries):
+    '''
+    Provides the queries that read whole tables.
+
+    @param connection: Connection
+        The connection to explain the queries on.
+    @param queries: Iterable(tuple(string, object))
+        The statements and parameters to explain, as provided by captureQueries.
+    @return: Iterable(tuple(string, list[string], list[dictionary{string: object}]))
+        The statement, the tables scanned without an index and the query plan of each query with full scans.
+    '''
+    for statement, parameters in queries:
+        scanned = fullScans(connection, statement, parameters)
+        if scanned: yield statement, scanned, explain(connection, statement, parameters)
@@ -0,0 +1,100 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the cache for the blog timeline responses.
+'''
+
+from collections import OrderedDict
+from threading import Lock
+
+# --------------------------------------------------------------------
+
+class TimelineCache:
+    '''
+    Least recently used cache for the blog timeline responses. The keys have to be tuples that start with the blog id,
+    so that all the entries of a blog can be dropped when the blog posts change. The cache keeps the total size of the
+    entries below the maximum size, the size of an entry is provided by the caller.
+    '''
+
+    def __init__(self, maxSize):
+        '''
+        Construct the timeline cache.
+
+        @param maxSize: integer
+            The maximum total size of the cached entries, 0 to disable the cache.
+        '''
+        assert isinstance(maxSize, int) and maxSize >= 0, 'Invalid maximum size %s' % maxSize
+
+        self.maxSize = maxSize
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._keys = {}
+        self._size = 0
+
+    def get(self, key):
+        '''
+        Provides the cached value for the key.
+
+        @param key: tuple
+            The key that has the blog id as the first element.
+        @return: object|None
+            The cached value, None if there is no value for the key.
+        '''
+        assert isinstance(key, tuple) and key, 'Invalid key %s' % key
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value, size):
+        '''
+        Caches the value for the key, the least recently used entries are dropped in order to keep the size limit.
+
+        @param key: tuple
+            The key that has the blog id as the first element.
+        @param value: object
+            The value to cache.
+        @param size: integer
+            The size of the value.
+        '''
+        assert isinstance(key, tuple) and key, 'Invalid key %s' % key
+        assert isinstance(size, int) and size >= 0, 'Invalid size %s' % size
+        if size > self.maxSize: return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (size, value)
+            self._keys.setdefault(key[0], set()).add(key)
+            self._size += size
+
+            while self._size > self.maxSize: self._remove(next(iter(self._entries)))
+
+    def invalidate(self, blogId):
+        '''
+        Drops all the cached entries for the blog.
+
+        @param blogId: integer
+            The blog id.
+        '''
+        with self._lock:
+            for key in list(self._keys.get(blogId, ())): self._remove(key)
+
+    # ----------------------------------------------------------------
+
+    def _remove(self, key):
+        '''
+        Removes the entry for the key, it has to be called while locked.
+        '''
+        entry = self._entries.pop(key, None)
+        if entry is None: return
+        self._size -= entry[0]
+
+        keys = self._keys[key[0]]
+        keys.discard(key)
+        if not keys: del self._keys[key[0]]
@@ -23,3 +23,146 @@ class IBlogCollaboratorGroupCleanupService(metaclass=abc.ABCMeta):
         '''
         Clean the expired blog collaborator groups.
         '''
+
+# --------------------------------------------------------------------
+
+class IngestPost:
+    '''
+    A post to be ingested with @see: IBlogPostIngestService.ingest, the result of the ingestion is set on it.
+    '''
+    __slots__ = ('post', 'insert', 'unpublish', 'moveUp', 'postId', 'error')
+
+    def __init__(self, post, insert=True, unpublish=False, moveUp=False):
+        '''
+        Construct the ingested post.
+
+        @param post: Post
+            The post with the Uuid and the values to set, if a local post with the same Uuid exists only the values that
+            are set on the post are updated.
+        @param insert: boolean
+            True if the post is inserted when there is no local post with the same Uuid, otherwise it is skipped.
+        @param unpublish: boolean
+            True to unpublish the local post if it is published.
+        @param moveUp: boolean
+            True to place the local post on top of the blog posts.
+        '''
+        self.post = post
+        self.insert = insert
+        self.unpublish = unpublish
+        self.moveUp = moveUp
+        self.postId = None
+        # The id of the inserted or updated post, None if the post has been skipped or failed.
+        self.error = None
+        # The exception that made the post fail, None if the post has not failed.
+
+class IBlogPostIngestService(metaclass=abc.ABCMeta):
+    '''
+    The bulk blog posts ingestion service specification, used for storing the posts synchronized from other sources.
+    '''
+
+    @abc.abstractclassmethod
+    def ingest(self, blogId, sourceId, posts):
+        '''
+        Inserts or updates the posts in the blog, in one transaction. The posts are matched by Uuid with the local posts
+        of the source, a post that fails does not stop the ingestion of the other posts.
+
+        @param blogId: integer
+            The blog id.
+        @param sourceId: integer
+            The source id of the posts.
+        @param posts: list[IngestPost]|tuple(IngestPost)
+            The posts to ingest, the result of each post is set on it.
+        @return: integer
+            The number of posts inserted or updated.
+        '''
+
+# --------------------------------------------------------------------
+
+class IChangeIdAllocator(metaclass=abc.ABCMeta):
+    '''
+    The blog post change id (CId) allocator specification.
+    '''
+
+    @abc.abstractclassmethod
+    def nextCId(self, session=None, count=1):
+        '''
+        Provides the next change id, the change ids are unique and each process hands them out in increasing order.
+
+        @param session: Session|None
+            The session of the ongoing transaction, used only if the database does not allow the reservation of change
+            ids outside of it.
+        @param count: integer
+            The number of consecutive change ids to provide.
+        @return: integer
+            The first change id, the following count - 1 change ids are also taken.
+        '''
+
+# --------------------------------------------------------------------
+
+class ILastCIdTracker(metaclass=abc.ABCMeta):
+    '''
+    The tracker for the last blog post change id (CId), provides the last change ids without querying the database for
+    every request.
+    '''
+
+    @abc.abstractclassmethod
+    def lastCId(self, session, blogId):
+        '''
+        Provides the last committed change id of the blog posts. The change ids committed by other processes can be
+        provided after a delay that depends on the implementation, so the change id can be behind the database.
+
+        @param session: Session
+            The session to use if the change id needs to be read from the database.
+        @param blogId: integer
+            The blog id.
+        @return: integer|None
+            The last change id, None if the blog has no posts.
+        '''
+
+    @abc.abstractclassmethod
+    def lastCIdFor(self, session, key, sql):
+        '''
+        Provides the last committed change id for a set of posts other than the posts of a blog, like the posts of a
+        source. The change id is read again whenever posts are changed, the changes of other processes can be
+        provided after a delay like for @see: lastCId.
+
+        @param session: Session
+            The session to use if the change id needs to be read from the database.
+        @param key: tuple
+            The key that identifies the set of posts.
+        @param sql: callable(Session) -> integer|None
+            Provides the last change id from the database for the set of posts.
+        @return: integer|None
+            The last change id, None if there are no posts.
+        '''
+
+    @abc.abstractclassmethod
+    def changed(self, session, blogId, cId):
+        '''
+        Registers a change id assigned to a blog post, the change id is provided by the tracker only after the
+        session transaction is committed.
+
+        @param session: Session
+            The session of the transaction that changed the post.
+        @param blogId: integer
+            The blog id of the post.
+        @param cId: integer
+            The change id assigned to the post.
+        '''
+
+    @abc.abstractclassmethod
+    def waitChange(self, blogId, cId, timeout):
+        '''
+        Waits until the last change id of the blog posts is greater than the provided change id, the wait does not use
+        the transaction of the caller. The changes of other processes can be noticed after a delay like for
+        @see: lastCId.
+
+        @param blogId: integer
+            The blog id.
+        @param cId: integer
+            The change id to wait to be passed.
+        @param timeout: integer|float
+            The maximum number of seconds to wait.
+        @return: boolean
+            True if the blog posts changed, False if the timeout expired.
+        '''
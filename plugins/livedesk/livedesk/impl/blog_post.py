@@ -18,47 +18,100 @@ from ally.container.ioc import injected
 from ally.container.support import setup
 from ally.exception import InputError, Ref
 from ally.internationalization import _
+from ally.support.api.util_service import copy, namesForQuery
 from ally.support.sqlalchemy.session import SessionSupport
 from ally.support.sqlalchemy.util_service import buildQuery, buildLimits
 from livedesk.api.blog_post import QBlogPost, QWithCId, BlogPost, IterPost
+from livedesk.core.impl.ordering import OrderingEngine
+from livedesk.core.impl.post_count import PostCounter, STATE_PUBLISHED, \
+    STATE_UNPUBLISHED, STATE_DELETED
+from livedesk.core.impl.timeline_cache import TimelineCache
+from livedesk.core.spec import IChangeIdAllocator, ILastCIdTracker, \
+    IBlogPostIngestService, IngestPost
 from livedesk.meta.blog_collaborator_group import BlogCollaboratorGroupMemberMapped
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm.util import aliased
-from sqlalchemy.sql import functions as fn
-from sqlalchemy.sql.expression import func, or_
+from sqlalchemy.sql.expression import func
 from sqlalchemy.sql.functions import current_timestamp
 from sqlalchemy.sql.operators import desc_op
 from superdesk.collaborator.meta.collaborator import CollaboratorMapped
 from superdesk.person.meta.person import PersonMapped
-from superdesk.person_icon.api.person_icon import IPersonIconService
+from superdesk.media_archive.core.spec import IThumbnailManager
+from superdesk.media_archive.meta.meta_data import MetaDataMapped
+from superdesk.person_icon.meta.person_icon import PersonIconMapped
 from superdesk.post.api.post import IPostService, Post, QPostUnpublished
+from superdesk.post.core.impl.cursor import encodeCursor, decodeCursor, isOrdered
+from superdesk.post.core.spec import IPostSearchProvider
+from superdesk.post.meta.post import PostMapped
 from superdesk.post.meta.type import PostTypeMapped
 from livedesk.impl.blog_collaborator_group import updateLastAccessOn
 from superdesk.source.meta.source import SourceMapped
 from superdesk.verification.meta.verification import PostVerificationMapped
 from superdesk.verification.meta.status import VerificationStatusMapped
+from threading import BoundedSemaphore
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------
 
 UserPerson = aliased(PersonMapped)
 
 @injected
-@setup(IBlogPostService, name='blogPostService')
-class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
+@setup(IBlogPostService, IBlogPostIngestService, name='blogPostService')
+class BlogPostServiceAlchemy(SessionSupport, IBlogPostService, IBlogPostIngestService):
     '''
-    Implementation for @see: IBlogPostService
+    Implementation for @see: IBlogPostService and @see: IBlogPostIngestService
     '''
 
     postService = IPostService; wire.entity('postService')
-    personIconService = IPersonIconService; wire.entity('personIconService')
+    postSearchProvider = IPostSearchProvider; wire.entity('postSearchProvider')
+    # the search provider used for the posts search criteria
+    thumbnailManager = IThumbnailManager; wire.entity('thumbnailManager')
+    # the thumbnail manager used for resolving the authors images
+    changeIdAllocator = IChangeIdAllocator; wire.entity('changeIdAllocator')
+    lastCIdTracker = ILastCIdTracker; wire.entity('lastCIdTracker')
     internal_source_type = 'internal'
+    published_cache_size = 32 * 1024 * 1024; wire.config('published_cache_size', doc='''
+    The approximate number of bytes used for caching the published posts responses, the cached responses of a blog are
+    dropped whenever the blog posts change, 0 disables the cache. The changes made by other processes are noticed only
+    after the last_cid_refresh seconds, until then the cached responses are provided.''')
+    published_wait_timeout = 30; wire.config('published_wait_timeout', doc='''
+    The maximum number of seconds that a published posts request waits for the blog posts to change.''')
+    published_wait_requests = 100; wire.config('published_wait_requests', doc='''
+    The maximum number of published posts requests that wait at the same time, each one holds a server thread, the
+    requests over this number are responded right away.''')
+    count_cache_entries = 10000; wire.config('count_cache_entries', doc='''
+    The maximum number of posts totals that are kept for the detailed posts listings, like the published posts cache the
+    totals reflect the changes of other processes after the last_cid_refresh seconds.''')
+    count_max = 0; wire.config('count_max', doc='''
+    The maximum number of posts counted for the total of a detailed posts listing with criteria, above it the total is
+    marked as estimated; the posts are always counted if zero.''')
 
     def __init__(self):
         '''
         Construct the blog post service.
         '''
         assert isinstance(self.postService, IPostService), 'Invalid post service %s' % self.postService
-        assert isinstance(self.personIconService, IPersonIconService), 'Invalid person icon service %s' % self.personIconService
+        assert isinstance(self.postSearchProvider, IPostSearchProvider), \
+        'Invalid post search provider %s' % self.postSearchProvider
+        assert isinstance(self.thumbnailManager, IThumbnailManager), 'Invalid thumbnail manager %s' % self.thumbnailManager
+        assert isinstance(self.changeIdAllocator, IChangeIdAllocator), 'Invalid change id allocator %s' % self.changeIdAllocator
+        assert isinstance(self.lastCIdTracker, ILastCIdTracker), 'Invalid last change id tracker %s' % self.lastCIdTracker
+        assert isinstance(self.published_cache_size, int), 'Invalid published cache size %s' % self.published_cache_size
+        assert isinstance(self.published_wait_timeout, int), 'Invalid published wait timeout %s' % self.published_wait_timeout
+        assert isinstance(self.published_wait_requests, int), \
+        'Invalid published wait requests %s' % self.published_wait_requests
+        assert isinstance(self.count_cache_entries, int), 'Invalid count cache entries %s' % self.count_cache_entries
+        assert isinstance(self.count_max, int), 'Invalid count maximum %s' % self.count_max
+
+        self._ordering = OrderingEngine(BlogPostEntry, BlogPostEntry.blogPostId, BlogPostEntry.Blog, BlogPostEntry.Order,
+                                        BlogPostEntry.CId, self._nextCIds)
+        self._publishedCache = TimelineCache(self.published_cache_size)
+        self._publishedWaits = BoundedSemaphore(self.published_wait_requests)
+        self._counter = PostCounter(self.count_cache_entries, self.count_max)
 
     def getById(self, blogId, postId, thumbSize=None):
         '''
@@ -72,12 +125,46 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         except NoResultFound: raise InputError(Ref(_('No such blog post'), ref=BlogPostMapped.Id))
 
     def getPublished(self, blogId, typeId=None, creatorId=None, authorId=None, thumbSize=None, offset=None, limit=None,
-                     detailed=False, q=None):
+                     cursor=None, detailed=False, q=None):
         '''
         @see: IBlogPostService.getPublished
         '''
         assert q is None or isinstance(q, QBlogPostPublished), 'Invalid query %s' % q
-        
+
+        shape = self._publishedShape(q)
+        if shape is None:
+            return self._getPublished(blogId, typeId, creatorId, authorId, thumbSize, offset, limit, cursor, detailed, q)
+
+        key = (blogId, self._lastCId(blogId), typeId, creatorId, authorId, thumbSize, offset, limit, cursor, detailed)
+        key += shape
+        posts = self._publishedCache.get(key)
+        if posts is None:
+            posts = self._getPublished(blogId, typeId, creatorId, authorId, thumbSize, offset, limit, cursor, detailed, q,
+                                       True)
+            self._publishedCache.put(key, posts, sum(self._sizeOf(post) for post in posts))
+        return posts
+
+    def getPublishedWait(self, blogId, typeId=None, creatorId=None, authorId=None, thumbSize=None, timeout=None,
+                         offset=None, limit=None, detailed=False, q=None):
+        '''
+        @see: IBlogPostService.getPublishedWait
+        '''
+        assert q is None or isinstance(q, QBlogPostPublished), 'Invalid query %s' % q
+
+        if q and QWithCId.cId.since in q and q.cId.since is not None:
+            if timeout is None or timeout > self.published_wait_timeout: timeout = self.published_wait_timeout
+            # The wait is made before the session is used, so no transaction is held while waiting
+            if timeout > 0 and self._publishedWaits.acquire(False):
+                try: self.lastCIdTracker.waitChange(blogId, int(q.cId.since), timeout)
+                finally: self._publishedWaits.release()
+
+        return self.getPublished(blogId, typeId, creatorId, authorId, thumbSize, offset, limit, detailed=detailed, q=q)
+
+    def _getPublished(self, blogId, typeId, creatorId, authorId, thumbSize, offset, limit, cursor, detailed, q,
+                      detach=False):
+        '''
+        Provides the published posts, if detach is True the posts are copied out of the session.
+        '''
         postVerification = aliased(PostVerificationMapped, name='post_verification_filter')
 
         sinceLastCId = 0
@@ -105,18 +192,20 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         #filter updates that were not published yet
         sql = sql.filter(BlogPostMapped.WasPublished == True)       
 
-        sql = sql.order_by(desc_op(BlogPostMapped.Order))
+        sql = sql.order_by(desc_op(BlogPostMapped.Order), desc_op(BlogPostMapped.Id))
 
-        sqlLimit = buildLimits(sql, offset, limit)
-        posts = self._addImages(self._trimPosts(sqlLimit.distinct()), thumbSize)
+        posts, nextCursor = self._seekPosts(sql, offset, limit, cursor, q)
+        posts = self._addImages(self._trimPosts(posts), thumbSize)
+        if detach: posts = [copy(post, BlogPost()) for post in posts]
         if detailed:
-            posts = IterPost(posts, sql.distinct().count(), offset, limit)
-            posts.lastCId = self.session().query(func.MAX(BlogPostMapped.CId)).filter(BlogPostMapped.Blog == blogId).scalar()
-            posts.sinceLastCId = sinceLastCId
+            plain = q is None and not (typeId or creatorId or authorId)
+            posts = self._iterPost(posts, blogId, sql, None if cursor else offset, limit,
+                                   STATE_PUBLISHED if plain else None)
+            posts.sinceLastCId, posts.nextCursor = sinceLastCId, nextCursor
         return posts
 
     def getUnpublished(self, blogId, typeId=None, creatorId=None, authorId=None, thumbSize=None, offset=None, limit=None,
-                       detailed=False, q=None):
+                       cursor=None, detailed=False, q=None):
         '''
         @see: IBlogPostService.getUnpublished
         '''
@@ -152,13 +241,17 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
                 
         else: sql = sql.filter((BlogPostMapped.PublishedOn == None) & (BlogPostMapped.DeletedOn == None))    
 
-        sql = sql.order_by(desc_op(BlogPostMapped.Order))
-        
-        sqlLimit = buildLimits(sql, offset, limit)
-        posts = self._addImages(self._trimPosts(sqlLimit.distinct(), unpublished=False, published=True), thumbSize)
+        sql = sql.order_by(desc_op(BlogPostMapped.Order), desc_op(BlogPostMapped.Id))
+
+        posts, nextCursor = self._seekPosts(sql, offset, limit, cursor, q)
+        posts = self._addImages(self._trimPosts(posts, unpublished=False, published=True), thumbSize)
         if detailed:
-            posts = IterPost(posts, sql.distinct().count(), offset, limit)
-            posts.lastCId = self.session().query(func.MAX(BlogPostMapped.CId)).filter(BlogPostMapped.Blog == blogId).scalar()
+            state = None
+            if not (typeId or creatorId or authorId):
+                if q is None: state = STATE_UNPUBLISHED
+                elif self._criteriaIn(q) == ['isDeleted']: state = STATE_DELETED if deleted else STATE_UNPUBLISHED
+            posts = self._iterPost(posts, blogId, sql, None if cursor else offset, limit, state)
+            posts.nextCursor = nextCursor
         return posts
     
     def getUnpublishedBySource(self, sourceId, thumbSize=None, offset=None, limit=None, detailed=False, q=None):
@@ -179,11 +272,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
             sql = buildQuery(sql, q, BlogPostMapped)
         
         if q:
-            if QWithCId.search in q:
-                all = self._processLike(q.search.ilike) if q.search.ilike is not None else self._processLike(q.search.like)
-                sql = sql.filter(or_(BlogPostMapped.Meta.ilike(all), BlogPostMapped.CreatedOn.ilike(all), \
-                                     BlogPostMapped.Content.ilike(all), BlogPostMapped.ContentPlain.ilike(all), \
-                                     ))
+            if QWithCId.search in q: sql = self._searchQuery(sql, q)
                 
             if QWithCId.status in q or QWithCId.checker in q:
                 sql = sql.join(postVerification, postVerification.Id == BlogPostMapped.Id)     
@@ -209,13 +298,15 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
  
         posts = self._addImages(self._trimPosts(sqlLimit.distinct(), deleted= not deleted, unpublished=False, published=True), thumbSize)
         if detailed:
-            posts = IterPost(posts, sql.distinct().count(), offset, limit)
-            
-            lastCidSql = self.session().query(func.MAX(BlogPostMapped.CId))
-            lastCidSql = lastCidSql.join(CollaboratorMapped, BlogPostMapped.Creator == CollaboratorMapped.User)
-            lastCidSql = lastCidSql.filter(CollaboratorMapped.Source == sourceId)
-            
-            posts.lastCId = lastCidSql.scalar()
+            def lastCidSql(session):
+                sql = session.query(func.MAX(BlogPostMapped.CId))
+                sql = sql.join(CollaboratorMapped, BlogPostMapped.Creator == CollaboratorMapped.User)
+                return sql.filter(CollaboratorMapped.Source == sourceId).scalar()
+
+            lastCId = self.lastCIdTracker.lastCIdFor(self.session(), ('source', sourceId), lastCidSql)
+            total, estimated = self._counter.count(('source', sourceId), lastCId, sql.distinct())
+            posts = IterPost(posts, total, offset, limit)
+            posts.lastCId, posts.estimated = lastCId, estimated
             
         return posts
 
@@ -275,7 +366,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         assert isinstance(post, Post), 'Invalid post %s' % post
 
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=self.postService.insert(post))
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         postEntry.Order = self._nextOrdering(blogId)
         self.session().add(postEntry)
 
@@ -296,7 +387,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         self.postService.update(post)
 
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=post.Id)
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         postEntry.Order = self._nextOrdering(blogId)
         self.session().merge(postEntry)
 
@@ -316,7 +407,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
             self.postService.update(post)
             
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=postId)
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         self.session().merge(postEntry)
 
         return postId
@@ -334,7 +425,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         self.postService.update(post)
 
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=post.Id)
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         postEntry.Order = self._nextOrdering(blogId)
         self.session().merge(postEntry)
 
@@ -354,7 +445,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         self.postService.update(post)
 
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=post.Id)
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         postEntry.Order = self._nextOrdering(blogId)
         self.session().merge(postEntry)
 
@@ -368,7 +459,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
 
         post.WasPublished = True
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=self.postService.insert(post))
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         postEntry.Order = self._nextOrdering(blogId)
         self.session().add(postEntry)
         self.session().query(BlogPostMapped).get(postEntry.blogPostId).PublishedOn = current_timestamp()
@@ -388,7 +479,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         self.postService.update(post)
 
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=post.Id)
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         self.session().merge(postEntry)
 
         return postId
@@ -402,43 +493,21 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         self.postService.update(post)
 
         postEntry = BlogPostEntry(Blog=blogId, blogPostId=post.Id)
-        postEntry.CId = self._nextCId()
+        postEntry.CId = self._nextCId(blogId)
         self.session().merge(postEntry)
 
     def reorder(self, blogId, postId, refPostId, before=True):
         '''
         @see: IBlogPostService.reorder
         '''
-        sql = self.session().query(BlogPostMapped.Order)
-        sql = sql.filter(BlogPostMapped.Blog == blogId)
-        sql = sql.filter(BlogPostMapped.Id == refPostId)
-        order = sql.scalar()
-
-        if not order: raise InputError(Ref(_('Invalid before post')))
-
-        sql = self.session().query(BlogPostMapped.Order)
-        sql = sql.filter(BlogPostMapped.Blog == blogId)
-        sql = sql.filter(BlogPostMapped.Id != postId)
-        if before:
-            sql = sql.filter(BlogPostMapped.Order > order)
-            sql = sql.order_by(BlogPostMapped.Order)
-        else:
-            sql = sql.filter(BlogPostMapped.Order < order)
-            sql = sql.order_by(desc_op(BlogPostMapped.Order))
-
-        sql = sql.limit(1)
-
-        orderPrev = sql.scalar()
-
-        if orderPrev: order = (order + orderPrev) / 2
-        elif before: order += 1
-        else: order -= 1
+        order = self._ordering.orderNear(self.session(), blogId, postId, refPostId, before)
+        if order is None: raise InputError(Ref(_('Invalid before post')))
 
         post = self.getById(blogId, postId)
         assert isinstance(post, BlogPostMapped)
 
         post.Order = order
-        post.CId = self._nextCId()
+        post.CId = self._nextCId(blogId)
         self.session().merge(post)
 
     def moveUp(self, blogId, postId):
@@ -449,7 +518,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
         assert isinstance(post, BlogPostMapped)
 
         post.Order = self._nextOrdering(blogId)
-        post.CId = self._nextCId()
+        post.CId = self._nextCId(blogId)
         self.session().merge(post)
 
     def delete(self, id):
@@ -460,11 +529,63 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
             postEntry = self.session().query(BlogPostEntry).get(id)
             if postEntry:
                 assert isinstance(postEntry, BlogPostEntry)
-                postEntry.CId = self._nextCId()
+                postEntry.CId = self._nextCId(postEntry.Blog)
                 self.session().flush((postEntry,))
             return True
         return False
 
+    def ingest(self, blogId, sourceId, posts):
+        '''
+        @see: IBlogPostIngestService.ingest
+        '''
+        assert isinstance(posts, (list, tuple)), 'Invalid posts %s' % posts
+        if not posts: return 0
+        session = self.session()
+
+        # the local posts of the source are read with one query
+        uuids, local = {ingest.post.Uuid for ingest in posts if ingest.post.Uuid is not None}, {}
+        if uuids:
+            sql = session.query(PostMapped.Uuid, PostMapped.Id, PostMapped.PublishedOn)
+            sql = sql.filter(PostMapped.Feed == sourceId).filter(PostMapped.Uuid.in_(uuids))
+            for uuid, postId, publishedOn in sql.all(): local.setdefault(uuid, (postId, publishedOn))
+
+        # one change id and one top order are reserved for each post, the ones of the skipped and failed posts are left
+        # unused
+        cId, order, count = self._nextCIds(blogId, len(posts)), self._nextOrdering(blogId, len(posts)), 0
+        for k, ingest in enumerate(posts):
+            assert isinstance(ingest, IngestPost), 'Invalid ingest post %s' % ingest
+            post = ingest.post
+            assert isinstance(post, Post), 'Invalid post %s' % post
+            existing = local.get(post.Uuid)
+            if existing is None and not ingest.insert: continue
+
+            # each post is stored in a savepoint so that a failed post does not roll back the others
+            nested = session.begin_nested()
+            try:
+                postEntry = BlogPostEntry(Blog=blogId, CId=cId + k)
+                if existing is None:
+                    postEntry.blogPostId = self.postService.insert(post)
+                    postEntry.Order = order + k
+                    session.add(postEntry)
+                else:
+                    postId, publishedOn = existing
+                    post.Id = postEntry.blogPostId = postId
+                    if ingest.unpublish and publishedOn is not None: post.PublishedOn = None
+                    self.postService.update(post)
+                    if ingest.moveUp: postEntry.Order = order + k
+                    session.merge(postEntry)
+                session.flush()
+                nested.commit()
+            except Exception as e:
+                nested.rollback()
+                ingest.error = e
+                log.warning('Cannot ingest post %s of source %s in blog %s: %s', post.Uuid, sourceId, blogId, e)
+            else:
+                if existing is None: local[post.Uuid] = (postEntry.blogPostId, post.PublishedOn)
+                ingest.postId = postEntry.blogPostId
+                count += 1
+        return count
+
     # ----------------------------------------------------------------
 
     def _buildQuery(self, blogId, typeId=None, creatorId=None, authorId=None, q=None):
@@ -486,11 +607,7 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
 
         sql = self.session().query(BlogPostMapped)
         sql = sql.filter(BlogPostMapped.Blog == blogId)
-        if isinstance(q, QWithCId) and QWithCId.search in q:
-            all = self._processLike(q.search.ilike) if q.search.ilike is not None else self._processLike(q.search.like)
-            sql = sql.filter(or_(BlogPostMapped.Meta.ilike(all), BlogPostMapped.CreatedOn.ilike(all), \
-                                 BlogPostMapped.Content.ilike(all), BlogPostMapped.ContentPlain.ilike(all), \
-                                 ))
+        if isinstance(q, QWithCId) and QWithCId.search in q: sql = self._searchQuery(sql, q)
 
         if typeId: sql = sql.join(PostTypeMapped).filter(PostTypeMapped.Key == typeId)
         if creatorId: sql = sql.filter(BlogPostMapped.Creator == creatorId)
@@ -501,19 +618,14 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
 
         return sql
     
-    def _processLike(self, value):
-        assert isinstance(value, str), 'Invalid like value %s' % value
-
-        if not value:
-            return '%'
-
-        if not value.endswith('%'):
-            value = value + '%'
-
-        if not value.startswith('%'):
-            value = '%' + value
-
-        return value
+    def _searchQuery(self, sql, q):
+        '''
+        Restricts the posts query to the posts that match the search criteria.
+        '''
+        assert isinstance(q, QWithCId), 'Invalid query %s' % q
+        text = q.search.ilike if q.search.ilike is not None else q.search.like
+        if not text: return sql
+        return self.postSearchProvider.buildQuery(self.session(), sql, BlogPostMapped, text)
 
     def _trimPosts(self, posts, deleted=True, unpublished=True, published=False):
         '''
@@ -534,38 +646,129 @@ class BlogPostServiceAlchemy(SessionSupport, IBlogPostService):
             else:
                 yield post
 
-    def _nextCId(self):
+    def _nextCId(self, blogId):
         '''
-        Provides the next change Id.
+        Provides the next change Id for a post of the blog.
         '''
-        max = self.session().query(fn.max(BlogPostMapped.CId)).scalar()
-        if max: return max + 1
-        return 1
+        return self._nextCIds(blogId, 1)
 
-    def _nextOrdering(self, blogId):
+    def _nextCIds(self, blogId, count):
         '''
-        Provides the next ordering.
+        Provides the first of count consecutive change Ids for posts of the blog.
         '''
-        max = self.session().query(fn.max(BlogPostMapped.Order)).filter(BlogPostMapped.Blog == blogId).scalar()
-        if max: return max + 1
-        return 1
+        self._publishedCache.invalidate(blogId)
+        self._counter.invalidate(blogId)
+        cId = self.changeIdAllocator.nextCId(self.session(), count)
+        self.lastCIdTracker.changed(self.session(), blogId, cId + count - 1)
+        return cId
 
-    # TODO: nasty
-    def _addImage(self, post, thumbSize='medium'):
+    def _lastCId(self, blogId):
         '''
-        Takes the image for the author or creator and adds the thumbnail to the response
+        Provides the last change Id of the blog posts.
+        '''
+        return self.lastCIdTracker.lastCId(self.session(), blogId)
+
+    def _iterPost(self, posts, blogId, sql, offset, limit, state=None):
+        '''
+        Provides the detailed blog posts iterable, the total is taken from the blog counters if a state is provided,
+        otherwise it is counted for the query.
+        '''
+        lastCId = self._lastCId(blogId)
+        if state is None: total, estimated = self._counter.count(blogId, lastCId, sql.distinct())
+        else: total, estimated = self._counter.countState(self.session(), blogId, lastCId, state), False
+
+        posts = IterPost(posts, total, offset, limit)
+        posts.lastCId, posts.estimated = lastCId, estimated
+        return posts
+
+    def _seekPosts(self, sql, offset, limit, cursor, q):
+        '''
+        Provides the distinct posts of the query page and the cursor for the next page. The query needs to be ordered
+        descending by the post order and id, if continued from a cursor the offset is not used.
+        '''
+        seekable = not isOrdered(q) and not (isinstance(q, QWithCId) and QWithCId.search in q)
+        if cursor is not None:
+            if not seekable: raise InputError(Ref(_('The cursor can not be used with ordering or search criteria'),))
+            order, postId = decodeCursor(cursor, 2)
+            sql = sql.filter((BlogPostMapped.Order < order) |
+                             ((BlogPostMapped.Order == order) & (BlogPostMapped.Id < postId)))
+            offset = None
+
+        posts = buildLimits(sql, offset, limit).distinct().all()
+        if not seekable or not limit or len(posts) < limit or posts[-1].Order is None: return posts, None
+        return posts, encodeCursor(posts[-1].Order, posts[-1].Id)
+
+    def _criteriaIn(self, q):
+        '''
+        Provides the names of the criteria that are used in the query.
+        '''
+        return [name for name in namesForQuery(q.__class__) if getattr(q.__class__, name) in q]
+
+    def _publishedShape(self, q):
+        '''
+        Provides the published posts query part of the cache key, None if the query can not be cached. Only the change id
+        and order criteria are cached since those are used by the clients that poll the published posts.
+        '''
+        if q is None: return ()
+
+        shape = []
+        for name in namesForQuery(QBlogPostPublished):
+            criteria = getattr(QBlogPostPublished, name)
+            if criteria not in q: continue
+            if name not in ('cId', 'order'): return None
+            for attribute in ('start', 'end', 'since', 'until', 'ascending', 'priority'):
+                if getattr(criteria, attribute) in q: shape.append((name, attribute, getattr(getattr(q, name), attribute)))
+        return tuple(shape)
+
+    def _sizeOf(self, post):
+        '''
+        Provides the approximate size in bytes of the post.
         '''
         assert isinstance(post, BlogPost)
-        id = post.AuthorPerson if post.AuthorPerson is not None else post.Creator
+        size = 512
+        for prop in (BlogPost.Content, BlogPost.ContentPlain, BlogPost.Meta):
+            if prop in post: size += len(getattr(post, prop.name) or '')
+        return size
 
-        try:
-            if id is not None:
-                post.AuthorImage = self.personIconService.getByPersonId(id=id, thumbSize=thumbSize).Thumbnail
-        except: pass
+    def _nextOrdering(self, blogId, count=1):
+        '''
+        Provides the next ordering, or the first of count consecutive orderings.
+        '''
+        return self._ordering.nextOrder(self.session(), blogId, count)
 
-        return post
+    def _addImage(self, post, thumbSize='medium'):
+        '''
+        Takes the image for the author or creator and adds the thumbnail to the response
+        '''
+        return self._addImages((post,), thumbSize)[0]
 
     def _addImages(self, posts, thumbSize='medium'):
+        '''
+        Takes the images for the authors or creators of the posts and adds the thumbnails to the response. The icons of
+        all the persons are loaded with one query and the thumbnail is resolved once for each person.
+        '''
+        posts = list(posts)
+        personIds = {self._personId(post) for post in posts}
+        personIds.discard(None)
+        if not personIds: return posts
+
+        sql = self.session().query(PersonIconMapped.Id, MetaDataMapped)
+        sql = sql.join(MetaDataMapped, MetaDataMapped.Id == PersonIconMapped.MetaData)
+        sql = sql.filter(PersonIconMapped.Id.in_(personIds))
+
+        thumbnails = {}
+        for personId, metaData in sql.all():
+            try: thumbnails[personId] = self.thumbnailManager.populate(metaData, 'http', thumbSize).Thumbnail
+            except Exception: pass
+
         for post in posts:
-            post = self._addImage(post, thumbSize)
-            yield post
+            thumbnail = thumbnails.get(self._personId(post))
+            if thumbnail is not None: post.AuthorImage = thumbnail
+        return posts
+
+    def _personId(self, post):
+        '''
+        Provides the id of the person that has the image displayed for the post.
+        '''
+        assert isinstance(post, BlogPost)
+        return post.AuthorPerson if post.AuthorPerson is not None else post.Creator
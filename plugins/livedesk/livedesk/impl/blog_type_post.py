@@ -18,7 +18,6 @@ from ally.support.sqlalchemy.util_service import buildQuery, buildLimits
 from ally.container.support import setup
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm.util import aliased
-from sqlalchemy.sql import functions as fn
 from superdesk.person.meta.person import PersonMapped
 from superdesk.post.api.post import IPostService, Post
 from superdesk.post.meta.type import PostTypeMapped
@@ -26,6 +25,7 @@ from sqlalchemy.sql.operators import desc_op
 from livedesk.api.blog_type_post import IBlogTypePostService, BlogTypePost, \
     QBlogTypePost, BlogTypePostPersist
 from livedesk.meta.blog_type_post import BlogTypePostMapped, BlogTypePostEntry
+from livedesk.core.impl.ordering import OrderingEngine
 
 # --------------------------------------------------------------------
 
@@ -46,6 +46,9 @@ class BlogTypePostServiceAlchemy(SessionSupport, IBlogTypePostService):
         '''
         assert isinstance(self.postService, IPostService), 'Invalid post service %s' % self.postService
 
+        self._ordering = OrderingEngine(BlogTypePostEntry, BlogTypePostEntry.blogTypePostId, BlogTypePostEntry.BlogType,
+                                        BlogTypePostEntry.Order)
+
     def getById(self, blogTypeId, postId):
         '''
         @see: IBlogPostService.getById
@@ -98,28 +101,9 @@ class BlogTypePostServiceAlchemy(SessionSupport, IBlogTypePostService):
         '''
         @see: IBlogPostService.reorder
         '''
-        sql = self.session().query(BlogTypePostMapped.Order)
-        sql = sql.filter(BlogTypePostMapped.BlogType == blogTypeId)
-        sql = sql.filter(BlogTypePostMapped.Id == refPostId)
-        order = sql.scalar()
-
+        order = self._ordering.orderNear(self.session(), blogTypeId, postId, refPostId, not before)
         if order is None: raise InputError(Ref(_('Invalid before post')))
 
-        sql = self.session().query(BlogTypePostMapped.Order)
-        sql = sql.filter(BlogTypePostMapped.BlogType == blogTypeId)
-        sql = sql.filter(BlogTypePostMapped.Id != postId)
-        if before:
-            sql = sql.filter(BlogTypePostMapped.Order < order)
-            sql = sql.order_by(desc_op(BlogTypePostMapped.Order))
-        else:
-            sql = sql.filter(BlogTypePostMapped.Order > order)
-            sql = sql.order_by(BlogTypePostMapped.Order)
-        sql = sql.limit(1)
-        orderPrev = sql.scalar()
-
-        if orderPrev is not None: order = (order + orderPrev) / 2
-        else: order = order - 1 if before else order + 1
-
         post = self.getById(blogTypeId, postId)
         assert isinstance(post, BlogTypePostMapped)
 
@@ -171,6 +155,4 @@ class BlogTypePostServiceAlchemy(SessionSupport, IBlogTypePostService):
         '''
         Provides the next ordering.
         '''
-        max = self.session().query(fn.max(BlogTypePostMapped.Order)).filter(BlogTypePostMapped.BlogType == blogTypeId).scalar()
-        if max: return max + 1
-        return 1
+        return self._ordering.nextOrder(self.session(), blogTypeId)
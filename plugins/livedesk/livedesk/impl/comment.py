@@ -13,6 +13,7 @@ from ..api.comment import IBlogCommentService
 from ..api.blog_post import IBlogPostService
 from ..meta.blog import BlogMapped
 from ..meta.blog_post import BlogPostMapped
+from ..core.spec import ILastCIdTracker
 from ally.container.ioc import injected
 from ally.container.support import setup
 from ally.support.sqlalchemy.util_service import buildQuery, buildLimits
@@ -61,6 +62,7 @@ class BlogCommentServiceAlchemy(EntityServiceAlchemy, IBlogCommentService):
     sourceService = ISourceService; wire.entity('sourceService')
     collaboratorService = ICollaboratorService; wire.entity('collaboratorService')
     userService = IUserService; wire.entity('userService')
+    lastCIdTracker = ILastCIdTracker; wire.entity('lastCIdTracker')
 
     def __init__(self):
         '''
@@ -70,6 +72,7 @@ class BlogCommentServiceAlchemy(EntityServiceAlchemy, IBlogCommentService):
         assert isinstance(self.sourceService, ISourceService), 'Invalid source service %s' % self.sourceService
         assert isinstance(self.collaboratorService, ICollaboratorService), 'Invalid collaborator service %s' % self.collaboratorService
         assert isinstance(self.userService, IUserService), 'Invalid user service %s' % self.userService
+        assert isinstance(self.lastCIdTracker, ILastCIdTracker), 'Invalid last change id tracker %s' % self.lastCIdTracker
 
     def getComments(self, blogId, offset=None, limit=None, detailed=False, q=None):
         '''
@@ -100,12 +103,13 @@ class BlogCommentServiceAlchemy(EntityServiceAlchemy, IBlogCommentService):
         if detailed:
             posts = IterPost(posts, sql.count(), offset, limit)
             
-            lastCidSql = self.session().query(func.MAX(BlogPostMapped.CId))
-            lastCidSql = lastCidSql.join(CollaboratorMapped, BlogPostMapped.Author == CollaboratorMapped.Id)
-            lastCidSql = lastCidSql.join(SourceMapped).join(SourceTypeMapped)
-            lastCidSql = lastCidSql.filter(SourceTypeMapped.Key == self.source_type_key)
-            
-            posts.lastCId = lastCidSql.scalar()
+            def lastCidSql(session):
+                sql = session.query(func.MAX(BlogPostMapped.CId))
+                sql = sql.join(CollaboratorMapped, BlogPostMapped.Author == CollaboratorMapped.Id)
+                sql = sql.join(SourceMapped).join(SourceTypeMapped)
+                return sql.filter(SourceTypeMapped.Key == self.source_type_key).scalar()
+
+            posts.lastCId = self.lastCIdTracker.lastCIdFor(self.session(), ('sourceType', self.source_type_key), lastCidSql)
             
         return posts
 
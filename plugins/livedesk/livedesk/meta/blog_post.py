@@ -14,7 +14,7 @@ from livedesk.meta.blog import BlogMapped
 from sqlalchemy.dialects.mysql.base import BIGINT
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.schema import Column, ForeignKey
+from sqlalchemy.schema import Column, ForeignKey, Index
 from sqlalchemy.sql.expression import case
 from superdesk.meta.metadata_superdesk import Base
 from superdesk.post.meta.post import PostMapped
@@ -42,6 +42,12 @@ class BlogPostEntry(Base, BlogPostDefinition):
     Provides the mapping for BlogPost table where it keeps the connection between the post and the blog.
     '''
 
+# The blog timeline is listed by ordering and post id, the index also covers the post id used for joining the post.
+Index('ix_livedesk_post_blog_ordering', BlogPostEntry.__table__.c.fk_blog_id, BlogPostEntry.__table__.c.ordering,
+      BlogPostEntry.__table__.c.fk_post_id)
+# The blog posts changes are selected and the last change id is read by blog and change id.
+Index('ix_livedesk_post_blog_change', BlogPostEntry.__table__.c.fk_blog_id, BlogPostEntry.__table__.c.id_change)
+
 class BlogPostMapped(BlogPostDefinition, PostMapped, BlogPost):
     '''
     Provides the mapping for BlogPost in the form of extending the Post.
@@ -0,0 +1,28 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the SQL alchemy meta for livedesk sequences.
+'''
+
+from sqlalchemy.dialects.mysql.base import BIGINT
+from sqlalchemy.schema import Column
+from sqlalchemy.types import String
+from superdesk.meta.metadata_superdesk import Base
+
+# --------------------------------------------------------------------
+
+class SequenceMapped(Base):
+    '''
+    Provides the mapping for the livedesk sequences, each row keeps the last value handed out for a named counter.
+    This is not a REST model.
+    '''
+    __tablename__ = 'livedesk_sequence'
+    __table_args__ = dict(mysql_engine='InnoDB', mysql_charset='utf8')
+
+    name = Column('name', String(100), primary_key=True)
+    value = Column('value', BIGINT(unsigned=True), nullable=False)
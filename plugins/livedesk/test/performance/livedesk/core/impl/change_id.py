@@ -0,0 +1,88 @@
+'''
+Created on Oct 17, 2026
+
+@package: livedesk
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the concurrency benchmark for the blog post change id allocator.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from livedesk.core.impl.change_id import ChangeIdAllocator, SEQUENCE_CID
+from livedesk.meta.sequence import SequenceMapped
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+from tempfile import mkdtemp
+from threading import Thread
+import os
+import shutil
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class TestChangeIdAllocator(unittest.TestCase):
+
+    workers = 8
+    # The number of allocators, each one stands for a process with its own reserved block.
+    allocations = 500
+    # The number of change ids taken by each allocator.
+
+    seed = 0
+    # The sequence value of a fresh database.
+
+    def setUp(self):
+        self.path = mkdtemp()
+        engine = create_engine('sqlite:///%s' % os.path.join(self.path, 'sequence.db'), connect_args={'timeout': 60})
+        SequenceMapped.__table__.create(engine)
+        self.sessionCreator = sessionmaker(bind=engine)
+
+        session = self.sessionCreator()
+        session.add(SequenceMapped(name=SEQUENCE_CID, value=self.seed))
+        session.commit()
+        session.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def testConcurrency(self):
+        results = []
+        def allocate(allocator, cids):
+            for _k in range(self.allocations): cids.append(allocator.nextCId())
+
+        threads = []
+        for _k in range(self.workers):
+            allocator = ChangeIdAllocator()
+            allocator.sessionCreator = self.sessionCreator
+            ioc.initialize(allocator)
+            cids = []
+            results.append(cids)
+            threads.append(Thread(target=allocate, args=(allocator, cids)))
+
+        start = time.time()
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        elapsed = time.time() - start
+
+        total = self.workers * self.allocations
+        allCIds = [cid for cids in results for cid in cids]
+        print('Allocated %s change ids with %s allocators in %.3f seconds (%.0f/s)' %
+              (total, self.workers, elapsed, total / elapsed))
+
+        self.assertEqual(total, len(allCIds))
+        self.assertEqual(total, len(set(allCIds)), 'Duplicate change ids')
+        self.assertGreater(min(allCIds), self.seed, 'Change id %s not after the sequence' % min(allCIds))
+        for cids in results: self.assertEqual(sorted(cids), cids, 'Change ids not increasing')
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
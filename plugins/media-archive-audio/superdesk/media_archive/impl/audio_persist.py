@@ -18,11 +18,10 @@ from ally.support.util_sys import pythonPath
 from os import remove, path, makedirs
 from os.path import splitext, abspath, join, exists
 from sqlalchemy.exc import SQLAlchemyError
-from subprocess import Popen, PIPE, STDOUT
 from superdesk.media_archive.core.impl.meta_service_base import \
     thumbnailFormatFor, metaTypeFor
 from superdesk.media_archive.core.spec import IMetaDataHandler, \
-    IThumbnailManager
+    IThumbnailManager, IMediaToolExecutor
 import re
 from superdesk.media_archive.meta.meta_data import MetaDataMapped
 from superdesk.media_archive.meta.audio_data import AudioDataEntry, \
@@ -53,6 +52,8 @@ class AudioPersistanceAlchemy(SessionSupport, IMetaDataHandler):
     
     thumbnailManager = IThumbnailManager; wire.entity('thumbnailManager')
     # Provides the thumbnail referencer
+    mediaToolExecutor = IMediaToolExecutor; wire.entity('mediaToolExecutor')
+    # Runs the media tools
 
     def __init__(self):
         assert isinstance(self.format_file_name, str), 'Invalid format file name %s' % self.format_file_name
@@ -61,6 +62,8 @@ class AudioPersistanceAlchemy(SessionSupport, IMetaDataHandler):
         assert isinstance(self.audio_supported_files, str), 'Invalid supported files %s' % self.audio_supported_files
         assert isinstance(self.ffmpeg_path, str), 'Invalid ffmpeg path %s' % self.ffmpeg_path
         assert isinstance(self.ffmpeg_tmp_path, str), 'Invalid ffmpeg tmp path %s' % self.ffmpeg_tmp_path
+        assert isinstance(self.mediaToolExecutor, IMediaToolExecutor), \
+        'Invalid media tool executor %s' % self.mediaToolExecutor
 
         self.audioSupportedFiles = set(re.split('[\\s]*\\,[\\s]*', self.audio_supported_files))
         self._defaultThumbnailFormatId = self._thumbnailFormatId = self._metaTypeId = None
@@ -79,6 +82,12 @@ class AudioPersistanceAlchemy(SessionSupport, IMetaDataHandler):
             handle(e, audioInfoMapped)
         return audioInfoMapped
 
+    def handles(self):
+        '''
+        @see: IMetaDataHandler.handles
+        '''
+        return META_TYPE_KEY, {extension.lower() for extension in self.audioSupportedFiles}
+
     def processByInfo(self, metaDataMapped, contentPath, contentType):
         '''
         @see: IMetaDataHandler.processByInfo
@@ -102,8 +111,7 @@ class AudioPersistanceAlchemy(SessionSupport, IMetaDataHandler):
         tmpFile = self.ffmpeg_tmp_path + str(metaDataMapped.Id)
         
         if exists(tmpFile): remove(tmpFile)       
-        p = Popen((self.ffmpeg_path, '-i', contentPath, '-f', 'ffmetadata', tmpFile), stdin=PIPE, stdout=PIPE, stderr=STDOUT)
-        result = p.wait() 
+        result, output = self.mediaToolExecutor.run((self.ffmpeg_path, '-i', contentPath, '-f', 'ffmetadata', tmpFile))
         if exists(tmpFile): remove(tmpFile)  
         if result != 0: return False
 
@@ -111,10 +119,7 @@ class AudioPersistanceAlchemy(SessionSupport, IMetaDataHandler):
         audioDataEntry.Id = metaDataMapped.Id
         metadata = False
         
-        while True:
-            line = p.stdout.readline()
-            if not line: break
-            line = str(line, 'utf-8')  
+        for line in str(output, 'utf-8', 'replace').splitlines(True):
             if line.find('misdetection possible!') != -1: return False
             
             if metadata:
@@ -18,11 +18,10 @@ from ally.support.util_sys import pythonPath
 from datetime import datetime
 from os.path import join, splitext, abspath
 from sqlalchemy.exc import SQLAlchemyError
-from subprocess import Popen, PIPE, STDOUT
 from superdesk.media_archive.core.impl.meta_service_base import \
     thumbnailFormatFor, metaTypeFor
 from superdesk.media_archive.core.spec import IMetaDataHandler, \
-    IThumbnailManager
+    IThumbnailManager, IMediaToolExecutor
 from superdesk.media_archive.meta.image_data import META_TYPE_KEY, \
     ImageDataEntry
 from superdesk.media_archive.meta.image_info import ImageInfoMapped
@@ -51,6 +50,8 @@ class ImagePersistanceAlchemy(SessionSupport, IMetaDataHandler):
 
     thumbnailManager = IThumbnailManager; wire.entity('thumbnailManager')
     # Provides the thumbnail referencer
+    mediaToolExecutor = IMediaToolExecutor; wire.entity('mediaToolExecutor')
+    # Runs the media tools
 
     def __init__(self):
         assert isinstance(self.format_file_name, str), 'Invalid format file name %s' % self.format_file_name
@@ -58,6 +59,8 @@ class ImagePersistanceAlchemy(SessionSupport, IMetaDataHandler):
         assert isinstance(self.format_thumbnail, str), 'Invalid format thumbnail %s' % self.format_thumbnail
         assert isinstance(self.image_supported_files, str), 'Invalid supported files %s' % self.image_supported_files
         assert isinstance(self.thumbnailManager, IThumbnailManager), 'Invalid thumbnail manager %s' % self.thumbnailManager
+        assert isinstance(self.mediaToolExecutor, IMediaToolExecutor), \
+        'Invalid media tool executor %s' % self.mediaToolExecutor
 
         self.imageSupportedFiles = set(re.split('[\\s]*\\,[\\s]*', self.image_supported_files))
         self._defaultThumbnailFormatId = self._thumbnailFormatId = self._metaTypeId = None
@@ -74,6 +77,12 @@ class ImagePersistanceAlchemy(SessionSupport, IMetaDataHandler):
             handle(e, imageInfoMapped)
         return imageInfoMapped
 
+    def handles(self):
+        '''
+        @see: IMetaDataHandler.handles
+        '''
+        return META_TYPE_KEY, {extension.lower() for extension in self.imageSupportedFiles}
+
     def processByInfo(self, metaDataMapped, contentPath, contentType):
         '''
         @see: IMetaDataHandler.processByInfo
@@ -92,19 +101,14 @@ class ImagePersistanceAlchemy(SessionSupport, IMetaDataHandler):
         '''
         assert isinstance(metaDataMapped, MetaDataMapped), 'Invalid meta data mapped %s' % metaDataMapped
 
-        p = Popen([self.metadata_extractor_path, contentPath], stdin=PIPE, stdout=PIPE, stderr=STDOUT)
-        result = p.wait()
+        result, output = self.mediaToolExecutor.run((self.metadata_extractor_path, contentPath))
         # 253 is the exiv2 code for error: No Exif data found in the file
         if result != 0 and result != 253: return False
 
         imageDataEntry = ImageDataEntry()
         imageDataEntry.Id = metaDataMapped.Id
 
-        while True:
-            line = p.stdout.readline()
-            if not line: break
-            line = str(line, "utf-8")
-
+        for line in str(output, 'utf-8', 'replace').splitlines(True):
             property = self.extractProperty(line)
 
             if property is None:
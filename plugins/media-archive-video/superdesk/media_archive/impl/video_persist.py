@@ -20,11 +20,10 @@ from ally.internationalization import _
 from os import remove
 from os.path import exists, splitext, abspath, join
 from sqlalchemy.exc import SQLAlchemyError
-from subprocess import Popen, PIPE, STDOUT
 from superdesk.media_archive.core.impl.meta_service_base import \
     thumbnailFormatFor, metaTypeFor
 from superdesk.media_archive.core.spec import IMetaDataHandler, \
-    IThumbnailManager
+    IThumbnailManager, IMediaToolExecutor
 from superdesk.media_archive.meta.meta_data import MetaDataMapped
 from superdesk.media_archive.meta.video_data import META_TYPE_KEY, \
     VideoDataEntry
@@ -53,6 +52,8 @@ class VideoPersistanceAlchemy(SessionSupport, IMetaDataHandler):
 
     thumbnailManager = IThumbnailManager; wire.entity('thumbnailManager')
     # Provides the thumbnail referencer
+    mediaToolExecutor = IMediaToolExecutor; wire.entity('mediaToolExecutor')
+    # Runs the media tools
 
     def __init__(self):
         assert isinstance(self.format_file_name, str), 'Invalid format file name %s' % self.format_file_name
@@ -61,6 +62,8 @@ class VideoPersistanceAlchemy(SessionSupport, IMetaDataHandler):
         assert isinstance(self.video_supported_files, str), 'Invalid supported files %s' % self.video_supported_files
         assert isinstance(self.ffmpeg_path, str), 'Invalid ffmpeg path %s' % self.ffmpeg_path
         assert isinstance(self.thumbnailManager, IThumbnailManager), 'Invalid thumbnail manager %s' % self.thumbnailManager
+        assert isinstance(self.mediaToolExecutor, IMediaToolExecutor), \
+        'Invalid media tool executor %s' % self.mediaToolExecutor
 
         self.videoSupportedFiles = set(re.split('[\\s]*\\,[\\s]*', self.video_supported_files))
         self._defaultThumbnailFormatId = self._thumbnailFormatId = self._metaTypeId = None
@@ -76,6 +79,12 @@ class VideoPersistanceAlchemy(SessionSupport, IMetaDataHandler):
             handle(e, videoInfoMapped)
         return videoInfoMapped
 
+    def handles(self):
+        '''
+        @see: IMetaDataHandler.handles
+        '''
+        return META_TYPE_KEY, {extension.lower() for extension in self.videoSupportedFiles}
+
     def processByInfo(self, metaDataMapped, contentPath, contentType):
         '''
         @see: IMetaDataHandler.processByInfo
@@ -95,17 +104,14 @@ class VideoPersistanceAlchemy(SessionSupport, IMetaDataHandler):
         assert isinstance(metaDataMapped, MetaDataMapped), 'Invalid meta data mapped %s' % metaDataMapped
 
         thumbnailPath = contentPath + '.jpg'
-        p = Popen((self.ffmpeg_path, '-i', contentPath, '-vframes', '1', '-an', '-ss', '2', thumbnailPath),
-                  stdin=PIPE, stdout=PIPE, stderr=STDOUT)
-        if p.wait() != 0: return False
+        code, output = self.mediaToolExecutor.run((self.ffmpeg_path, '-i', contentPath, '-vframes', '1', '-an', '-ss', '2',
+                                                   thumbnailPath))
+        if code != 0: return False
         if not exists(thumbnailPath): return False
 
         videoDataEntry = VideoDataEntry()
         videoDataEntry.Id = metaDataMapped.Id
-        while True:
-            line = p.stdout.readline()
-            if not line: break
-            line = str(line, 'utf-8')
+        for line in str(output, 'utf-8', 'replace').splitlines(True):
             if line.find('misdetection possible!') != -1: return False
 
             if line.find('Video') != -1 and line.find('Stream') != -1:
@@ -12,14 +12,16 @@ Contains the services setups for media archive superdesk.
 from ..cdm import server_uri, repository_path
 from ..plugin.registry import registerService
 from ..superdesk import service
-from ..superdesk.db_superdesk import bindSuperdeskSession
+from ..superdesk.db_superdesk import bindSuperdeskSession, alchemySessionCreator
 from ally.cdm.impl.local_filesystem import LocalFileSystemCDM, HTTPDelivery, \
     IDelivery
 from ally.cdm.spec import ICDM
 from ally.cdm.support import ExtendPathCDM
 from ally.container import ioc, support, bind, app, wire
-from superdesk.media_archive.api.meta_data import IMetaDataService
+from superdesk.media_archive.api.meta_data import IMetaDataService, \
+    IMetaDataUploadService
 from superdesk.media_archive.core.impl.db_search import SqlSearchProvider
+from superdesk.media_archive.core.impl.meta_data_job import MetaDataJobRunner
 from superdesk.media_archive.core.impl.query_service_creator import \
     createService, ISearchProvider
 from superdesk.media_archive.core.impl.thumbnail_processor_avconv import \
@@ -29,7 +31,7 @@ from superdesk.media_archive.core.impl.thumbnail_processor_ffmpeg import \
 from superdesk.media_archive.core.impl.thumbnail_processor_gm import \
     ThumbnailProcessorGM
 from superdesk.media_archive.core.spec import IThumbnailManager, QueryIndexer, \
-    IQueryIndexer, IThumbnailProcessor
+    IQueryIndexer, IThumbnailProcessor, IMetaDataProcessor
 from superdesk.media_archive.impl.meta_data import IMetaDataHandler
 
 # --------------------------------------------------------------------
@@ -40,7 +42,7 @@ def addMetaDataHandler(handler):
 @ioc.entity
 def binders(): return [bindSuperdeskSession]
 
-bind.bindToEntities('superdesk.media_archive.core.impl.**.*Alchemy', binders=binders)
+bind.bindToEntities('superdesk.media_archive.core.impl.**.*Alchemy', IMetaDataProcessor, binders=binders)
 support.createEntitySetup('superdesk.media_archive.core.impl.**.*')
 support.listenToEntities(IMetaDataHandler, listeners=addMetaDataHandler, beforeBinding=False, module=service)
 support.loadAllEntities(IMetaDataHandler, module=service)
@@ -132,6 +134,20 @@ def thumbnailProcessor() -> IThumbnailProcessor:
 
 # --------------------------------------------------------------------
 
+@wire.wire(MetaDataJobRunner)
+@ioc.entity
+def metaDataJobRunner() -> MetaDataJobRunner:
+    b = MetaDataJobRunner()
+    b.sessionCreator = alchemySessionCreator()
+    return b
+
+@app.deploy
+def startMetaDataJobs():
+    # the ingest jobs are queued only by the staged uploads, otherwise there is nothing to poll for
+    if support.entityFor(IMetaDataUploadService).ingest_staged: metaDataJobRunner().start()
+
+# --------------------------------------------------------------------
+
 @app.deploy
 def publishQueryService():
     b = createService(queryIndexer(), cdmArchive(), support.entityFor(IThumbnailManager), searchProvider())
@@ -0,0 +1,30 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains upgrade functions
+'''
+
+from ..superdesk.db_superdesk import alchemySessionCreator
+from ally.container import app
+from ally.container.app import PRIORITY_LAST
+from sqlalchemy.exc import ProgrammingError, OperationalError
+from sqlalchemy.orm.session import Session
+
+# --------------------------------------------------------------------
+
+@app.populate(priority=PRIORITY_LAST)
+def upgradeMetaDataAvailable():
+    creator = alchemySessionCreator()
+    session = creator()
+    assert isinstance(session, Session)
+
+    try: session.execute("ALTER TABLE archive_meta_data ADD COLUMN is_available BOOLEAN NOT NULL DEFAULT 1")
+    except (ProgrammingError, OperationalError): pass
+
+    session.commit()
+    session.close()
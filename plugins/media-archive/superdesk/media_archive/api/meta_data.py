@@ -35,6 +35,7 @@ class MetaDataBase:
     SizeInBytes = int
     Creator = User
     CreatedOn = datetime
+    IsAvailable = bool
 
 # --------------------------------------------------------------------
 
@@ -0,0 +1,80 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+API specifications for the media archive ingest jobs.
+'''
+
+from .domain_archive import modelArchive
+from .meta_data import MetaData
+from ally.api.config import query, service, call, LIMIT_DEFAULT
+from ally.api.criteria import AsLikeOrdered, AsRangeOrdered, AsDateTimeOrdered
+from ally.api.type import Iter
+from ally.support.api.entity import Entity, QEntity
+from datetime import datetime
+
+# --------------------------------------------------------------------
+
+@modelArchive
+class MetaDataJob(Entity):
+    '''
+    Provides the ingest job of an uploaded meta data, the job probes the content, generates the thumbnails and indexes
+    the meta data after the upload. The id of the job is the id of the meta data, the status is one of 'queued',
+    'running', 'done' or 'failed'.
+    '''
+    MetaData = MetaData
+    Status = str
+    Attempts = int
+    Error = str
+    CreatedOn = datetime
+    UpdatedOn = datetime
+
+# --------------------------------------------------------------------
+
+@query(MetaDataJob)
+class QMetaDataJob(QEntity):
+    '''
+    The query for the meta data ingest jobs.
+    '''
+    status = AsLikeOrdered
+    attempts = AsRangeOrdered
+    createdOn = AsDateTimeOrdered
+    updatedOn = AsDateTimeOrdered
+
+# --------------------------------------------------------------------
+
+@service
+class IMetaDataJobService:
+    '''
+    Provides the service methods for the meta data ingest jobs.
+    '''
+
+    @call
+    def getById(self, id:MetaDataJob.Id) -> MetaDataJob:
+        '''
+        Provides the ingest job of the meta data.
+
+        @param id: integer
+            The id of the meta data.
+        @raise InputError: If the meta data has no ingest job.
+        '''
+
+    @call
+    def getAll(self, offset:int=None, limit:int=LIMIT_DEFAULT, detailed:bool=True,
+               q:QMetaDataJob=None) -> Iter(MetaDataJob):
+        '''
+        Provides the ingest jobs.
+
+        @param offset: integer
+            The offset to retrieve the jobs from.
+        @param limit: integer
+            The limit of jobs to retrieve.
+        @param detailed: boolean
+            If true will present the total count, limit and offset for the partially returned collection.
+        @param q: QMetaDataJob
+            The query to search by.
+        '''
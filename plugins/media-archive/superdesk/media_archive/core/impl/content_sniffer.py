@@ -0,0 +1,98 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the detection of the media type of a content based on its first bytes.
+'''
+
+# --------------------------------------------------------------------
+
+HEADER_SIZE = 64
+# The number of bytes read from the start of the content.
+
+TYPE_IMAGE = 'image'
+# The media type key of the images.
+TYPE_VIDEO = 'video'
+# The media type key of the videos.
+TYPE_AUDIO = 'audio'
+# The media type key of the audios.
+
+SIGNATURES = (
+    (0, b'\x89PNG\r\n\x1a\n', (TYPE_IMAGE,)),
+    (0, b'\xff\xd8\xff', (TYPE_IMAGE,)),
+    (0, b'GIF87a', (TYPE_IMAGE,)),
+    (0, b'GIF89a', (TYPE_IMAGE,)),
+    (0, b'II*\x00', (TYPE_IMAGE,)),
+    (0, b'MM\x00*', (TYPE_IMAGE,)),
+    (0, b'BM', (TYPE_IMAGE,)),
+    (0, b'FLV\x01', (TYPE_VIDEO,)),
+    (0, b'FWS', (TYPE_VIDEO,)),
+    (0, b'CWS', (TYPE_VIDEO,)),
+    (0, b'ZWS', (TYPE_VIDEO,)),
+    (0, b'\x00\x00\x01\xba', (TYPE_VIDEO,)),
+    (0, b'\x00\x00\x01\xb3', (TYPE_VIDEO,)),
+    (0, b'\x1aE\xdf\xa3', (TYPE_VIDEO,)),
+    (0, b'.RMF', (TYPE_VIDEO, TYPE_AUDIO)),
+    (0, b'0&\xb2u\x8ef\xcf\x11', (TYPE_VIDEO, TYPE_AUDIO)),
+    (4, b'moov', (TYPE_VIDEO,)),
+    (4, b'mdat', (TYPE_VIDEO,)),
+    (4, b'wide', (TYPE_VIDEO,)),
+    (0, b'ID3', (TYPE_AUDIO,)),
+    (0, b'OggS', (TYPE_AUDIO,)),
+    (0, b'fLaC', (TYPE_AUDIO,)),
+    (0, b'.snd', (TYPE_AUDIO,)),
+    (0, b'#!AMR', (TYPE_AUDIO,)),
+    )
+# The signatures as (offset, bytes, media types), the media types in the order of their likelihood.
+
+RIFF_TYPES = {b'WEBP': (TYPE_IMAGE,), b'AVI ': (TYPE_VIDEO,), b'WAVE': (TYPE_AUDIO,)}
+# The media types by RIFF form type.
+IFF_TYPES = {b'AIFF': (TYPE_AUDIO,), b'AIFC': (TYPE_AUDIO,)}
+# The media types by IFF form type.
+FTYP_AUDIO = (b'M4A ', b'M4B ', b'M4P ', b'F4A ', b'F4B ')
+# The ISO media brands that contain only audio.
+FTYP_MOBILE = (b'3gp', b'3g2')
+# The ISO media brands prefixes of the mobile media, that can contain video or only audio.
+
+# --------------------------------------------------------------------
+
+def sniff(path):
+    '''
+    Detects the media type of the file from its first bytes, without running any external tool.
+
+    @param path: string
+        The path of the file.
+    @return: tuple(string)
+        The media types the content can have, the most likely first, empty if the content has no known signature.
+    '''
+    with open(path, 'rb') as content: return sniffHeader(content.read(HEADER_SIZE))
+
+def sniffHeader(header):
+    '''
+    Detects the media type of a content from its first bytes.
+
+    @param header: bytes
+        The first bytes of the content, @see: HEADER_SIZE.
+    @return: tuple(string)
+        The media types the content can have, the most likely first, empty if the content has no known signature.
+    '''
+    assert isinstance(header, bytes), 'Invalid header %s' % header
+
+    if header[:4] == b'RIFF': return RIFF_TYPES.get(header[8:12], ())
+    if header[:4] == b'FORM': return IFF_TYPES.get(header[8:12], ())
+    if header[4:8] == b'ftyp':
+        brand = header[8:12]
+        if brand in FTYP_AUDIO: return (TYPE_AUDIO,)
+        if brand[:3] in FTYP_MOBILE: return (TYPE_VIDEO, TYPE_AUDIO)
+        return (TYPE_VIDEO,)
+
+    for offset, signature, types in SIGNATURES:
+        if header.startswith(signature, offset): return types
+
+    # the MPEG audio frames have no signature, only the frame synchronization bits
+    if len(header) > 1 and header[0] == 0xff and header[1] & 0xe0 == 0xe0: return (TYPE_AUDIO,)
+    return ()
@@ -162,7 +162,7 @@ class SqlSearchProvider(ISearchProvider):
     # ----------------------------------------------------------------
 
     def buildSubquery(self, session, metaInfo, metaData, qa, qi, qd, types):
-        sql = session.query(MetaDataMapped)
+        sql = session.query(MetaDataMapped).filter(MetaDataMapped.IsAvailable == True)
 
         if metaInfo == MetaInfoMapped and metaData == MetaDataMapped:
             if types:
@@ -0,0 +1,187 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Implementation for the executor of the external media tools.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from ally.container.support import setup
+from os.path import basename
+from subprocess import Popen, PIPE, STDOUT
+from superdesk.media_archive.core.spec import IMediaToolExecutor
+from threading import Lock, Semaphore, Thread, Timer
+import logging
+import shlex
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+TOOL_STATS = ('runs', 'failed', 'timedOut', 'seconds', 'maxSeconds', 'waitSeconds', 'maxWaitSeconds')
+# The metrics kept for each tool.
+CHUNK_SIZE = 65536
+# The size of the chunks read from the tools output.
+
+# --------------------------------------------------------------------
+
+@injected
+@setup(IMediaToolExecutor, name='mediaToolExecutor')
+class MediaToolExecutor(IMediaToolExecutor):
+    '''
+    Implementation for @see: IMediaToolExecutor that runs a limited number of tools at the same time, the other runs
+    wait for a free place. The output of a tool is read while the tool runs, so a tool with a large output is not
+    blocked on a full pipe, and a tool that runs longer than the timeout is killed.
+    '''
+
+    tool_workers = 4; wire.config('tool_workers', doc='''
+    The maximum number of media tools that run at the same time.''')
+    tool_timeout = 300; wire.config('tool_timeout', doc='''
+    The default number of seconds a media tool can run before it is killed.''')
+    tool_output_limit = 1048576; wire.config('tool_output_limit', doc='''
+    The maximum number of bytes kept from the output of a media tool, the rest of the output is discarded.''')
+    tool_log_interval = 300; wire.config('tool_log_interval', doc='''
+    The minimum number of seconds between the logs of the media tools metrics.''')
+
+    def __init__(self):
+        '''
+        Construct the media tool executor.
+        '''
+        assert isinstance(self.tool_workers, int) and self.tool_workers > 0, 'Invalid tool workers %s' % self.tool_workers
+        assert isinstance(self.tool_timeout, int) and self.tool_timeout > 0, 'Invalid tool timeout %s' % self.tool_timeout
+        assert isinstance(self.tool_output_limit, int) and self.tool_output_limit > 0, \
+        'Invalid tool output limit %s' % self.tool_output_limit
+        assert isinstance(self.tool_log_interval, int), 'Invalid tool log interval %s' % self.tool_log_interval
+
+        self._slots = Semaphore(self.tool_workers)
+        self._lock = Lock()
+        self._running = self._waiting = 0
+        self._tools = {}
+        self._logged = time.time()
+
+    def run(self, command, input=None, timeout=None):
+        '''
+        @see: IMediaToolExecutor.run
+        '''
+        if isinstance(command, str): command = shlex.split(command)
+        assert isinstance(command, (list, tuple)) and command, 'Invalid command %s' % command
+        assert input is None or isinstance(input, bytes), 'Invalid input %s' % input
+        if timeout is None: timeout = self.tool_timeout
+        assert isinstance(timeout, (int, float)) and timeout > 0, 'Invalid timeout %s' % timeout
+
+        queued = time.time()
+        with self._lock: self._waiting += 1
+        with self._slots:
+            started = time.time()
+            with self._lock: self._waiting, self._running = self._waiting - 1, self._running + 1
+            try: code, timedOut, output = self._execute(command, input, timeout)
+            finally:
+                with self._lock: self._running -= 1
+
+        self._record(basename(command[0]), code, timedOut, started - queued, time.time() - started)
+        return code, output
+
+    def metrics(self):
+        '''
+        @see: IMediaToolExecutor.metrics
+        The metrics of each tool are the number of 'runs', 'failed' and 'timedOut' runs, the average and maximum
+        'seconds' of the runs and the average and maximum 'waitSeconds' for a free place.
+        '''
+        with self._lock:
+            metrics = dict(running=self._running, waiting=self._waiting)
+            for tool, stats in self._tools.items(): metrics[tool] = dict(stats)
+
+        for tool, stats in metrics.items():
+            if not isinstance(stats, dict) or not stats['runs']: continue
+            stats['seconds'] /= stats['runs']
+            stats['waitSeconds'] /= stats['runs']
+        return metrics
+
+    # ----------------------------------------------------------------
+
+    def _execute(self, command, input, timeout):
+        '''
+        Runs the command, capturing its output, and kills it after the timeout.
+        '''
+        try: p = Popen(command, stdin=PIPE, stdout=PIPE, stderr=STDOUT)
+        except OSError:
+            log.exception('Cannot run the media tool %s', command[0])
+            return None, False, b''
+
+        chunks, killed = [], []
+        reader = Thread(name='Media tool output', target=self._read, args=(p.stdout, chunks))
+        reader.daemon = True
+        reader.start()
+        timer = Timer(timeout, self._kill, (p, killed))
+        timer.daemon = True
+        timer.start()
+        try:
+            try:
+                if input: p.stdin.write(input)
+                p.stdin.close()
+            except IOError: pass  # the tool exited without reading all the input
+            code = p.wait()
+            reader.join()
+        finally: timer.cancel()
+
+        if killed:
+            log.warning('Killed the media tool %s after %s seconds', ' '.join(command), timeout)
+            return None, True, b''.join(chunks)
+        return code, False, b''.join(chunks)
+
+    def _read(self, stream, chunks):
+        '''
+        Reads the tool output until the tool closes it, the output over the limit is discarded.
+        '''
+        size = 0
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk: break
+                if size < self.tool_output_limit: chunks.append(chunk[:self.tool_output_limit - size])
+                size += len(chunk)
+        finally: stream.close()
+
+    def _kill(self, p, killed):
+        '''
+        Kills the tool that ran longer than the timeout.
+        '''
+        killed.append(True)
+        try: p.kill()
+        except OSError: pass  # the tool finished meanwhile
+
+    def _record(self, tool, code, timedOut, waited, elapsed):
+        '''
+        Adds the run to the tool metrics and logs the metrics if the log interval passed.
+        '''
+        now = time.time()
+        with self._lock:
+            stats = self._tools.get(tool)
+            if stats is None: stats = self._tools[tool] = dict.fromkeys(TOOL_STATS, 0)
+            stats['runs'] += 1
+            if code != 0: stats['failed'] += 1
+            if timedOut: stats['timedOut'] += 1
+            stats['seconds'] += elapsed
+            stats['maxSeconds'] = max(stats['maxSeconds'], elapsed)
+            stats['waitSeconds'] += waited
+            stats['maxWaitSeconds'] = max(stats['maxWaitSeconds'], waited)
+
+            report = now - self._logged >= self.tool_log_interval
+            if report: self._logged = now
+        log.debug('Ran %s in %.3f seconds after waiting %.3f seconds', tool, elapsed, waited)
+
+        if report and log.isEnabledFor(logging.INFO):
+            metrics = self.metrics()
+            running, waiting = metrics.pop('running'), metrics.pop('waiting')
+            log.info('Media tools running %s, waiting %s, %s', running, waiting, ', '.join(
+                '%s %s runs (%s failed, %s timed out) %.3f/%.3f seconds, wait %.3f/%.3f seconds' %
+                (tool, stats['runs'], stats['failed'], stats['timedOut'], stats['seconds'], stats['maxSeconds'],
+                 stats['waitSeconds'], stats['maxWaitSeconds']) for tool, stats in sorted(metrics.items())))
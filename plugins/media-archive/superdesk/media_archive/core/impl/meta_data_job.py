@@ -0,0 +1,189 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the runner of the media archive ingest jobs.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from concurrent.futures.thread import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from os import getpid
+from random import getrandbits
+from socket import gethostname
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.expression import or_, and_
+from superdesk.media_archive.core.spec import IMetaDataProcessor
+from superdesk.media_archive.meta.meta_data_job import MetaDataJobMapped, \
+    JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+from threading import Condition, Thread
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+@injected
+class MetaDataJobRunner:
+    '''
+    Runs the ingest jobs of the uploaded meta data on a fixed number of workers, each worker processes one meta data at a
+    time so that only a few probing and thumbnail tools run at the same time, whatever the number of uploads. The jobs
+    are kept in the database, a job is claimed by one process at a time and a job abandoned by its process is claimed
+    again once its lock expires. A failed job is retried later, after the last attempt the meta data is made available
+    as other content.
+    '''
+
+    ingest_workers = 2; wire.config('ingest_workers', doc='''
+    The maximum number of uploaded meta data that are processed at the same time by this process.''')
+    ingest_attempts = 3; wire.config('ingest_attempts', doc='''
+    The number of times the processing of an uploaded meta data is attempted.''')
+    ingest_retry_delay = 30; wire.config('ingest_retry_delay', doc='''
+    The number of seconds after which a failed processing is attempted again, doubled after every attempt.''')
+    ingest_poll_interval = 2; wire.config('ingest_poll_interval', doc='''
+    The number of seconds between the checks for new uploads when there are free workers.''')
+    ingest_lock = 600; wire.config('ingest_lock', doc='''
+    The number of seconds a process has to finish the processing of a meta data, after that the job is considered
+    abandoned and is run again.''')
+    metaDataProcessor = IMetaDataProcessor; wire.entity('metaDataProcessor')
+    # The processor of the uploaded meta data.
+    sessionCreator = None
+    # The session creator used for the jobs transactions, it has to be set.
+
+    def __init__(self):
+        '''
+        Construct the meta data job runner.
+        '''
+        assert isinstance(self.ingest_workers, int) and self.ingest_workers > 0, \
+        'Invalid ingest workers %s' % self.ingest_workers
+        assert isinstance(self.ingest_attempts, int) and self.ingest_attempts > 0, \
+        'Invalid ingest attempts %s' % self.ingest_attempts
+        assert isinstance(self.ingest_retry_delay, int), 'Invalid ingest retry delay %s' % self.ingest_retry_delay
+        assert isinstance(self.ingest_poll_interval, (int, float)) and self.ingest_poll_interval > 0, \
+        'Invalid ingest poll interval %s' % self.ingest_poll_interval
+        assert isinstance(self.ingest_lock, int) and self.ingest_lock > 0, 'Invalid ingest lock %s' % self.ingest_lock
+        assert isinstance(self.metaDataProcessor, IMetaDataProcessor), \
+        'Invalid meta data processor %s' % self.metaDataProcessor
+        assert callable(self.sessionCreator), 'Invalid session creator %s' % self.sessionCreator
+
+        self._owner = ('%s:%d:%x' % (gethostname(), getpid(), getrandbits(32)))[:100]
+        self._condition = Condition()
+        self._running = 0
+        self._thread = None
+        self._pool = ThreadPoolExecutor(self.ingest_workers)
+
+    def start(self):
+        '''
+        Starts running the ingest jobs.
+        '''
+        with self._condition:
+            if self._thread is not None: return
+            self._thread = Thread(name='media ingest', target=self._dispatch)
+            self._thread.daemon = True
+            self._thread.start()
+
+    # ----------------------------------------------------------------
+
+    def _dispatch(self):
+        '''
+        Claims the jobs for the free workers, it never returns.
+        '''
+        while True:
+            with self._condition:
+                while self._running >= self.ingest_workers: self._condition.wait()
+                free = self.ingest_workers - self._running
+
+            try: claimed = self._transaction(self._claim, free)
+            except:
+                log.exception('Cannot claim the media ingest jobs')
+                claimed = ()
+
+            with self._condition:
+                self._running += len(claimed)
+                for job in claimed: self._pool.submit(self._run, *job)
+                if len(claimed) < free: self._condition.wait(self.ingest_poll_interval)
+
+    def _claim(self, session, limit):
+        '''
+        Claims the queued jobs and the abandoned ones.
+
+        @return: list[tuple(integer, integer, string|None)]
+            The id, attempt and content type of the claimed jobs.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        now = datetime.now()
+        claimable = or_(and_(MetaDataJobMapped.Status == JOB_QUEUED, MetaDataJobMapped.nextRun <= now),
+                        and_(MetaDataJobMapped.Status == JOB_RUNNING, MetaDataJobMapped.lockedUntil < now))
+
+        sql = session.query(MetaDataJobMapped.Id, MetaDataJobMapped.Attempts, MetaDataJobMapped.contentType)
+        sql = sql.filter(claimable).order_by(MetaDataJobMapped.nextRun).limit(limit)
+        claimed = []
+        for jobId, attempts, contentType in sql.all():
+            # the job is claimed only if no other process claimed it in the mean time
+            sql = session.query(MetaDataJobMapped).filter(MetaDataJobMapped.Id == jobId).filter(claimable)
+            if sql.update({MetaDataJobMapped.Status: JOB_RUNNING, MetaDataJobMapped.owner: self._owner,
+                           MetaDataJobMapped.lockedUntil: now + timedelta(seconds=self.ingest_lock),
+                           MetaDataJobMapped.Attempts: attempts + 1, MetaDataJobMapped.UpdatedOn: now},
+                          synchronize_session=False):
+                claimed.append((jobId, attempts + 1, contentType))
+        return claimed
+
+    def _run(self, jobId, attempt, contentType):
+        '''
+        Runs the claimed job.
+        '''
+        try:
+            try: self.metaDataProcessor.process(jobId, contentType)
+            except Exception as e:
+                log.exception('Cannot process the meta data %s in attempt %d', jobId, attempt)
+                error = (str(e) or e.__class__.__name__)[:1024]
+                if attempt < self.ingest_attempts:
+                    delay = timedelta(seconds=self.ingest_retry_delay * 2 ** (attempt - 1))
+                    self._transaction(self._finish, jobId, JOB_QUEUED, error, delay)
+                    return
+
+                # the content could not be identified, at least it is archived
+                try: self.metaDataProcessor.process(jobId, contentType, False)
+                except: log.exception('Cannot make available the meta data %s', jobId)
+                self._transaction(self._finish, jobId, JOB_FAILED, error)
+            else: self._transaction(self._finish, jobId, JOB_DONE)
+        except: log.exception('Cannot run the ingest job of meta data %s', jobId)
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify()
+
+    def _finish(self, session, jobId, status, error=None, delay=None):
+        '''
+        Updates the claimed job, if the job has been claimed by another process in the mean time it is left unchanged.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        now = datetime.now()
+        values = {MetaDataJobMapped.Status: status, MetaDataJobMapped.Error: error, MetaDataJobMapped.owner: None,
+                  MetaDataJobMapped.lockedUntil: None, MetaDataJobMapped.UpdatedOn: now}
+        if delay is not None: values[MetaDataJobMapped.nextRun] = now + delay
+
+        sql = session.query(MetaDataJobMapped).filter(MetaDataJobMapped.Id == jobId)
+        sql = sql.filter(MetaDataJobMapped.owner == self._owner)
+        sql.update(values, synchronize_session=False)
+
+    def _transaction(self, call, *args):
+        '''
+        Calls the function with a new session and commits.
+        '''
+        session = self.sessionCreator()
+        assert isinstance(session, Session)
+        try:
+            result = call(session, *args)
+            session.commit()
+            return result
+        except:
+            session.rollback()
+            raise
+        finally: session.close()
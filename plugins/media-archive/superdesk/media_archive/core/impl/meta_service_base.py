@@ -111,9 +111,9 @@ class MetaDataServiceBaseAlchemy(SessionSupport, IMetaDataService):
 
     def buildSql(self, typeId, q):
         '''
-        Build the sql alchemy based on the provided data.
+        Build the sql alchemy based on the provided data, the meta data that are still ingested are not listed.
         '''
-        sql = self.session().query(self.MetaData)
+        sql = self.session().query(self.MetaData).filter(self.MetaData.IsAvailable == True)
         if typeId: sql = sql.filter(self.MetaData.typeId == typeId)
         if q:
             assert isinstance(q, self.QMetaData)
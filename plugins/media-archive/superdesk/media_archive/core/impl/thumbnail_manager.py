@@ -19,12 +19,13 @@ from ally.internationalization import _
 from ally.support.sqlalchemy.session import SessionSupport
 from ally.support.util_io import timestampURI
 from collections import OrderedDict
-from os.path import splitext
+from os.path import splitext, exists
 from superdesk.media_archive.api.meta_data import MetaData
 from superdesk.media_archive.core.spec import IThumbnailManager, \
     IThumbnailProcessor
 from superdesk.media_archive.meta.meta_data import ThumbnailFormat
 import logging
+import time
 
 # --------------------------------------------------------------------
 
@@ -45,6 +46,12 @@ class ThumbnailManagerAlchemy(SessionSupport, IThumbnailManager):
     This is basically just a simple dictionary{string, tuple(integer, integer)} that has as key a path safe name and as
     a value a tuple with the width/height of the thumbnail, example: {'small': [100, 100]}.
     ''')
+    thumbnail_eager = True; wire.config('thumbnail_eager', doc='''
+    If true the thumbnails of all sizes are made when the original thumbnail is placed, otherwise each thumbnail size
+    is made when it is first requested.''')
+    thumbnail_missing_recheck = 60; wire.config('thumbnail_missing_recheck', doc='''
+    The number of seconds a thumbnail found missing is not looked for again in the repository, after it the thumbnail is
+    looked for again since it might have been made meanwhile by another process.''')
     thumbnailProcessor = IThumbnailProcessor; wire.entity('thumbnailProcessor')
     cdmThumbnail = ICDM; wire.entity('cdmThumbnail')
     # the content delivery manager where to publish thumbnails
@@ -54,6 +61,9 @@ class ThumbnailManagerAlchemy(SessionSupport, IThumbnailManager):
     def __init__(self):
         assert isinstance(self.original_size, str), 'Invalid original size %s' % self.original_size
         assert isinstance(self.thumbnail_sizes, dict), 'Invalid thumbnail sizes %s' % self.thumbnail_sizes
+        assert isinstance(self.thumbnail_eager, bool), 'Invalid thumbnail eager flag %s' % self.thumbnail_eager
+        assert isinstance(self.thumbnail_missing_recheck, (int, float)), \
+        'Invalid thumbnail missing recheck %s' % self.thumbnail_missing_recheck
         assert isinstance(self.thumbnailProcessor, IThumbnailProcessor), \
         'Invalid thumbnail processor %s' % self.thumbnailProcessor
         assert isinstance(self.cdmThumbnail, ICDM), 'Invalid thumbnail CDM %s' % self.cdmThumbnail
@@ -63,6 +73,11 @@ class ThumbnailManagerAlchemy(SessionSupport, IThumbnailManager):
         thumbnailSizes.sort(key=lambda pack: pack[1][0] * pack[1][1])
         self.thumbnailSizes = OrderedDict(thumbnailSizes)
         self._cache_thumbnail = {}
+        self._thumbnails = {}
+        # The generated thumbnails paths indexed with their URIs by scheme, a thumbnail is indexed when it is made or
+        # when it is first found in the repository.
+        self._missing = {}
+        # The time when the thumbnails paths that are not in the repository have been looked for.
 
     # ----------------------------------------------------------------
     
@@ -88,6 +103,33 @@ class ThumbnailManagerAlchemy(SessionSupport, IThumbnailManager):
                 thumbPath, thumbProcPath = self.cdmThumbnail.getURI(thumbPath, 'file'), self.cdmThumbnail.getURI(thumbProcPath, 'file')
                 self.thumbnailProcessor.processThumbnail(thumbPath, thumbProcPath)
 
+            self._index(self.thumbnailPath(thumbnailFormatId, metaData), True)
+            if self.thumbnail_eager: self.processSizes(thumbnailFormatId, metaData)
+
+    def processSizes(self, thumbnailFormatId, metaData=None):
+        '''
+        Makes the thumbnails of all sizes from the original thumbnail with a single processing.
+
+        @param thumbnailFormatId: integer
+            The thumbnail path format identifier
+        @param metaData: MetaData|None
+            The object containing the content metadata for which the thumbnails are made.
+        '''
+        original = self.cdmThumbnail.getURI(self.thumbnailPath(thumbnailFormatId, metaData), 'file')
+        thumbPaths, targets = [], []
+        for size, (width, height) in self.thumbnailSizes.items():
+            thumbPath = self.thumbnailPath(thumbnailFormatId, metaData, size)
+            thumbPaths.append(thumbPath)
+            targets.append((self.cdmThumbnail.getURI(thumbPath, 'file'), width, height))
+
+        try: self.thumbnailProcessor.processThumbnails(original, targets)
+        except (IOError, OSError):
+            # the thumbnails that are missing are made when requested
+            log.exception('Cannot process the thumbnails of \'%s\'', original)
+
+        for thumbPath, (destination, _width, _height) in zip(thumbPaths, targets):
+            if exists(destination): self._index(thumbPath)
+
     # ----------------------------------------------------------------
     
     def deleteThumbnail(self, thumbnailFormatId, metaData):
@@ -101,11 +143,13 @@ class ThumbnailManagerAlchemy(SessionSupport, IThumbnailManager):
         thumbPath = self.thumbnailPath(thumbnailFormatId, metaData)
         format = self._cache_thumbnail.get(thumbnailFormatId)
         if format.find("id") == -1: return
+        self._thumbnails.pop(thumbPath, None)
         try: self.cdmThumbnail.remove(thumbPath)
         except PathNotFound: return
                 
         for size in self.thumbnail_sizes:
             thumbPath = self.thumbnailPath(thumbnailFormatId, metaData, size)
+            self._thumbnails.pop(thumbPath, None)
             try: self.cdmThumbnail.remove(thumbPath)
             except PathNotFound: 
                 # the thumbnail for this size not generated yet
@@ -123,17 +167,24 @@ class ThumbnailManagerAlchemy(SessionSupport, IThumbnailManager):
         if not metaData.thumbnailFormatId: return metaData
 
         thumbPath = self.thumbnailPath(metaData.thumbnailFormatId, metaData, size)
-        try: self.cdmThumbnail.getTimestamp(thumbPath)
-        except PathNotFound:
-            original = self.thumbnailPath(metaData.thumbnailFormatId, metaData)
-            original = self.cdmThumbnail.getURI(original, 'file')
-
-            if size:
+        uris = self._thumbnails.get(thumbPath)
+        if uris is None and time.time() - self._missing.get(thumbPath, 0) > self.thumbnail_missing_recheck:
+            # the thumbnail is not indexed, it might have been made before or by another process or it is not made yet
+            uris = self._index(thumbPath, True)
+            if uris is None and size:
                 if size not in self.thumbnailSizes: raise InputError(_('Unknown size \'%s\'') % size)
+                original = self.thumbnailPath(metaData.thumbnailFormatId, metaData)
+                original = self.cdmThumbnail.getURI(original, 'file')
+
                 width, height = self.thumbnailSizes[size]
                 self.thumbnailProcessor.processThumbnail(original, self.cdmThumbnail.getURI(thumbPath, 'file'), width, height)
+                uris = self._index(thumbPath, True)
 
-        metaData.Thumbnail = self.cdmThumbnail.getURI(thumbPath, scheme)
+        uri = uris.get(scheme) if uris is not None else None
+        if uri is None:
+            uri = self.cdmThumbnail.getURI(thumbPath, scheme)
+            if uris is not None: uris[scheme] = uri
+        metaData.Thumbnail = uri
         return metaData
 
     # ----------------------------------------------------------------
@@ -155,3 +206,16 @@ class ThumbnailManagerAlchemy(SessionSupport, IThumbnailManager):
             keys.update(id=metaData.Id, file=metaData.Name, name=splitext(metaData.Name)[0])
 
         return format % keys
+
+    def _index(self, thumbPath, check=False):
+        '''
+        Adds the thumbnail to the index and provides its URIs by scheme, if check is True the thumbnail is indexed only
+        if it exists and None is returned otherwise, in which case the thumbnail is marked as missing.
+        '''
+        if check:
+            try: self.cdmThumbnail.getTimestamp(thumbPath)
+            except PathNotFound:
+                self._missing[thumbPath] = time.time()
+                return None
+        self._missing.pop(thumbPath, None)
+        return self._thumbnails.setdefault(thumbPath, {})
@@ -16,8 +16,7 @@ from ally.support.util_sys import pythonPath
 from genericpath import exists
 from os import makedirs
 from os.path import join, abspath, dirname
-from subprocess import Popen
-from superdesk.media_archive.core.spec import IThumbnailProcessor
+from superdesk.media_archive.core.spec import IThumbnailProcessor, IMediaToolExecutor
 import logging
 import os
 
@@ -40,10 +39,14 @@ class ThumbnailProcessorAVConv(IThumbnailProcessor):
     avconv_path = join('/', 'usr', 'bin', 'avconv'); wire.config('avconv_path', doc='''
     The path where the avconv is found''')
 
+    mediaToolExecutor = IMediaToolExecutor; wire.entity('mediaToolExecutor')
+
     def __init__(self):
         assert isinstance(self.command_transform, str), 'Invalid command transform %s' % self.command_transform
         assert isinstance(self.command_resize, str), 'Invalid command resize %s' % self.command_resize
         assert isinstance(self.avconv_path, str), 'Invalid avconv path %s' % self.avconv_path
+        assert isinstance(self.mediaToolExecutor, IMediaToolExecutor), \
+        'Invalid media tool executor %s' % self.mediaToolExecutor
 
     def processThumbnail(self, source, destination, width=None, height=None):
         '''
@@ -71,14 +74,9 @@ class ThumbnailProcessorAVConv(IThumbnailProcessor):
 
         destDir = dirname(destination)
         if not exists(destDir): makedirs(destDir)
-        try:
-            p = Popen(command)
-            error = p.wait() != 0
-        except:
-            log.exception('Problems while executing command:\n % s', command)
-            error = True
-
-        if error:
+        code, output = self.mediaToolExecutor.run(command)
+        if code != 0:
+            log.warning('Problems while executing command:\n%s \n%s', command, str(output, 'utf-8', 'replace'))
             if exists(destination): os.remove(destination)
             raise IOError('Cannot process thumbnail from \'%s\' to \'%s\'' % (source, destination))
 
@@ -14,11 +14,9 @@ from ally.container.ioc import injected
 from genericpath import exists
 from os import makedirs
 from os.path import join, abspath, dirname
-from subprocess import Popen, PIPE
-from superdesk.media_archive.core.spec import IThumbnailProcessor
+from superdesk.media_archive.core.spec import IThumbnailProcessor, IMediaToolExecutor
 import logging
 import os
-import shlex
 
 # --------------------------------------------------------------------
 
@@ -39,10 +37,14 @@ class ThumbnailProcessorFfmpeg(IThumbnailProcessor):
     ffmpeg_path = join('/', 'usr', 'bin', 'ffmpeg'); wire.config('ffmpeg_path', doc='''
     The path where the ffmpeg is found''')
 
+    mediaToolExecutor = IMediaToolExecutor; wire.entity('mediaToolExecutor')
+
     def __init__(self):
         assert isinstance(self.command_transform, str), 'Invalid command transform %s' % self.command_transform
         assert isinstance(self.command_resize, str), 'Invalid command resize %s' % self.command_resize
         assert isinstance(self.ffmpeg_path, str), 'Invalid ffmpeg path %s' % self.ffmpeg_path
+        assert isinstance(self.mediaToolExecutor, IMediaToolExecutor), \
+        'Invalid media tool executor %s' % self.mediaToolExecutor
 
     def processThumbnail(self, source, destination, width=None, height=None):
         '''
@@ -70,14 +72,9 @@ class ThumbnailProcessorFfmpeg(IThumbnailProcessor):
 
         destDir = dirname(destination)
         if not exists(destDir): makedirs(destDir)
-        try:
-            p = Popen(shlex.split(command), stdin=PIPE, stdout=PIPE, stderr=PIPE)
-            error = p.wait() != 0
-        except Exception as e:
-            log.exception('Problems while executing command:\n%s \n%s' % (command, e))
-            error = True
-
-        if error:
+        code, output = self.mediaToolExecutor.run(command)
+        if code != 0:
+            log.warning('Problems while executing command:\n%s \n%s', command, str(output, 'utf-8', 'replace'))
             if exists(destination): os.remove(destination)
             #raise IOError('Cannot process thumbnail from \'%s\' to \'%s\'' % (source, destination))
 
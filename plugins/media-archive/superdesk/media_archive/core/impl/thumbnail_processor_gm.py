@@ -14,8 +14,7 @@ from ally.container.ioc import injected
 from genericpath import exists
 from os import makedirs
 from os.path import join, dirname
-from subprocess import Popen, PIPE
-from superdesk.media_archive.core.spec import IThumbnailProcessor
+from superdesk.media_archive.core.spec import IThumbnailProcessor, IMediaToolExecutor
 import logging
 import os
 import shlex
@@ -24,6 +23,9 @@ import shlex
 
 log = logging.getLogger(__name__)
 
+CHARACTERS_UNBATCHABLE = '"\'\\\n\r'
+# The characters that can not be placed in the quoted arguments of a gm batch line.
+
 # --------------------------------------------------------------------
 
 @injected
@@ -38,19 +40,67 @@ class ThumbnailProcessorGM(IThumbnailProcessor):
     wire.config('command_resize', doc='''The command used to resize the thumbnails''')
     command_scale_to_height = '"%(gm)s" convert "%(source)s" -resize x%(height)i  "%(destination)s"'
     wire.config('command_scale_to_height', doc='''The command used to resize the thumbnails to specific heights''')
+    command_batch = '"%(gm)s" batch -stop-on-error off'; wire.config('command_batch', doc='''
+    The command used to make several thumbnails with a single run, the gm commands are provided on the input''')
     gm_path = join('/', 'usr', 'bin', 'gm'); wire.config('gm_path', doc='''
     The path where the gm is found''')
 
+    mediaToolExecutor = IMediaToolExecutor; wire.entity('mediaToolExecutor')
+
     def __init__(self):
         assert isinstance(self.command_transform, str), 'Invalid command transform %s' % self.command_transform
         assert isinstance(self.command_resize, str), 'Invalid command resize %s' % self.command_resize
         assert isinstance(self.command_scale_to_height, str), 'Invalid command resize to height %s' % self.command_scale_to_height
+        assert isinstance(self.command_batch, str), 'Invalid command batch %s' % self.command_batch
         assert isinstance(self.gm_path, str), 'Invalid gm path %s' % self.gm_path
+        assert isinstance(self.mediaToolExecutor, IMediaToolExecutor), \
+        'Invalid media tool executor %s' % self.mediaToolExecutor
 
     def processThumbnail(self, source, destination, width=None, height=None):
         '''
         @see: IThumbnailProcessor.processThumbnail
         '''
+        code, _output = self.mediaToolExecutor.run(self._command(source, destination, width, height))
+        self._finish(destination, code != 0)
+
+    def processThumbnails(self, source, targets):
+        '''
+        @see: IThumbnailProcessor.processThumbnails
+        All the thumbnails are made by a single gm batch run, if the batch fails the thumbnails are made one by one. The
+        gm batch lines have no escaping, so the thumbnails with paths that contain quotes, back slashes or new lines are
+        made one by one.
+        '''
+        targets, lines = list(targets), []
+        if not isBatchable(source):
+            for destination, width, height in targets: self.processThumbnail(source, destination, width, height)
+            return
+
+        batched = []
+        for destination, width, height in targets:
+            if not isBatchable(destination):
+                self.processThumbnail(source, destination, width, height)
+                continue
+            command = shlex.split(self._command(source, destination, width, height))
+            lines.append(' '.join('"%s"' % arg for arg in command[1:]))
+            batched.append((destination, width, height))
+        if not lines: return
+        targets = batched
+
+        code, output = self.mediaToolExecutor.run(self.command_batch % dict(gm=self.gm_path),
+                                                  input=('\n'.join(lines) + '\n').encode('utf-8'))
+        if code == 0:
+            for destination, _width, _height in targets: self._finish(destination, False)
+            return
+
+        log.warning('Cannot batch the thumbnails of \'%s\':\n%s', source, str(output, 'utf-8', 'replace'))
+        for destination, width, height in targets: self.processThumbnail(source, destination, width, height)
+
+    # ----------------------------------------------------------------
+
+    def _command(self, source, destination, width, height):
+        '''
+        Provides the command that makes the thumbnail, the destination directory is created if needed.
+        '''
         assert isinstance(source, str), 'Invalid source path %s' % source
         assert isinstance(destination, str), 'Invalid destination path %s' % destination
 
@@ -72,18 +122,23 @@ class ThumbnailProcessorGM(IThumbnailProcessor):
 
         destDir = dirname(destination)
         if not exists(destDir): makedirs(destDir)
-        try:
-            p = Popen(shlex.split(command), stdin=PIPE, stdout=PIPE, stderr=PIPE)
-            error = p.wait() != 0
-        except Exception as e:
-            log.exception('Problems while executing command:\n%s \n%s' % (command, e))
-            error = True
+        return command
 
+    def _finish(self, destination, error):
+        '''
+        Removes the thumbnail that failed and renames the thumbnail of animated images.
+        '''
         if exists(destination):
             if error: os.remove(destination)
             #raise IOError('Cannot process thumbnail from \'%s\' to \'%s\'' % (source, destination))
         elif exists(destination + '.0'):
             #older version of gm generates a file from every image from animated gifs
             os.rename(destination + '.0', destination)
-            
 
+# --------------------------------------------------------------------
+
+def isBatchable(path):
+    '''
+    Checks if the path can be placed in a gm batch line.
+    '''
+    return not any(character in path for character in CHARACTERS_UNBATCHABLE)
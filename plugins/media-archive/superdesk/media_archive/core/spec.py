@@ -94,6 +94,40 @@ class IMetaDataHandler(metaclass=abc.ABCMeta):
             Return the MetaInfoMapped created object.
         '''
 
+    def handles(self):
+        '''
+        Provides the media type and the file extensions of the contents handled, used for choosing the only handler that
+        processes a content, so that a single handler probes the content.
+
+        @return: tuple(string, Iterable(string))|None
+            The media type key, as detected by the content sniffer, and the lower case file extensions handled, None if
+            the handler has to be tried on the contents that no other handler takes.
+        '''
+        return None
+
+# --------------------------------------------------------------------
+
+class IMetaDataProcessor(metaclass=abc.ABCMeta):
+    '''
+    Interface that provides the processing of the uploaded meta data's, the processing is made after the upload when
+    the content is ingested in stages.
+    '''
+
+    @abc.abstractclassmethod
+    def process(self, metaDataId, contentType=None, probe=True):
+        '''
+        Processes the stored content of the meta data, the content is identified by the meta data handlers that add the
+        meta info and generate the thumbnails, then the meta data is indexed and made available. The method takes no
+        action if the meta data is already available.
+
+        @param metaDataId: integer
+            The id of the meta data to process.
+        @param contentType: string|None
+            The content type of uploaded file.
+        @param probe: boolean
+            If False the content is not identified by the handlers, the meta data is made available as other content.
+        '''
+
 # --------------------------------------------------------------------
 
 class IThumbnailManager(IMetaDataReferencer):
@@ -145,6 +179,49 @@ class IThumbnailProcessor(metaclass=abc.ABCMeta):
             The thumbnail height.
         '''
 
+    def processThumbnails(self, source, targets):
+        '''
+        Create several thumbnails for the provided content, the processors that can make all the thumbnails with a single
+        tool run should override this, by default the thumbnails are created one by one.
+
+        @param source: string
+            The content local file system path where the thumbnail to be resized can be found.
+        @param targets: Iterable(tuple(string, integer|None, integer|None))
+            The destination local file system path, the width and the height of each thumbnail.
+        '''
+        for destination, width, height in targets: self.processThumbnail(source, destination, width, height)
+
+class IMediaToolExecutor(metaclass=abc.ABCMeta):
+    '''
+    Specification class that runs the external media tools, like exiv2, ffmpeg, avconv or gm.
+    '''
+
+    @abc.abstractclassmethod
+    def run(self, command, input=None, timeout=None):
+        '''
+        Runs the tool and waits for it to finish.
+
+        @param command: string|list(string)
+            The tool command, a string command is split as the shell does.
+        @param input: bytes|None
+            The content to be written on the tool standard input.
+        @param timeout: integer|None
+            The maximum number of seconds the tool can run, None for the default timeout.
+        @return: tuple(integer|None, bytes)
+            The exit code of the tool, None if the tool could not be started or has been killed after the timeout, and
+            the standard output and error of the tool.
+        '''
+
+    @abc.abstractclassmethod
+    def metrics(self):
+        '''
+        Provides the metrics of the tools runs.
+
+        @return: dictionary{string: integer|dictionary{string: integer|float}}
+            The number of tools 'running' and 'waiting' for a free place, and for each tool name the metrics of its
+            runs.
+        '''
+
 class IQueryIndexer:
     '''
         Manages the query related information about plugins in order to be able to support
@@ -11,38 +11,42 @@ SQL Alchemy based implementation for the meta data API.
 
 from ..api.meta_data import QMetaData
 from ..core.impl.meta_service_base import MetaDataServiceBaseAlchemy
-from ..core.spec import IMetaDataHandler, IMetaDataReferencer, IThumbnailManager
+from ..core.spec import IMetaDataHandler, IMetaDataReferencer, IThumbnailManager, \
+    IMetaDataProcessor
 from ..meta.meta_data import MetaDataMapped
 from ally.api.model import Content
 from ally.cdm.spec import ICDM
 from ally.container import wire, app
 from ally.container.ioc import injected
 from ally.container.support import setup
-from ally.exception import InputError
+from ally.exception import InputError, Ref
 from ally.internationalization import _
 from ally.support.sqlalchemy.util_service import handle
 from ally.support.util_sys import pythonPath
 from datetime import datetime
-from os.path import join, getsize, abspath
+from os.path import join, getsize, abspath, splitext
 from sqlalchemy.exc import SQLAlchemyError
 from superdesk.language.meta.language import LanguageEntity
 from superdesk.media_archive.api.meta_data import IMetaDataUploadService
+from superdesk.media_archive.core.impl.content_sniffer import sniff
 from superdesk.media_archive.core.impl.meta_service_base import metaTypeFor, \
     thumbnailFormatFor
 from superdesk.media_archive.core.impl.query_service_creator import \
     ISearchProvider
 from superdesk.media_archive.meta.meta_data import META_TYPE_KEY
 from superdesk.media_archive.meta.meta_info import MetaInfoMapped
+from superdesk.media_archive.meta.meta_data_job import MetaDataJobMapped, JOB_QUEUED
 
 
 # --------------------------------------------------------------------
 
 @injected
-@setup(IMetaDataUploadService, name='metaDataService')
-class MetaDataServiceAlchemy(MetaDataServiceBaseAlchemy, IMetaDataReferencer, IMetaDataUploadService):
+@setup(IMetaDataUploadService, IMetaDataProcessor, name='metaDataService')
+class MetaDataServiceAlchemy(MetaDataServiceBaseAlchemy, IMetaDataReferencer, IMetaDataUploadService,
+                             IMetaDataProcessor):
     '''
     Implementation for @see: IMetaDataService, @see: IMetaDataUploadService , and also provides services
-    as the @see: IMetaDataReferencer
+    as the @see: IMetaDataReferencer and @see: IMetaDataProcessor
     '''
 
     format_file_name = '%(id)s.%(name)s'; wire.config('format_file_name', doc='''
@@ -58,6 +62,10 @@ class MetaDataServiceAlchemy(MetaDataServiceBaseAlchemy, IMetaDataReferencer, IM
     searchProvider = ISearchProvider; wire.entity('searchProvider')
     # The search provider that will be used to manage all search related activities
     default_media_language = 'en'; wire.config('default_media_language')
+    ingest_staged = False; wire.config('ingest_staged', doc='''
+    If true the upload only stores the content and the meta data, not available yet, the content is probed, the
+    thumbnails are generated and the meta data is indexed afterwards by the ingest jobs. If false all this is done
+    in the upload, as the upload callers expect the meta data to be complete when the upload returns.''')
 
     languageId = None
 
@@ -72,11 +80,13 @@ class MetaDataServiceAlchemy(MetaDataServiceBaseAlchemy, IMetaDataReferencer, IM
         assert isinstance(self.thumbnailManager, IThumbnailManager), 'Invalid thumbnail manager %s' % self.thumbnailManager
         assert isinstance(self.metaDataHandlers, list), 'Invalid reference handlers %s' % self.referenceHandlers
         assert isinstance(self.searchProvider, ISearchProvider), 'Invalid search provider %s' % self.searchProvider
+        assert isinstance(self.ingest_staged, bool), 'Invalid ingest staged flag %s' % self.ingest_staged
 
 
         MetaDataServiceBaseAlchemy.__init__(self, MetaDataMapped, QMetaData, self, self.cdmArchive, self.thumbnailManager)
 
         self._thumbnailFormatId = self._metaTypeId = None
+        self._handlersByType = self._typesByExtension = self._handlersUntyped = None
 
     # ----------------------------------------------------------------
 
@@ -87,9 +97,6 @@ class MetaDataServiceAlchemy(MetaDataServiceBaseAlchemy, IMetaDataReferencer, IM
         assert isinstance(content, Content), 'Invalid content %s' % content
         if not content.name: raise InputError(_('No name specified for content'))
 
-        if self.languageId is None:
-            self.languageId = self.session().query(LanguageEntity).filter(LanguageEntity.Code == self.default_media_language).one().Id
-
         metaData = MetaDataMapped()
         # TODO: check this
         # metaData.CreatedOn = current_timestamp()
@@ -100,6 +107,7 @@ class MetaDataServiceAlchemy(MetaDataServiceBaseAlchemy, IMetaDataReferencer, IM
         metaData.typeId = self.metaTypeId()
         metaData.Type = META_TYPE_KEY
         metaData.thumbnailFormatId = self.thumbnailFormatId()
+        metaData.IsAvailable = not self.ingest_staged
 
         try:
             self.session().add(metaData)
@@ -113,39 +121,126 @@ class MetaDataServiceAlchemy(MetaDataServiceBaseAlchemy, IMetaDataReferencer, IM
             metaData.content = path
             metaData.SizeInBytes = getsize(contentPath)
 
-            found = False
-            for handler in self.metaDataHandlers:
-                assert isinstance(handler, IMetaDataHandler), 'Invalid handler %s' % handler
-                if handler.processByInfo(metaData, contentPath, content.type):
-                    metaInfo = handler.addMetaInfo(metaData, self.languageId)
-                    found = True
-                    break
-            else:
-                for handler in self.metaDataHandlers:
-                    if handler.process(metaData, contentPath):
-                        metaInfo = handler.addMetaInfo(metaData, self.languageId)
-                        found = True
-                        break
+            if self.ingest_staged:
+                # the content is processed later by the ingest jobs
+                job = MetaDataJobMapped()
+                job.Id = metaData.Id
+                job.Status = JOB_QUEUED
+                job.Attempts = 0
+                job.CreatedOn = job.nextRun = metaData.CreatedOn
+                job.contentType = content.type
+                self.session().add(job)
+                self.session().flush((metaData, job))
+            else: self._process(metaData, contentPath, content.type)
 
-            if found:
-                self.session().merge(metaData)
-                self.session().flush((metaData,))
-            else:
-                metaInfo = MetaInfoMapped()
-                metaInfo.MetaData = metaData.Id
-                metaInfo.Language = self.languageId
+        except SQLAlchemyError as e: handle(e, metaData)
 
-                self.session().add(metaInfo)
-                self.session().flush((metaData, metaInfo,))
+        if metaData.content != path:
+            self.cdmArchive.republish(path, metaData.content)
 
-            self.searchProvider.update(metaInfo, metaData)
+        return self.getById(metaData.Id, scheme, thumbSize)
 
+    def process(self, metaDataId, contentType=None, probe=True):
+        '''
+        @see: IMetaDataProcessor.process
+        '''
+        metaData = self.session().query(MetaDataMapped).get(metaDataId)
+        if metaData is None: raise InputError(Ref(_('Unknown meta data'), ref=MetaDataMapped.Id))
+        if metaData.IsAvailable: return
+
+        path = metaData.content
+        try: self._process(metaData, self.cdmArchive.getURI(path, 'file'), contentType, probe)
         except SQLAlchemyError as e: handle(e, metaData)
 
         if metaData.content != path:
             self.cdmArchive.republish(path, metaData.content)
 
-        return self.getById(metaData.Id, scheme, thumbSize)
+    def _process(self, metaData, contentPath, contentType, probe=True):
+        '''
+        Identifies the stored content by the meta data handlers, adds the meta info and indexes the meta data.
+        '''
+        assert isinstance(metaData, MetaDataMapped), 'Invalid meta data %s' % metaData
+        if self.languageId is None:
+            self.languageId = self.session().query(LanguageEntity).filter(LanguageEntity.Code == self.default_media_language).one().Id
+
+        found = False
+        if probe:
+            handler = self._handlerFor(metaData, contentPath, contentType)
+            if handler is not None:
+                # only the handler of the sniffed media type probes the content
+                if handler.process(metaData, contentPath):
+                    metaInfo = handler.addMetaInfo(metaData, self.languageId)
+                    found = True
+            else:
+                for handler in self._handlersUntyped:
+                    if handler.processByInfo(metaData, contentPath, contentType):
+                        metaInfo = handler.addMetaInfo(metaData, self.languageId)
+                        found = True
+                        break
+                else:
+                    for handler in self._handlersUntyped:
+                        if handler.process(metaData, contentPath):
+                            metaInfo = handler.addMetaInfo(metaData, self.languageId)
+                            found = True
+                            break
+
+        metaData.IsAvailable = True
+        if found:
+            self.session().merge(metaData)
+            self.session().flush((metaData,))
+        else:
+            metaInfo = MetaInfoMapped()
+            metaInfo.MetaData = metaData.Id
+            metaInfo.Language = self.languageId
+
+            self.session().add(metaInfo)
+            self.session().flush((metaData, metaInfo,))
+
+        self.searchProvider.update(metaInfo, metaData)
+
+    def _handlerFor(self, metaData, contentPath, contentType):
+        '''
+        Provides the only handler that processes the content, chosen by the sniffed media type of the content and
+        by the content type and file extension, None if no handler declaring its media type should process it.
+        '''
+        if self._handlersByType is None: self._mapHandlers()
+
+        hints = []
+        if contentType:
+            hint = contentType.partition('/')[0].lower()
+            if hint in self._handlersByType: hints.append(hint)
+        extension = splitext(metaData.Name or '')[1][1:].lower()
+        hint = self._typesByExtension.get(extension)
+        if hint is not None: hints.append(hint)
+
+        types = sniff(contentPath)
+        if types:
+            # the declared type only decides between the sniffed types, a content is never probed as a type it is not
+            for hint in hints:
+                if hint in types: return self._handlersByType[hint]
+            for mediaType in types:
+                if mediaType in self._handlersByType: return self._handlersByType[mediaType]
+            return None
+        # some formats have no signature, for these the declared type is trusted
+        if hints: return self._handlersByType[hints[0]]
+
+    def _mapHandlers(self):
+        '''
+        Maps the handlers by the media type and the file extensions they declare.
+        '''
+        handlersByType, typesByExtension, handlersUntyped = {}, {}, []
+        for handler in self.metaDataHandlers:
+            assert isinstance(handler, IMetaDataHandler), 'Invalid handler %s' % handler
+            handles = handler.handles()
+            if handles is None:
+                handlersUntyped.append(handler)
+                continue
+            mediaType, extensions = handles
+            handlersByType.setdefault(mediaType, handler)
+            for extension in extensions: typesByExtension.setdefault(extension, mediaType)
+
+        self._typesByExtension, self._handlersUntyped = typesByExtension, handlersUntyped
+        self._handlersByType = handlersByType
 
     # ----------------------------------------------------------------
 
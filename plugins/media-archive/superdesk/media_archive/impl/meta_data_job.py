@@ -0,0 +1,46 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+SQL Alchemy based implementation for the meta data ingest jobs API.
+'''
+
+from ..api.meta_data_job import IMetaDataJobService, QMetaDataJob
+from ..meta.meta_data_job import MetaDataJobMapped
+from ally.api.extension import IterPart
+from ally.container.ioc import injected
+from ally.container.support import setup
+from ally.support.sqlalchemy.util_service import buildQuery, buildLimits
+from sql_alchemy.impl.entity import EntityGetServiceAlchemy
+
+# --------------------------------------------------------------------
+
+@injected
+@setup(IMetaDataJobService, name='metaDataJobService')
+class MetaDataJobServiceAlchemy(EntityGetServiceAlchemy, IMetaDataJobService):
+    '''
+    Implementation for @see: IMetaDataJobService
+    '''
+
+    def __init__(self):
+        '''
+        Construct the meta data job service.
+        '''
+        EntityGetServiceAlchemy.__init__(self, MetaDataJobMapped)
+
+    def getAll(self, offset=None, limit=None, detailed=False, q=None):
+        '''
+        @see: IMetaDataJobService.getAll
+        '''
+        sql = self.session().query(MetaDataJobMapped)
+        if q:
+            assert isinstance(q, QMetaDataJob), 'Invalid meta data job query %s' % q
+            sql = buildQuery(sql, q, MetaDataJobMapped)
+
+        sqlLimit = buildLimits(sql, offset, limit)
+        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
+        return sqlLimit.all()
@@ -14,7 +14,7 @@ from .meta_type import MetaTypeMapped
 from sqlalchemy.dialects.mysql.base import INTEGER
 from sqlalchemy.orm.mapper import reconstructor
 from sqlalchemy.schema import Column, ForeignKey
-from sqlalchemy.types import String, DateTime, Integer
+from sqlalchemy.types import String, DateTime, Integer, Boolean
 from superdesk.meta.metadata_superdesk import Base
 from ally.support.sqlalchemy.session import openSession
 from superdesk.user.meta.user import UserMapped
@@ -53,6 +53,7 @@ class MetaDataMapped(Base, MetaData):
     SizeInBytes = Column('size_in_bytes', Integer)
     CreatedOn = Column('created_on', DateTime, nullable=False)
     Creator = Column('fk_creator_id', ForeignKey(UserMapped.Id), nullable=False)
+    IsAvailable = Column('is_available', Boolean, nullable=False, default=True)
     
     # None REST model attribute --------------------------------------
     typeId = Column('fk_type_id', ForeignKey(MetaTypeMapped.Id, ondelete='RESTRICT'), nullable=False)
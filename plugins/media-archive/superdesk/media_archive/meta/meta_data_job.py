@@ -0,0 +1,59 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the SQL alchemy meta for the media archive ingest jobs API.
+'''
+
+from ..api.meta_data_job import MetaDataJob
+from .meta_data import MetaDataMapped
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.schema import Column, ForeignKey
+from sqlalchemy.types import String, DateTime, Integer
+from superdesk.meta.metadata_superdesk import Base
+
+# --------------------------------------------------------------------
+
+JOB_QUEUED = 'queued'
+# The status of a job waiting to run, for the first time or again after a failed attempt.
+JOB_RUNNING = 'running'
+# The status of a job run by a process.
+JOB_DONE = 'done'
+# The status of a job that processed the meta data.
+JOB_FAILED = 'failed'
+# The status of a job that could not process the meta data in any attempt.
+
+# --------------------------------------------------------------------
+
+class MetaDataJobMapped(Base, MetaDataJob):
+    '''
+    Provides the mapping for MetaDataJob.
+    '''
+    __tablename__ = 'archive_meta_data_job'
+    __table_args__ = dict(mysql_engine='InnoDB', mysql_charset='utf8')
+
+    Id = Column('fk_metadata_id', ForeignKey(MetaDataMapped.Id, ondelete='CASCADE'), primary_key=True)
+    Status = Column('status', String(20), nullable=False, index=True)
+    Attempts = Column('attempts', Integer, nullable=False, default=0)
+    Error = Column('error', String(1024))
+    CreatedOn = Column('created_on', DateTime, nullable=False)
+    UpdatedOn = Column('updated_on', DateTime)
+
+    @hybrid_property
+    def MetaData(self): return self.Id
+
+    # Expression for hybrid ------------------------------------
+    MetaData.expression(lambda cls: cls.Id)
+
+    # None REST model attribute --------------------------------------
+    contentType = Column('content_type', String(255))
+    nextRun = Column('next_run', DateTime, nullable=False, index=True)
+    # The time after which a queued job can run.
+    owner = Column('owner', String(100))
+    # The process that runs the job.
+    lockedUntil = Column('locked_until', DateTime)
+    # The time after which a running job is considered abandoned by its process and can run again.
@@ -0,0 +1,104 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk media archive
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the benchmark for the content sniffer against probing the content with every meta data handler.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from random import Random
+from superdesk.media_archive.core.impl.content_sniffer import sniff, TYPE_IMAGE, TYPE_VIDEO, TYPE_AUDIO
+from tempfile import mkdtemp
+import os
+import shutil
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+CORPUS = (
+    ('png', b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR', TYPE_IMAGE),
+    ('jpg', b'\xff\xd8\xff\xe0\x00\x10JFIF\x00', TYPE_IMAGE),
+    ('gif', b'GIF89a\x10\x00\x10\x00', TYPE_IMAGE),
+    ('bmp', b'BM\x36\x03\x00\x00\x00\x00', TYPE_IMAGE),
+    ('avi', b'RIFF\x00\x10\x00\x00AVI LIST', TYPE_VIDEO),
+    ('mp4', b'\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00', TYPE_VIDEO),
+    ('mov', b'\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00', TYPE_VIDEO),
+    ('3gp', b'\x00\x00\x00\x14ftyp3gp4\x00\x00\x00\x00', TYPE_VIDEO),
+    ('flv', b'FLV\x01\x05\x00\x00\x00\x09', TYPE_VIDEO),
+    ('swf', b'FWS\x0a\x00\x10\x00\x00', TYPE_VIDEO),
+    ('mpg', b'\x00\x00\x01\xba\x44\x00\x04\x00', TYPE_VIDEO),
+    ('wmv', b'0&\xb2u\x8ef\xcf\x11\xa6\xd9\x00\xaa\x00b\xcel', TYPE_VIDEO),
+    ('rm', b'.RMF\x00\x00\x00\x12', TYPE_VIDEO),
+    ('wav', b'RIFF\x00\x10\x00\x00WAVEfmt ', TYPE_AUDIO),
+    ('m4a', b'\x00\x00\x00\x20ftypM4A \x00\x00\x00\x00', TYPE_AUDIO),
+    ('mp3', b'ID3\x03\x00\x00\x00\x00\x00\x00', TYPE_AUDIO),
+    ('mp3', b'\xff\xfb\x90\x64\x00\x00\x00\x00', TYPE_AUDIO),
+    ('ogg', b'OggS\x00\x02\x00\x00\x00\x00', TYPE_AUDIO),
+    ('flac', b'fLaC\x00\x00\x00\x22', TYPE_AUDIO),
+    ('aiff', b'FORM\x00\x00\x10\x00AIFFCOMM', TYPE_AUDIO),
+    ('au', b'.snd\x00\x00\x00\x18', TYPE_AUDIO),
+    ('pdf', b'%PDF-1.4\n%\xe2\xe3\xcf\xd3', None),
+    ('txt', b'Some plain text notes\n', None),
+    ('zip', b'PK\x03\x04\x14\x00\x00\x00', None),
+    )
+# The corpus samples as (extension, header, media type), None media type for the other contents.
+
+HANDLERS = (TYPE_IMAGE, TYPE_VIDEO, TYPE_AUDIO)
+# The order in which the meta data handlers are tried.
+
+# --------------------------------------------------------------------
+
+class TestContentSniffer(unittest.TestCase):
+
+    files = 5000
+    # The number of files in the corpus.
+    size = 256 * 1024
+    # The size of each file.
+
+    def setUp(self):
+        self.path, random = mkdtemp(), Random(7)
+        body = bytes(random.randrange(256) for _k in range(self.size))
+
+        start, self.corpus = time.time(), []
+        for k in range(self.files):
+            extension, header, mediaType = random.choice(CORPUS)
+            path = os.path.join(self.path, '%05d.%s' % (k, extension))
+            with open(path, 'wb') as content:
+                content.write(header)
+                content.write(body[len(header):])
+            self.corpus.append((path, mediaType))
+        print('Created %s files of %s bytes in %.3f seconds' % (self.files, self.size, time.time() - start))
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def testSniff(self):
+        start, sniffed = time.time(), []
+        for path, _mediaType in self.corpus: sniffed.append(sniff(path))
+        elapsed = time.time() - start
+
+        # without a usable content type every handler probes the content until one accepts it
+        probed = handled = 0
+        for (path, mediaType), types in zip(self.corpus, sniffed):
+            self.assertEqual(types[:1], (mediaType,) if mediaType else (), 'Invalid type %s for %s' % (types, path))
+            probed += HANDLERS.index(mediaType) + 1 if mediaType else len(HANDLERS)
+            handled += 1 if types else 0
+
+        print('Sniffed %s files in %.3f seconds (%.1f microseconds per file), probes %s instead of %s' %
+              (self.files, elapsed, elapsed * 1000000 / self.files, handled, probed))
+        self.assertLessEqual(handled, self.files, 'More than one probe per file')
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,36 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the services for superdesk posts.
+'''
+
+from ally.container import ioc, wire
+from superdesk.post.core.impl.like_search import LikeSearchProvider
+from superdesk.post.core.impl.token_search import TokenSearchProvider
+from superdesk.post.core.spec import IPostSearchProvider
+
+# --------------------------------------------------------------------
+
+@ioc.config
+def use_post_search_index():
+    '''
+    If true the posts are searched through a word index, which is fast on large posts tables, but a post matches only
+    if each searched word is the prefix of one of its words and the creation date is not searched. If false the searched
+    text is found anywhere in the posts texts and creation date, reading all the posts of the listing.
+    The index is kept only while it is used, once enabled the existing posts are indexed in the background after the
+    start and are not found until then.
+    '''
+    return False
+
+# --------------------------------------------------------------------
+
+@wire.wire(TokenSearchProvider)
+@ioc.entity
+def postSearchProvider() -> IPostSearchProvider:
+    if use_post_search_index(): return TokenSearchProvider()
+    return LikeSearchProvider()
@@ -0,0 +1,76 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains upgrade functions
+'''
+
+from ..superdesk.db_superdesk import alchemySessionCreator
+from .service import postSearchProvider, use_post_search_index
+from ally.container import app
+from ally.container.app import PRIORITY_LAST
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.expression import exists
+from superdesk.post.core.spec import IPostSearchProvider
+from superdesk.post.meta.post import PostMapped
+from superdesk.post.meta.search import PostTokenMapped
+from threading import Thread
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+@app.populate(priority=PRIORITY_LAST)
+def upgradePostSearchIndex():
+    '''
+    Indexes in the background the posts that have been created before the search index, or drops the search index if
+    it is not used, since it is not kept up to date anymore.
+    '''
+    if not use_post_search_index():
+        session = alchemySessionCreator()()
+        assert isinstance(session, Session)
+        try:
+            session.query(PostTokenMapped).delete(synchronize_session=False)
+            session.commit()
+        finally: session.close()
+        return
+
+    indexer = Thread(name='Post search indexing', target=indexPosts)
+    indexer.daemon = True
+    indexer.start()
+
+def indexPosts():
+    '''
+    Indexes the posts that have no index rows, each post has at least one index row once indexed so the indexing
+    continues from where it stopped and the posts indexed by the services meanwhile are not indexed again.
+    '''
+    searchProvider = postSearchProvider()
+    assert isinstance(searchProvider, IPostSearchProvider)
+    session = alchemySessionCreator()()
+    assert isinstance(session, Session)
+
+    lastId, count = 0, 0
+    try:
+        while True:
+            sql = session.query(PostMapped).filter(PostMapped.Id > lastId)
+            sql = sql.filter(~exists().where(PostTokenMapped.post == PostMapped.Id))
+            sql = sql.order_by(PostMapped.Id).limit(1000)
+            posts = sql.all()
+            if not posts: break
+            for post in posts: searchProvider.update(session, post)
+            session.commit()
+            lastId, count = posts[-1].Id, count + len(posts)
+            session.expunge_all()
+    except:
+        session.rollback()
+        log.exception('Cannot index the posts for search')
+    finally: session.close()
+
+    if count: log.info('Indexed %s posts for search', count)
@@ -9,9 +9,10 @@ Created on May 2, 2012
 API specifications for posts.
 '''
 
-from ally.api.config import service, call, query, LIMIT_DEFAULT
+from ally.api.config import service, call, query, LIMIT_DEFAULT, extension
 from ally.api.criteria import AsDateTimeOrdered, AsBoolean, AsLikeOrdered, \
     AsRangeOrdered, AsEqual
+from ally.api.extension import IterPart
 from ally.api.type import Iter
 from ally.support.api.entity import Entity, QEntity, IEntityGetCRUDService
 from datetime import datetime
@@ -99,6 +100,19 @@ class QPostWithPublished(QPost):
 
 # --------------------------------------------------------------------
 
+@extension
+class IterPostPart(IterPart):
+    '''
+    The post iterable that tells if the total is only estimated, if configured the total of large collections is not
+    counted exactly.
+    The next cursor continues the listing after the provided posts without using an offset, it is provided only if the
+    listing has been requested with a cursor, an empty one for the first page, and there might be more posts.
+    '''
+    estimated = bool
+    nextCursor = str
+
+# --------------------------------------------------------------------
+
 @service((Entity, Post))
 class IPostService(IEntityGetCRUDService):
     '''
@@ -127,9 +141,10 @@ class IPostService(IEntityGetCRUDService):
 
     @call
     def getAll(self, creatorId:User.Id=None, authorId:Collaborator.Id=None, offset:int=None, limit:int=LIMIT_DEFAULT,
-               detailed:bool=True, q:QPost=None) -> Iter(Post):
+               cursor:str=None, detailed:bool=True, q:QPost=None) -> Iter(Post):
         '''
-        Provides all the posts.
+        Provides all the posts. The cursor continues the listing from the detailed iterator @see: IterPostPart, an empty
+        cursor starts the listing, with a cursor the posts are ordered by id.
         '''
 
     @call(webName='Unpublished')
@@ -161,17 +176,19 @@ class IPostService(IEntityGetCRUDService):
         '''
 
     @call
-    def getAllBySource(self, sourceId:Source.Id, offset:int=None, limit:int=LIMIT_DEFAULT,
+    def getAllBySource(self, sourceId:Source.Id, offset:int=None, limit:int=LIMIT_DEFAULT, cursor:str=None,
                detailed:bool=True, q:QPost=None) -> Iter(Post):
         '''
-        Provides published posts of a source.
+        Provides published posts of a source. The cursor continues the listing from the detailed iterator
+        @see: IterPostPart, an empty cursor starts the listing, with a cursor the posts are ordered by id.
         '''
 
     @call
     def getAllBySourceType(self, sourceTypeKey:SourceType.Key, offset:int=None, limit:int=LIMIT_DEFAULT,
-               detailed:bool=True, q:QPost=None) -> Iter(Post):
+               cursor:str=None, detailed:bool=True, q:QPost=None) -> Iter(Post):
         '''
-        Provides all posts of a source type.
+        Provides all posts of a source type. The cursor continues the listing from the detailed iterator
+        @see: IterPostPart, an empty cursor starts the listing, with a cursor the posts are ordered by id.
         '''
 
     @call
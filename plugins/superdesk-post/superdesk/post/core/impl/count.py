@@ -0,0 +1,101 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the bounded and cached counting for the posts queries.
+'''
+
+from collections import OrderedDict
+from sqlalchemy.orm.query import Query
+from threading import Lock
+import time
+
+# --------------------------------------------------------------------
+
+def countFor(sql, maximum):
+    '''
+    Provides the number of rows of the query, the counting stops after the maximum number of rows.
+
+    @param sql: Query
+        The query to count, a distinct query if the rows can repeat.
+    @param maximum: integer
+        The maximum number of rows counted, 0 to count all the rows.
+    @return: tuple(integer, boolean)
+        The number of rows and True if the number is estimated, in which case the query has more rows than the
+        maximum and the maximum is provided.
+    '''
+    assert isinstance(sql, Query), 'Invalid query %s' % sql
+    assert isinstance(maximum, int) and maximum >= 0, 'Invalid maximum %s' % maximum
+
+    if not maximum: return sql.count(), False
+    total = sql.limit(maximum + 1).count()
+    if total > maximum: return maximum, True
+    return total, False
+
+# --------------------------------------------------------------------
+
+class CountCache:
+    '''
+    Keeps the totals of the posts queries, the totals are kept per compiled query for a limited time, or until the posts
+    are changed through the cache owner, so the same listing is counted once for all its pages. The least recently used
+    totals are dropped when the maximum number of entries is reached.
+    '''
+
+    def __init__(self, maxEntries, timeout, maximum=0):
+        '''
+        Construct the count cache.
+
+        @param maxEntries: integer
+            The maximum number of cached totals, 0 to disable the cache.
+        @param timeout: integer|float
+            The number of seconds a total is kept, the posts changed by other processes are counted after it.
+        @param maximum: integer
+            The maximum number of rows counted, 0 to count all the rows, @see: countFor.
+        '''
+        assert isinstance(maxEntries, int) and maxEntries >= 0, 'Invalid maximum entries %s' % maxEntries
+        assert isinstance(timeout, (int, float)) and timeout >= 0, 'Invalid timeout %s' % timeout
+        assert isinstance(maximum, int) and maximum >= 0, 'Invalid maximum %s' % maximum
+
+        self.maxEntries = maxEntries
+        self.timeout = timeout
+        self.maximum = maximum
+
+        self._lock = Lock()
+        self._totals = OrderedDict()
+
+    def count(self, sql):
+        '''
+        Provides the number of rows of the query, @see: countFor.
+
+        @param sql: Query
+            The query to count, a distinct query if the rows can repeat.
+        @return: tuple(integer, boolean)
+            The number of rows and True if the number is estimated.
+        '''
+        assert isinstance(sql, Query), 'Invalid query %s' % sql
+        statement = sql.statement.compile()
+        key = (str(statement), tuple(sorted(statement.params.items())))
+        with self._lock:
+            entry = self._totals.get(key)
+            if entry is not None and time.time() - entry[0] <= self.timeout:
+                self._totals.move_to_end(key)
+                return entry[1]
+
+        checked = time.time()
+        total = countFor(sql, self.maximum)
+        if self.maxEntries:
+            with self._lock:
+                self._totals[key] = (checked, total)
+                self._totals.move_to_end(key)
+                while len(self._totals) > self.maxEntries: self._totals.popitem(False)
+        return total
+
+    def invalidate(self):
+        '''
+        Drops all the cached totals, used whenever the posts are changed.
+        '''
+        with self._lock: self._totals.clear()
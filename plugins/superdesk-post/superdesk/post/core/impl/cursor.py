@@ -0,0 +1,66 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the cursors for the keyset pagination of the posts listings.
+'''
+
+from ally.exception import InputError, Ref
+from ally.internationalization import _
+from ally.support.api.util_service import namesForQuery
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+import binascii
+import json
+
+# --------------------------------------------------------------------
+
+def encodeCursor(*values):
+    '''
+    Provides the cursor that continues a listing after the provided key values.
+
+    @param values: arguments[integer|float]
+        The key values of the last listed post.
+    @return: string
+        The opaque cursor.
+    '''
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decodeCursor(cursor, count):
+    '''
+    Provides the key values of the cursor.
+
+    @param cursor: string
+        The cursor as provided by @see: encodeCursor.
+    @param count: integer
+        The number of key values expected in the cursor.
+    @return: list[integer|float]
+        The key values.
+    '''
+    assert isinstance(cursor, str), 'Invalid cursor %s' % cursor
+    try: values = json.loads(urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, binascii.Error): values = None
+    if not isinstance(values, list) or len(values) != count \
+    or not all(isinstance(value, (int, float)) for value in values):
+        raise InputError(Ref(_('Invalid cursor'),))
+    return values
+
+def isOrdered(q):
+    '''
+    Checks if the query provides an ordering, in which case the listing can not be continued with a cursor.
+
+    @param q: query|None
+        The query to check.
+    @return: boolean
+        True if the query has ordering criteria.
+    '''
+    if q is None: return False
+    for name in namesForQuery(q.__class__):
+        criteria = getattr(q.__class__, name)
+        if criteria not in q: continue
+        ascending = getattr(criteria, 'ascending', None)
+        if ascending is not None and ascending in q: return True
+    return False
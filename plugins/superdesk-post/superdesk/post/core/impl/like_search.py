@@ -0,0 +1,55 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+The implementation of the LIKE based posts search.
+'''
+
+from inspect import isclass
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.expression import or_
+from superdesk.post.core.spec import IPostSearchProvider
+from superdesk.post.meta.post import PostMapped
+
+# --------------------------------------------------------------------
+
+class LikeSearchProvider(IPostSearchProvider):
+    '''
+    Implementation for @see: IPostSearchProvider that searches the text anywhere in the post meta, creation date, content
+    and plain content with case insensitive LIKE filters. There is no index to keep, but every search reads all the posts
+    of the query, the posts keep the query order.
+    '''
+
+    def update(self, session, post):
+        '''
+        @see: IPostSearchProvider.update
+        '''
+
+    def buildQuery(self, session, sql, mapped, text):
+        '''
+        @see: IPostSearchProvider.buildQuery
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        assert isclass(mapped) and issubclass(mapped, PostMapped), 'Invalid mapped class %s' % mapped
+        assert isinstance(text, str), 'Invalid text %s' % text
+
+        like = processLike(text)
+        return sql.filter(or_(mapped.Meta.ilike(like), mapped.CreatedOn.ilike(like),
+                              mapped.Content.ilike(like), mapped.ContentPlain.ilike(like)))
+
+# --------------------------------------------------------------------
+
+def processLike(value):
+    '''
+    Provides the LIKE pattern that matches the value anywhere in the text.
+    '''
+    assert isinstance(value, str), 'Invalid like value %s' % value
+
+    if not value: return '%'
+    if not value.endswith('%'): value = value + '%'
+    if not value.startswith('%'): value = '%' + value
+    return value
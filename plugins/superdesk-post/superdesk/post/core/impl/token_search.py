@@ -0,0 +1,113 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+The implementation of the inverted index based posts search.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from collections import Counter
+from inspect import isclass
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql import functions as fn
+from sqlalchemy.sql.expression import and_, or_, case
+from sqlalchemy.sql.operators import desc_op
+from superdesk.post.core.spec import IPostSearchProvider
+from superdesk.post.meta.post import PostMapped
+from superdesk.post.meta.search import PostTokenMapped, TOKEN_NONE
+import re
+
+# --------------------------------------------------------------------
+
+TOKEN_MAX_SIZE = 50
+# The maximum size of an indexed word, longer words are truncated.
+TOKEN_MIN_SIZE = 2
+# The minimum size of an indexed word, shorter words are not indexed.
+
+REGEX_TAG = re.compile(r'<[^>]*>|&[#\w]+;')
+# The regex used for removing the markup from the post contents.
+REGEX_WORD = re.compile(r'\w+')
+# The regex used for splitting the texts in words.
+
+def tokensFor(*texts):
+    '''
+    Provides the words of the texts with their number of occurrences.
+
+    @param texts: arguments[string|None]
+        The texts to split, the markup is removed.
+    @return: Counter{string: integer}
+        The lower case words and their number of occurrences.
+    '''
+    tokens = Counter()
+    for text in texts:
+        if not text: continue
+        for word in REGEX_WORD.findall(REGEX_TAG.sub(' ', text).lower()):
+            if len(word) >= TOKEN_MIN_SIZE: tokens[word[:TOKEN_MAX_SIZE]] += 1
+    return tokens
+
+# --------------------------------------------------------------------
+
+@injected
+class TokenSearchProvider(IPostSearchProvider):
+    '''
+    Implementation for @see: IPostSearchProvider that keeps an inverted index of the post words in the database. A post
+    matches if each searched word is the prefix of one of the post words, so unlike the LIKE search a text is not found
+    inside a word and the creation date is not searched. The posts keep the query order, unless ranking is enabled.
+    '''
+
+    search_max_terms = 10; wire.config('search_max_terms', doc='''
+    The maximum number of words taken from a searched text, the other words are ignored.''')
+    search_rank = False; wire.config('search_rank', doc='''
+    If true the found posts are ordered first by the number of occurrences of the searched words and then by the query
+    order, otherwise only by the query order.''')
+
+    def __init__(self):
+        '''
+        Construct the token search provider.
+        '''
+        assert isinstance(self.search_max_terms, int) and self.search_max_terms > 0, \
+        'Invalid search maximum terms %s' % self.search_max_terms
+        assert isinstance(self.search_rank, bool), 'Invalid search rank flag %s' % self.search_rank
+
+    def update(self, session, post):
+        '''
+        @see: IPostSearchProvider.update
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        assert post.Id is not None, 'Invalid post id %s' % post.Id
+
+        tokens = tokensFor(post.ContentPlain or post.Content, post.Meta)
+        # a post without words keeps an empty token, so that it is known as indexed
+        if not tokens: tokens[TOKEN_NONE] = 0
+        session.query(PostTokenMapped).filter(PostTokenMapped.post == post.Id).delete(synchronize_session=False)
+        session.execute(PostTokenMapped.__table__.insert(),
+                        [dict(token=token, fk_post_id=post.Id, weight=weight) for token, weight in tokens.items()])
+
+    def buildQuery(self, session, sql, mapped, text):
+        '''
+        @see: IPostSearchProvider.buildQuery
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+        assert isclass(mapped) and issubclass(mapped, PostMapped), 'Invalid mapped class %s' % mapped
+        assert isinstance(text, str), 'Invalid text %s' % text
+
+        terms = sorted(tokensFor(text))[:self.search_max_terms]
+        if not terms: return sql
+
+        # The prefix match is made with a range so that the token index is used on any database
+        matches = [and_(PostTokenMapped.token >= term, PostTokenMapped.token < term + '\uffff') for term in terms]
+        ranked = session.query(PostTokenMapped.post.label('post'), fn.sum(PostTokenMapped.weight).label('rank'))
+        ranked = ranked.filter(or_(*matches)).group_by(PostTokenMapped.post)
+        if len(terms) > 1:
+            # each term is checked on its own, since a word can start with several of the terms
+            ranked = ranked.having(and_(*[fn.max(case([(match, 1)], else_=0)) == 1 for match in matches]))
+        ranked = ranked.subquery()
+
+        sql = sql.join(ranked, ranked.c.post == mapped.Id)
+        if self.search_rank: sql = sql.order_by(desc_op(ranked.c.rank))
+        return sql
@@ -0,0 +1,47 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the specification classes for posts.
+'''
+
+import abc
+
+# --------------------------------------------------------------------
+
+class IPostSearchProvider(metaclass=abc.ABCMeta):
+    '''
+    The posts text search provider specification.
+    '''
+
+    @abc.abstractclassmethod
+    def update(self, session, post):
+        '''
+        Updates the search index for the post texts.
+
+        @param session: Session
+            The session to use.
+        @param post: PostMapped
+            The post to index, it needs to have the id.
+        '''
+
+    @abc.abstractclassmethod
+    def buildQuery(self, session, sql, mapped, text):
+        '''
+        Restricts the query to the posts that match the searched text.
+
+        @param session: Session
+            The session to use.
+        @param sql: Query
+            The posts query to restrict.
+        @param mapped: class
+            The mapped class of the query posts, PostMapped or a class that extends it.
+        @param text: string
+            The searched text.
+        @return: Query
+            The restricted query.
+        '''
@@ -9,10 +9,12 @@ Created on May 3, 2012
 Contains the SQL alchemy implementation for post API.
 '''
 
-from ..api.post import IPostService, QWithCId
+from ..api.post import IPostService, QWithCId, IterPostPart
+from ..core.impl.count import CountCache
+from ..core.impl.cursor import encodeCursor, decodeCursor, isOrdered
+from ..core.spec import IPostSearchProvider
 from ..meta.post import PostMapped
 from ..meta.type import PostTypeMapped
-from ally.api.extension import IterPart
 from ally.api.criteria import AsRange
 from ally.container import wire
 from ally.container.ioc import injected
@@ -51,15 +53,30 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
     The maximal size for the content part of a post; limited only by db system if zero.''')
     content_plain_max_size = 65535; wire.config('content_plain_max_size', doc='''
     The maximal size for the content plain part of a post; limited only by db system if zero.''')
+    count_max = 0; wire.config('count_max', doc='''
+    The maximal number of posts counted for the total of a detailed posts list, above it the total is marked as
+    estimated; the posts are always counted if zero.''')
+    count_cache_entries = 1000; wire.config('count_cache_entries', doc='''
+    The maximum number of posts totals that are kept for the detailed posts lists, 0 disables the cache.''')
+    count_cache_timeout = 5; wire.config('count_cache_timeout', doc='''
+    The number of seconds a posts total is kept, the posts changed by other processes are counted again after it.''')
     
     postVerificationService = IPostVerificationService; wire.entity('postVerificationService')
     # post verification service used to insert post verification
+    postSearchProvider = IPostSearchProvider; wire.entity('postSearchProvider')
+    # the search provider used to index the post texts
 
     def __init__(self):
         '''
         Construct the post service.
         '''
+        assert isinstance(self.count_max, int), 'Invalid count maximum %s' % self.count_max
+        assert isinstance(self.count_cache_entries, int), 'Invalid count cache entries %s' % self.count_cache_entries
+        assert isinstance(self.count_cache_timeout, (int, float)), \
+        'Invalid count cache timeout %s' % self.count_cache_timeout
         EntityGetServiceAlchemy.__init__(self, PostMapped)
+
+        self._counts = CountCache(self.count_cache_entries, self.count_cache_timeout, self.count_max)
         
     def getByUuidAndSource(self, uuid, sourceId):
         '''
@@ -86,7 +103,7 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
         sql = sql.filter(PostMapped.PublishedOn == None)
 
         sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
+        if detailed: return self._iterPart(sqlLimit.all(), sql, offset, limit)
         return sqlLimit.all()
 
     def getPublished(self, creatorId=None, authorId=None, offset=None, limit=None, detailed=False, q=None):
@@ -98,18 +115,16 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
         sql = sql.filter(PostMapped.PublishedOn != None)
 
         sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
+        if detailed: return self._iterPart(sqlLimit.all(), sql, offset, limit)
         return sqlLimit.all()
 
-    def getAll(self, creatorId=None, authorId=None, offset=None, limit=None, detailed=False, q=None):
+    def getAll(self, creatorId=None, authorId=None, offset=None, limit=None, cursor=None, detailed=False, q=None):
         '''
         @see: IPostService.getPublished
         '''
         assert q is None or isinstance(q, QPost), 'Invalid query %s' % q
         sql = self._buildQuery(creatorId, authorId, q)
-        sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
-        return sqlLimit.all()
+        return self._seekPosts(sql, offset, limit, cursor, detailed, q)
 
     def getUnpublishedBySource(self, sourceId, offset=None, limit=None, detailed=False, q=None):
         '''
@@ -122,7 +137,7 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
 
         sql = self._buildQueryWithCId(q, sql)
         sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
+        if detailed: return self._iterPart(sqlLimit.all(), sql, offset, limit)
         return sqlLimit.all()
 
     def getUnpublishedBySourceType(self, sourceTypeKey, offset=None, limit=None, detailed=False, q=None):
@@ -136,7 +151,7 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
 
         sql = self._buildQueryWithCId(q, sql)
         sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
+        if detailed: return self._iterPart(sqlLimit.all(), sql, offset, limit)
         return sqlLimit.all()
 
     def getPublishedBySource(self, sourceId, offset=None, limit=None, detailed=False, q=None):
@@ -150,7 +165,7 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
 
         sql = self._buildQueryWithCId(q, sql)
         sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
+        if detailed: return self._iterPart(sqlLimit.all(), sql, offset, limit)
         return sqlLimit.all()
 
     def getPublishedBySourceType(self, sourceTypeKey, offset=None, limit=None, detailed=False, q=None):
@@ -164,10 +179,10 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
 
         sql = self._buildQueryWithCId(q, sql)
         sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
+        if detailed: return self._iterPart(sqlLimit.all(), sql, offset, limit)
         return sqlLimit.all()
 
-    def getAllBySource(self, sourceId, offset=None, limit=None, detailed=False, q=None):
+    def getAllBySource(self, sourceId, offset=None, limit=None, cursor=None, detailed=False, q=None):
         '''
         @see: IPostService.getAllBySource
         '''
@@ -176,11 +191,9 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
         sql = self._buildQueryBySource(sourceId)
 
         sql = self._buildQueryWithCId(q, sql)
-        sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.distinct(), sql.distinct().count(), offset, limit)
-        return sqlLimit.distinct()
+        return self._seekPosts(sql.distinct(), offset, limit, cursor, detailed, q)
 
-    def getAllBySourceType(self, sourceTypeKey, offset=None, limit=None, detailed=False, q=None):
+    def getAllBySourceType(self, sourceTypeKey, offset=None, limit=None, cursor=None, detailed=False, q=None):
         '''
         @see: IPostService.getAllBySourceType
         '''
@@ -189,9 +202,7 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
         sql = self._buildQueryBySourceType(sourceTypeKey)
 
         sql = self._buildQueryWithCId(q, sql)
-        sqlLimit = buildLimits(sql, offset, limit)
-        if detailed: return IterPart(sqlLimit.all(), sql.count(), offset, limit)
-        return sqlLimit.all()
+        return self._seekPosts(sql, offset, limit, cursor, detailed, q)
 
     def insert(self, post):
         '''
@@ -228,7 +239,9 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
 
         self.session().add(postDb)
         self.session().flush((postDb,))
+        self._counts.invalidate()
         post.Id = postDb.Id
+        self.postSearchProvider.update(self.session(), postDb)
         
         postVerification = PostVerification()
         postVerification.Id = post.Id
@@ -250,6 +263,9 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
         copy(post, postDb, exclude=COPY_EXCLUDE)
         postDb = self._adjustTexts(postDb)
         self.session().flush((postDb,))
+        self._counts.invalidate()
+        if Post.Content in post or Post.ContentPlain in post or Post.Meta in post:
+            self.postSearchProvider.update(self.session(), postDb)
 
     def delete(self, id):
         '''
@@ -260,6 +276,7 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
 
         postDb.DeletedOn = current_timestamp()
         self.session().flush((postDb,))
+        self._counts.invalidate()
         return True
 
     # ----------------------------------------------------------------
@@ -278,6 +295,39 @@ class PostServiceAlchemy(EntityGetServiceAlchemy, IPostService):
         if not addDeleted: sql = sql.filter(PostMapped.DeletedOn == None)
         return sql
 
+    def _iterPart(self, posts, sql, offset, limit):
+        '''
+        Provides the detailed posts iterable, the total is kept for the query and counted up to the configured maximum.
+        '''
+        total, estimated = self._counts.count(sql)
+        posts = IterPostPart(posts, total, offset, limit)
+        posts.estimated = estimated
+        return posts
+
+    def _seekPosts(self, sql, offset, limit, cursor, detailed, q):
+        '''
+        Provides the posts of the query page, if a cursor is provided the posts are ordered by id so that the listing can
+        be continued with the next cursor, in which case the offset is not used. An empty cursor starts such a listing,
+        without a cursor the posts are listed as before.
+        '''
+        if cursor is None: sqlPage = buildLimits(sql, offset, limit)
+        else:
+            if isOrdered(q): raise InputError(Ref(_('The cursor can not be used with ordering criteria'),))
+            sqlPage = sql.order_by(PostMapped.Id)
+            if cursor:
+                lastId, = decodeCursor(cursor, 1)
+                sqlPage, offset = sqlPage.filter(PostMapped.Id > lastId), None
+            sqlPage = buildLimits(sqlPage, offset, limit)
+
+        posts = sqlPage.all()
+        if not detailed: return posts
+
+        nextCursor = None
+        if cursor is not None and limit and len(posts) == limit: nextCursor = encodeCursor(posts[-1].Id)
+        posts = self._iterPart(posts, sql, offset, limit)
+        posts.nextCursor = nextCursor
+        return posts
+
     def _typeId(self, key):
         '''
         Provides the post type id that has the provided key.
@@ -15,7 +15,7 @@ from sqlalchemy.dialects.mysql.base import INTEGER
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
-from sqlalchemy.schema import Column, ForeignKey
+from sqlalchemy.schema import Column, ForeignKey, Index
 from sqlalchemy.sql.expression import case
 from sqlalchemy.types import TEXT, DateTime, String, Boolean
 from superdesk.collaborator.meta.collaborator import CollaboratorMapped
@@ -83,6 +83,10 @@ class PostMapped(Base, Post):
     def _AuthorName(cls):
         return case([(cls.Author == None, UserMapped.Name)], else_=CollaboratorMapped.Name)
 
+# The posts of a source are selected by their published and deleted state.
+Index('ix_post_feed_state', PostMapped.__table__.c.fk_feed_id, PostMapped.__table__.c.published_on,
+      PostMapped.__table__.c.deleted_on)
+
 validateRequired(PostMapped.Type)
 validateManaged(PostMapped.Type, key=EVENT_PROP_UPDATE)
 validateManaged(PostMapped.Author, key=EVENT_PROP_UPDATE)
@@ -0,0 +1,35 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the SQL alchemy meta for the posts search index.
+'''
+
+from sqlalchemy.dialects.mysql.base import INTEGER
+from sqlalchemy.schema import Column, ForeignKey
+from sqlalchemy.types import String
+from superdesk.meta.metadata_superdesk import Base
+from superdesk.post.meta.post import PostMapped
+
+# --------------------------------------------------------------------
+
+TOKEN_NONE = ''
+# The token kept for the posts that have no words, so that they are known as indexed.
+
+# --------------------------------------------------------------------
+
+class PostTokenMapped(Base):
+    '''
+    Provides the mapping for the posts inverted index, each row keeps the number of occurrences of a word in a post.
+    This is not a REST model.
+    '''
+    __tablename__ = 'post_token'
+    __table_args__ = dict(mysql_engine='InnoDB', mysql_charset='utf8')
+
+    token = Column('token', String(50), primary_key=True)
+    post = Column('fk_post_id', ForeignKey(PostMapped.Id, ondelete='CASCADE'), primary_key=True, index=True)
+    weight = Column('weight', INTEGER(unsigned=True), nullable=False)
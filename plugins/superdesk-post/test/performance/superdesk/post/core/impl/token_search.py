@@ -0,0 +1,101 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk posts
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the benchmark for the posts search index against the LIKE search.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from datetime import datetime
+from random import Random
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+from superdesk.post.core.impl.like_search import LikeSearchProvider
+from superdesk.post.core.impl.token_search import TokenSearchProvider, tokensFor
+from superdesk.post.meta.post import PostMapped
+from superdesk.post.meta.search import PostTokenMapped
+from tempfile import mkdtemp
+import os
+import shutil
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class TestTokenSearch(unittest.TestCase):
+
+    posts = 1000000
+    # The number of posts to search in.
+    words = 8
+    # The number of words in each post.
+    vocabulary = 20000
+    # The number of distinct words.
+    searches = 20
+    # The number of searched words.
+
+    def setUp(self):
+        self.path = mkdtemp()
+        engine = create_engine('sqlite:///%s' % os.path.join(self.path, 'search.db'))
+        PostMapped.__table__.create(engine)
+        PostTokenMapped.__table__.create(engine)
+        self.sessionCreator = sessionmaker(bind=engine)
+
+        self.provider = TokenSearchProvider()
+        ioc.initialize(self.provider)
+        self.likeProvider = LikeSearchProvider()
+
+        random, createdOn = Random(7), datetime.now()
+        vocabulary = ['w%05d' % k for k in range(self.vocabulary)]
+        self.searched = random.sample(vocabulary, self.searches)
+
+        start, connection = time.time(), engine.connect()
+        for offset in range(0, self.posts, 10000):
+            transaction, posts, tokens = connection.begin(), [], []
+            for postId in range(offset + 1, min(offset + 10000, self.posts) + 1):
+                text = ' '.join(random.choice(vocabulary) for _k in range(self.words))
+                posts.append(dict(id=postId, fk_creator_id=1, fk_type_id=1, created_on=createdOn, content_plain=text))
+                tokens.extend(dict(token=token, fk_post_id=postId, weight=weight)
+                              for token, weight in tokensFor(text).items())
+            connection.execute(PostMapped.__table__.insert(), posts)
+            connection.execute(PostTokenMapped.__table__.insert(), tokens)
+            transaction.commit()
+        connection.close()
+        print('Created and indexed %s posts in %.3f seconds' % (self.posts, time.time() - start))
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def testSearch(self):
+        session = self.sessionCreator()
+
+        start, liked = time.time(), []
+        for word in self.searched:
+            sql = self.likeProvider.buildQuery(session, session.query(PostMapped.Id), PostMapped, word)
+            liked.append(sorted(postId for postId, in sql.all()))
+        likeElapsed = time.time() - start
+
+        start, indexed = time.time(), []
+        for word in self.searched:
+            sql = self.provider.buildQuery(session, session.query(PostMapped.Id), PostMapped, word)
+            indexed.append(sorted(postId for postId, in sql.all()))
+        indexElapsed = time.time() - start
+        session.close()
+
+        print('Searched %s words in %s posts, LIKE %.3f seconds, index %.3f seconds (%.1fx)' %
+              (self.searches, self.posts, likeElapsed, indexElapsed, likeElapsed / indexElapsed))
+        self.assertEqual(liked, indexed, 'Different search results')
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,32 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the services for the sources synchronization.
+'''
+
+from ..superdesk.db_superdesk import alchemySessionCreator
+from ally.container import ioc, wire
+from superdesk.source.core.impl.sync_lease import SyncLeases
+from superdesk.source.core.impl.sync_scheduler import SyncScheduler
+from superdesk.source.core.spec import ISyncScheduler, ISyncLeases
+
+# --------------------------------------------------------------------
+
+@wire.wire(SyncLeases)
+@ioc.entity
+def syncLeases() -> ISyncLeases:
+    b = SyncLeases()
+    b.sessionCreator = alchemySessionCreator()
+    return b
+
+@wire.wire(SyncScheduler)
+@ioc.entity
+def syncScheduler() -> ISyncScheduler:
+    b = SyncScheduler()
+    b.syncLeases = syncLeases()
+    return b
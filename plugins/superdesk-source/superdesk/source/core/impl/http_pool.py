@@ -0,0 +1,235 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the pool of persistent HTTP connections used for reading the remote sources.
+'''
+
+from collections import deque
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from threading import Lock
+from urllib.parse import urlsplit, urlunsplit, urljoin
+import socket
+import time
+
+# --------------------------------------------------------------------
+
+REDIRECT_STATUSES = (301, 302, 303, 307)
+# The response statuses that are followed to the location header.
+REDIRECT_MAXIMUM = 5
+# The maximum number of redirects followed for a request.
+BODYLESS_STATUSES = (204, 304)
+# The response statuses that have no content.
+
+# --------------------------------------------------------------------
+
+class HttpPool:
+    '''
+    Keeps the HTTP connections open for each host so the requests made to the same host reuse the connection instead of
+    opening a new one. The connections idle for longer than the idle timeout are closed, and a request made on a reused
+    connection that the server has closed in the meantime is made again on a new connection.
+    '''
+
+    def __init__(self, size, idleTimeout, timeout):
+        '''
+        Construct the HTTP pool.
+
+        @param size: integer
+            The maximum number of idle connections kept for each host.
+        @param idleTimeout: integer|float
+            The number of seconds after which an idle connection is closed.
+        @param timeout: integer|float
+            The number of seconds after which a connect or read on a connection fails.
+        '''
+        assert isinstance(size, int) and size >= 0, 'Invalid size %s' % size
+        assert isinstance(idleTimeout, (int, float)), 'Invalid idle timeout %s' % idleTimeout
+        assert isinstance(timeout, (int, float)), 'Invalid timeout %s' % timeout
+
+        self.size = size
+        self.idleTimeout = idleTimeout
+        self.timeout = timeout
+        self._lock = Lock()
+        self._idle = {}
+
+    def request(self, url, headers=None, method='GET'):
+        '''
+        Makes the request, the redirects are followed.
+
+        @param url: string
+            The URL to request, if it has no scheme it is requested with HTTP.
+        @param headers: dictionary{string: string}|None
+            The request headers.
+        @param method: string
+            The request method.
+        @return: PooledResponse
+            The response, it has to be read completely or closed in order for the connection to be reused.
+        @raise HTTPException, socket.error:
+            If the request cannot be made.
+        '''
+        assert isinstance(url, str), 'Invalid URL %s' % url
+        for _k in range(REDIRECT_MAXIMUM + 1):
+            response = self._request(url, headers or {}, method)
+            location = response.getheader('Location')
+            if response.status not in REDIRECT_STATUSES or not location: return response
+            response.read()
+            url = urljoin(url, location)
+            if response.status == 303: method = 'GET'
+        raise HTTPException('Too many redirects for %s' % url)
+
+    def clear(self):
+        '''
+        Closes all the idle connections.
+        '''
+        with self._lock: idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _used in connections: connection.close()
+
+    # ----------------------------------------------------------------
+
+    def _request(self, url, headers, method):
+        '''
+        Makes the request without following the redirects.
+        '''
+        scheme, netloc, path, query, _fragment = urlsplit(url)
+        if not scheme: scheme = 'http'
+        key, selector = (scheme, netloc), urlunsplit(('', '', path or '/', query, ''))
+
+        connection = self._acquire(key)
+        if connection is not None:
+            try: return PooledResponse(self, key, connection, self._send(connection, method, selector, headers))
+            except (HTTPException, socket.error): connection.close()
+            # The server closed the idle connection, the request is made again on a new connection.
+
+        if scheme == 'https': connection = HTTPSConnection(netloc, timeout=self.timeout)
+        else: connection = HTTPConnection(netloc, timeout=self.timeout)
+        try: return PooledResponse(self, key, connection, self._send(connection, method, selector, headers))
+        except:
+            connection.close()
+            raise
+
+    def _send(self, connection, method, selector, headers):
+        '''
+        Sends the request on the connection and provides the response.
+        '''
+        connection.request(method, selector, headers=headers)
+        return connection.getresponse()
+
+    def _acquire(self, key):
+        '''
+        Provides an idle connection for the host, None if there is none.
+        '''
+        expired, connection = [], None
+        with self._lock:
+            connections = self._idle.get(key)
+            while connections:
+                candidate, used = connections.pop()
+                if time.time() - used <= self.idleTimeout:
+                    connection = candidate
+                    break
+                expired.append(candidate)
+        for candidate in expired: candidate.close()
+        return connection
+
+    def _release(self, key, connection):
+        '''
+        Keeps the connection as idle for the host.
+        '''
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections is None: connections = self._idle[key] = deque()
+            if len(connections) < self.size:
+                connections.append((connection, time.time()))
+                return
+        connection.close()
+
+class PooledResponse:
+    '''
+    The response of a pooled connection, the connection is given back to the pool once the response is read completely.
+    '''
+    __slots__ = ('_pool', '_key', '_connection', '_response')
+
+    def __init__(self, pool, key, connection, response):
+        '''
+        Construct the pooled response.
+
+        @param pool: HttpPool
+            The pool of the connection.
+        @param key: tuple(string, string)
+            The scheme and host of the connection.
+        @param connection: HTTPConnection
+            The connection of the response.
+        @param response: HTTPResponse
+            The response.
+        '''
+        assert isinstance(pool, HttpPool), 'Invalid pool %s' % pool
+
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+
+    @property
+    def status(self):
+        '''
+        The response status.
+        '''
+        return self._response.status
+
+    @property
+    def closed(self):
+        '''
+        True if the response has been read completely or closed.
+        '''
+        return self._connection is None
+
+    def getheader(self, name, default=None):
+        '''
+        Provides the response header value.
+        '''
+        return self._response.getheader(name, default)
+
+    def read(self, amt=None):
+        '''
+        Reads the response content.
+        '''
+        if self._connection is None: return b''
+        try: data = self._response.read() if amt is None or amt < 0 else self._response.read(amt)
+        except:
+            self._discard()
+            raise
+        if self._response.isclosed(): self._finish()
+        return data
+
+    def close(self):
+        '''
+        Closes the response, if it is not read completely the connection is closed. The responses without content are
+        read first so their connection is given back to the pool.
+        '''
+        if self._connection is None: return
+        if not self._response.isclosed() and (self._response.length == 0 or self._response.status in BODYLESS_STATUSES):
+            try: self._response.read()
+            except (HTTPException, socket.error): pass
+        if self._response.isclosed(): self._finish()
+        else: self._discard()
+
+    # ----------------------------------------------------------------
+
+    def _finish(self):
+        '''
+        Gives the connection back to the pool.
+        '''
+        connection, self._connection = self._connection, None
+        if self._response.will_close: connection.close()
+        else: self._pool._release(self._key, connection)
+
+    def _discard(self):
+        '''
+        Closes the connection.
+        '''
+        connection, self._connection = self._connection, None
+        self._response.close()
+        connection.close()
@@ -0,0 +1,153 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the incremental parsing of the JSON lists read from the remote sources.
+'''
+
+import codecs
+import json
+import re
+
+# --------------------------------------------------------------------
+
+CHUNK_SIZE = 64 * 1024
+# The number of bytes read at once from the stream.
+REGEX_SPACE = re.compile(r'[ \t\n\r]*')
+# The regex used for skipping the JSON white spaces.
+CHARACTERS_NUMBER = '0123456789.eE+-'
+# The characters that can continue a JSON number.
+
+# --------------------------------------------------------------------
+
+def iterateList(stream, name, encoding='UTF-8', chunkSize=CHUNK_SIZE):
+    '''
+    Provides the elements of a list in a JSON object as they are read from the stream, so only one element at a time is
+    kept in memory and the elements can be processed before the stream is read completely. The other values of the
+    object are parsed and dropped.
+
+    @param stream: byte stream
+        The stream with the JSON object, it has to provide a read(size) method.
+    @param name: string
+        The name of the list in the JSON object.
+    @param encoding: string
+        The character encoding of the stream.
+    @param chunkSize: integer
+        The number of bytes read at once from the stream.
+    @return: Iterable(object)
+        The elements of the list, decoded, nothing if the object has no such list.
+    @raise ValueError:
+        If the stream does not contain a valid JSON object.
+    '''
+    assert isinstance(name, str), 'Invalid name %s' % name
+    assert isinstance(chunkSize, int) and chunkSize > 0, 'Invalid chunk size %s' % chunkSize
+    return _Parser(stream, encoding, chunkSize).iterate(name)
+
+# --------------------------------------------------------------------
+
+class _Parser:
+    '''
+    The incremental parser, it keeps only the unparsed text read from the stream.
+    '''
+
+    def __init__(self, stream, encoding, chunkSize):
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.chunkSize = chunkSize
+        self.json = json.JSONDecoder()
+        self.text = ''
+        self.position = 0
+        self.ended = False
+
+    def iterate(self, name):
+        '''
+        Provides the elements of the named list.
+        '''
+        self.expect('{')
+        if self.peek() == '}': return
+        while True:
+            key = self.value()
+            if not isinstance(key, str): raise ValueError('Expected an object key at %d' % self.position)
+            self.expect(':')
+            if key == name and self.peek() == '[':
+                self.expect('[')
+                if self.peek() == ']': self.expect(']')
+                else:
+                    while True:
+                        yield self.value()
+                        if self.separator(']'): break
+            else: self.value()
+            if self.separator('}'): return
+
+    # ----------------------------------------------------------------
+
+    def value(self):
+        '''
+        Parses the next JSON value, more text is read until the value is complete.
+        '''
+        self.peek()
+        while True:
+            try: value, end = self.json.raw_decode(self.text, self.position)
+            except ValueError:
+                if not self.more(): raise
+                continue
+            # a number that reaches the end of the text or stops at a fraction or exponent part might continue in the
+            # next chunk, the number is decoded again once more text is read
+            if not self.ended and isinstance(value, (int, float)) and not isinstance(value, bool) and \
+            (end == len(self.text) or self.text[end] in CHARACTERS_NUMBER):
+                self.more()
+                continue
+            self.position = end
+            return value
+
+    def separator(self, closing):
+        '''
+        Parses a comma or the closing character.
+
+        @return: boolean
+            True if the closing character has been parsed.
+        '''
+        character = self.peek()
+        if character == ',':
+            self.position += 1
+            return False
+        self.expect(closing)
+        return True
+
+    def expect(self, character):
+        '''
+        Parses the expected character.
+        '''
+        if self.peek() != character:
+            raise ValueError('Expected %r at %d, got %r' % (character, self.position, self.peek()))
+        self.position += 1
+
+    def peek(self):
+        '''
+        Provides the next character that is not a white space, None if the text has ended.
+        '''
+        while True:
+            self.position = REGEX_SPACE.match(self.text, self.position).end()
+            if self.position < len(self.text): return self.text[self.position]
+            if not self.more(): return None
+
+    def more(self):
+        '''
+        Reads more text from the stream, the parsed text is dropped.
+
+        @return: boolean
+            True if more text has been read.
+        '''
+        if self.ended: return False
+        data = self.stream.read(self.chunkSize)
+        if data: text = self.decoder.decode(data)
+        else:
+            self.ended = True
+            text = self.decoder.decode(b'', True)
+        self.text = self.text[self.position:] + text
+        self.position = 0
+        return bool(data) or bool(text)
@@ -0,0 +1,233 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the engine that runs the sources synchronizations.
+'''
+
+from collections import deque
+from concurrent.futures.thread import ThreadPoolExecutor
+from threading import Lock, Semaphore
+import logging
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+STATS = ('fetching', 'queued', 'writing', 'fetched', 'written', 'fetchFailed', 'writeFailed', 'fetchSeconds',
+         'writeSeconds', 'blockedSeconds')
+# The counted metrics of the stages.
+
+# --------------------------------------------------------------------
+
+class SyncEngine:
+    '''
+    Runs the sources synchronizations on a fixed number of threads, whatever the number of synchronized sources. Each
+    synchronization is made of a fetch that reads the remote data and a write that stores it, the fetches run on the
+    fetching threads with a limited number of fetches for each host, the others wait in the host queue without holding a
+    thread. The fetched data is handed to the writing threads, so the database writes do not hold the fetching threads
+    and only a few sessions are used at a time. The fetched data waiting to be written is limited, when the writes fall
+    behind the fetching threads wait for them instead of piling up data in memory. A write can continue the
+    synchronization with another fetch and write, for instance for reading the remote data page by page.
+    '''
+
+    def __init__(self, fetchers, hostFetchers, writers, queueSize=None):
+        '''
+        Construct the synchronization engine.
+
+        @param fetchers: integer
+            The maximum number of fetches that run at the same time.
+        @param hostFetchers: integer
+            The maximum number of fetches that run at the same time on the same host.
+        @param writers: integer
+            The maximum number of writes that run at the same time.
+        @param queueSize: integer|None
+            The maximum number of fetched data that is not written yet, including the running writes, None for twice
+            the writers.
+        '''
+        assert isinstance(fetchers, int) and fetchers > 0, 'Invalid fetchers %s' % fetchers
+        assert isinstance(hostFetchers, int) and hostFetchers > 0, 'Invalid host fetchers %s' % hostFetchers
+        assert isinstance(writers, int) and writers > 0, 'Invalid writers %s' % writers
+        if queueSize is None: queueSize = writers * 2
+        assert isinstance(queueSize, int) and queueSize >= writers, 'Invalid queue size %s' % queueSize
+
+        self.hostFetchers = hostFetchers
+        self._lock = Lock()
+        self._active = set()
+        self._hosts = {}
+        self._fetchPool = ThreadPoolExecutor(fetchers)
+        self._writePool = ThreadPoolExecutor(writers)
+        self._queue = Semaphore(queueSize)
+        self._stats = dict.fromkeys(STATS, 0)
+        self._previous = (time.time(), 0, 0)
+
+    def isActive(self, key):
+        '''
+        Checks if the synchronization is running or waiting to run.
+
+        @param key: object
+            The key of the synchronization.
+        @return: boolean
+            True if the synchronization is not finished.
+        '''
+        with self._lock: return key in self._active
+
+    def submit(self, key, host, fetch, write, failed=None):
+        '''
+        Schedules a synchronization, if a synchronization with the same key is not finished this one is ignored.
+
+        @param key: object
+            The key of the synchronization, usually the synchronized source.
+        @param host: string
+            The host the fetch reads from.
+        @param fetch: callable()
+            Reads the remote data and returns it, it should not use the database.
+        @param write: callable(object) -> tuple(callable, callable)|None
+            Stores the data returned by the fetch, it can return another fetch and write that continue the
+            synchronization on the same host.
+        @param failed: callable()|None
+            Called if the fetch or a write of the synchronization raises, for instance for reporting the synchronization
+            as failed, since the synchronization ends without its write reporting it.
+        @return: boolean
+            True if the synchronization has been scheduled.
+        '''
+        assert callable(fetch), 'Invalid fetch %s' % fetch
+        assert callable(write), 'Invalid write %s' % write
+        assert failed is None or callable(failed), 'Invalid failed %s' % failed
+
+        with self._lock:
+            if key in self._active: return False
+            self._active.add(key)
+        self._schedule((key, host, fetch, write, failed))
+        return True
+
+    def counts(self):
+        '''
+        Provides the number of unfinished synchronizations and the number of synchronizations waiting for their host.
+
+        @return: tuple(integer, integer)
+            The unfinished and waiting synchronizations.
+        '''
+        with self._lock:
+            return len(self._active), sum(len(waiting) for _running, waiting in self._hosts.values() if waiting)
+
+    def metrics(self):
+        '''
+        Provides the metrics of the fetch and write stages, the rates are for the time since the previous call.
+
+        @return: dictionary{string: integer|float}
+            The number of synchronizations 'fetching', 'waiting' for their host, 'queued' for writing and 'writing', the
+            total number of 'fetched' and 'written' data and of 'fetchFailed' and 'writeFailed', the 'fetchRate' and
+            'writeRate' per second, the average 'fetchSeconds' and 'writeSeconds' and the total 'blockedSeconds' the
+            fetching threads waited for the writes.
+        '''
+        now = time.time()
+        with self._lock:
+            metrics = dict(self._stats)
+            metrics['waiting'] = sum(len(waiting) for _running, waiting in self._hosts.values() if waiting)
+            since, fetched, written = self._previous
+            self._previous = (now, metrics['fetched'], metrics['written'])
+
+        elapsed = max(now - since, 0.001)
+        metrics['fetchRate'] = (metrics['fetched'] - fetched) / elapsed
+        metrics['writeRate'] = (metrics['written'] - written) / elapsed
+        fetches = metrics['fetched'] + metrics['fetchFailed']
+        metrics['fetchSeconds'] = metrics['fetchSeconds'] / fetches if fetches else 0
+        writes = metrics['written'] + metrics['writeFailed']
+        metrics['writeSeconds'] = metrics['writeSeconds'] / writes if writes else 0
+        return metrics
+
+    # ----------------------------------------------------------------
+
+    def _schedule(self, job):
+        '''
+        Starts the fetch of the job or places it in the host queue.
+        '''
+        host = job[1]
+        with self._lock:
+            running, waiting = self._hosts.get(host, (0, None))
+            if running >= self.hostFetchers:
+                if waiting is None: waiting = deque()
+                waiting.append(job)
+                self._hosts[host] = (running, waiting)
+                return
+            self._hosts[host] = (running + 1, waiting)
+
+        self._fetchPool.submit(self._fetch, job)
+
+    def _fetch(self, job):
+        '''
+        Runs the fetch of the synchronization and starts the next fetch waiting for the host.
+        '''
+        key, host, fetch, write, failed = job
+        try:
+            self._count(fetching=1)
+            started = time.time()
+            try: data = fetch()
+            except:
+                log.exception('Cannot fetch the synchronization %s', key)
+                self._count(fetching=-1, fetchFailed=1, fetchSeconds=time.time() - started)
+                self._fail(key, failed)
+            else:
+                fetched = time.time()
+                # waits for a place in the write queue, the fetching thread is held until the writes catch up
+                self._queue.acquire()
+                self._count(fetching=-1, fetched=1, fetchSeconds=fetched - started, queued=1,
+                            blockedSeconds=time.time() - fetched)
+                self._writePool.submit(self._write, key, host, write, failed, data)
+        finally:
+            with self._lock:
+                running, waiting = self._hosts[host]
+                if waiting: job = waiting.popleft()
+                else:
+                    job = None
+                    if running > 1: self._hosts[host] = (running - 1, None)
+                    else: del self._hosts[host]
+            if job is not None: self._fetchPool.submit(self._fetch, job)
+
+    def _write(self, key, host, write, failed, data):
+        '''
+        Runs the write of the synchronization and schedules its continuation if there is one.
+        '''
+        self._count(queued=-1, writing=1)
+        started = time.time()
+        try:
+            following = write(data)
+            self._count(writing=-1, written=1, writeSeconds=time.time() - started)
+        except:
+            log.exception('Cannot write the synchronization %s', key)
+            self._count(writing=-1, writeFailed=1, writeSeconds=time.time() - started)
+            self._queue.release()
+            return self._fail(key, failed)
+        self._queue.release()
+        if following is None: self._finish(key)
+        else: self._schedule((key, host) + tuple(following) + (failed,))
+
+    def _fail(self, key, failed):
+        '''
+        Marks the failed synchronization as finished and calls its failed callback.
+        '''
+        self._finish(key)
+        if failed is None: return
+        try: failed()
+        except: log.exception('Cannot report the failed synchronization %s', key)
+
+    def _finish(self, key):
+        '''
+        Marks the synchronization as finished.
+        '''
+        with self._lock: self._active.discard(key)
+
+    def _count(self, **deltas):
+        '''
+        Adds to the stages metrics.
+        '''
+        with self._lock:
+            for name, delta in deltas.items(): self._stats[name] += delta
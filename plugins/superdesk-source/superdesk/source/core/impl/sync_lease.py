@@ -0,0 +1,232 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the leases of the sources synchronization jobs.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.expression import or_, exists
+from superdesk.source.core.spec import ISyncLeases
+from superdesk.source.meta.sync_lease import SyncLeaseMapped
+from threading import Lock, Thread
+from uuid import uuid4
+import logging
+import os
+import socket
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+# The maximum number of jobs used in one IN clause.
+
+# --------------------------------------------------------------------
+
+@injected
+class SyncLeases(ISyncLeases):
+    '''
+    Implementation for @see: ISyncLeases that keeps the leases in the source sync lease table. The leases are acquired
+    with one conditional update for a batch of jobs and renewed together by a heartbeat thread, in separate transactions
+    from the synchronizations themselves. Every process is identified by its host, its process id and a random part.
+    '''
+
+    lease_duration = 60; wire.config('lease_duration', doc='''
+    The number of seconds a lease is held without being renewed, after which the job can be taken by another process.''')
+    lease_heartbeat = 20; wire.config('lease_heartbeat', doc='''
+    The number of seconds between the renewals of the held leases, it has to be well below the lease duration.''')
+    sessionCreator = None
+    # The session creator used for the leases transactions, it has to be set.
+
+    def __init__(self):
+        '''
+        Construct the synchronization leases.
+        '''
+        assert isinstance(self.lease_duration, int) and self.lease_duration > 0, \
+        'Invalid lease duration %s' % self.lease_duration
+        assert isinstance(self.lease_heartbeat, int) and 0 < self.lease_heartbeat < self.lease_duration, \
+        'Invalid lease heartbeat %s' % self.lease_heartbeat
+        assert callable(self.sessionCreator), 'Invalid session creator %s' % self.sessionCreator
+
+        self.owner = ('%s:%d:%s' % (socket.gethostname(), os.getpid(), uuid4().hex[:8]))[-100:]
+        self._lock = Lock()
+        self._held = {}
+        self._stamp = 0
+        self._heartbeat = None
+
+    def acquire(self, jobs, limit=None):
+        '''
+        @see: ISyncLeases.acquire
+        '''
+        assert isinstance(jobs, (list, tuple)), 'Invalid jobs %s' % jobs
+        assert limit is None or isinstance(limit, int), 'Invalid limit %s' % limit
+        if limit is not None: jobs = jobs[:max(limit, 0)]
+        if not jobs: return {}
+
+        with self._lock:
+            # the expiry is unique for each acquire so the jobs taken by this acquire can be told apart
+            now = self._now()
+            self._stamp = expires = max(now + self.lease_duration * 1000, self._stamp + 1)
+            acquired = {}
+            for k in range(0, len(jobs), CHUNK_SIZE):
+                acquired.update(self._transaction(self._acquire, jobs[k:k + CHUNK_SIZE], now, expires))
+            for job, token in acquired.items(): self._held[job] = (token, expires)
+
+            if acquired and self._heartbeat is None:
+                self._heartbeat = Thread(name='sync leases heartbeat', target=self._renewing)
+                self._heartbeat.daemon = True
+                self._heartbeat.start()
+        return acquired
+
+    def holds(self, job, token):
+        '''
+        @see: ISyncLeases.holds
+        '''
+        with self._lock: held = self._held.get(job)
+        # the expiry is checked locally, no other process can take the lease before it
+        return held is not None and held[0] == token and held[1] > self._now()
+
+    def store(self, job, token, mapped, condition, values):
+        '''
+        @see: ISyncLeases.store
+        '''
+        assert isinstance(values, dict) and values, 'Invalid values %s' % values
+        return self._transaction(self._store, job, token, mapped, condition, values) > 0
+
+    def release(self, job, token):
+        '''
+        @see: ISyncLeases.release
+        '''
+        with self._lock:
+            held = self._held.get(job)
+            if held is None or held[0] != token: return
+            del self._held[job]
+        try: self._transaction(self._release, job, token)
+        except: log.exception('Cannot release the lease of job %s', job)
+
+    # ----------------------------------------------------------------
+
+    def _acquire(self, session, jobs, now, expires):
+        '''
+        Acquires the leases of the jobs in the session.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+
+        sql = session.query(SyncLeaseMapped.job).filter(SyncLeaseMapped.job.in_(jobs))
+        known = {job for job, in sql.all()}
+        if len(known) < len(jobs):
+            session.add_all(SyncLeaseMapped(job=job, token=0) for job in set(jobs).difference(known))
+            try: session.flush()
+            except IntegrityError:
+                # The leases have been created by another process in the meantime
+                session.rollback()
+
+        sql = session.query(SyncLeaseMapped).filter(SyncLeaseMapped.job.in_(jobs))
+        sql = sql.filter(or_(SyncLeaseMapped.owner == None, SyncLeaseMapped.expires < now))
+        sql.update({SyncLeaseMapped.owner: self.owner, SyncLeaseMapped.token: SyncLeaseMapped.token + 1,
+                    SyncLeaseMapped.expires: expires}, synchronize_session=False)
+
+        sql = session.query(SyncLeaseMapped.job, SyncLeaseMapped.token).filter(SyncLeaseMapped.job.in_(jobs))
+        sql = sql.filter(SyncLeaseMapped.owner == self.owner).filter(SyncLeaseMapped.expires == expires)
+        return dict(sql.all())
+
+    def _store(self, session, job, token, mapped, condition, values):
+        '''
+        Updates the entries in the session if the lease of the job is held with the token.
+
+        @return: integer
+            The number of updated entries.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+
+        # the lease is checked by the database in the same statement, a lease taken over after the local check of a
+        # stale holder makes the update match no entries
+        held = exists().where(SyncLeaseMapped.job == job).where(SyncLeaseMapped.owner == self.owner)
+        held = held.where(SyncLeaseMapped.token == token)
+        sql = session.query(mapped).filter(condition).filter(held)
+        return sql.update(values, synchronize_session=False)
+
+    def _release(self, session, job, token):
+        '''
+        Releases the lease of the job in the session.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+
+        sql = session.query(SyncLeaseMapped).filter(SyncLeaseMapped.job == job)
+        sql = sql.filter(SyncLeaseMapped.owner == self.owner).filter(SyncLeaseMapped.token == token)
+        sql.update({SyncLeaseMapped.owner: None, SyncLeaseMapped.expires: None}, synchronize_session=False)
+
+    def _renew(self, session, jobs, expires):
+        '''
+        Renews the leases of the jobs in the session.
+
+        @return: dictionary{string: integer}
+            The tokens of the jobs that are still held.
+        '''
+        assert isinstance(session, Session), 'Invalid session %s' % session
+
+        sql = session.query(SyncLeaseMapped).filter(SyncLeaseMapped.job.in_(jobs))
+        sql = sql.filter(SyncLeaseMapped.owner == self.owner).filter(SyncLeaseMapped.expires >= self._now())
+        sql.update({SyncLeaseMapped.expires: expires}, synchronize_session=False)
+
+        sql = session.query(SyncLeaseMapped.job, SyncLeaseMapped.token).filter(SyncLeaseMapped.job.in_(jobs))
+        sql = sql.filter(SyncLeaseMapped.owner == self.owner).filter(SyncLeaseMapped.expires == expires)
+        return dict(sql.all())
+
+    def _renewing(self):
+        '''
+        Renews the held leases, it never returns.
+        '''
+        while True:
+            time.sleep(self.lease_heartbeat)
+            with self._lock:
+                jobs = list(self._held)
+                self._stamp = expires = max(self._now() + self.lease_duration * 1000, self._stamp + 1)
+            if not jobs: continue
+
+            renewed = {}
+            try:
+                for k in range(0, len(jobs), CHUNK_SIZE):
+                    renewed.update(self._transaction(self._renew, jobs[k:k + CHUNK_SIZE], expires))
+            except:
+                log.exception('Cannot renew the synchronization leases')
+                continue
+
+            with self._lock:
+                for job in jobs:
+                    held = self._held.get(job)
+                    if held is None: continue
+                    if renewed.get(job) == held[0]: self._held[job] = (held[0], expires)
+                    else:
+                        log.warning('The lease of job %s has been lost', job)
+                        del self._held[job]
+
+    def _transaction(self, call, *args):
+        '''
+        Calls the function with a new session as the first argument and commits.
+        '''
+        session = self.sessionCreator()
+        assert isinstance(session, Session)
+        try:
+            result = call(session, *args)
+            session.commit()
+            return result
+        except:
+            session.rollback()
+            raise
+        finally: session.close()
+
+    def _now(self):
+        '''
+        Provides the current time in milliseconds since the epoch.
+        '''
+        return int(time.time() * 1000)
@@ -0,0 +1,334 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the adaptive scheduler of the sources synchronizations.
+'''
+
+from ally.container import wire
+from ally.container.ioc import injected
+from concurrent.futures.thread import ThreadPoolExecutor
+from heapq import heappush, heappop
+from random import uniform
+from superdesk.source.core.spec import ISyncScheduler, ISyncProcess, ISyncJob, \
+    ISyncLeases, SYNC_CHANGED, SYNC_UNCHANGED, SYNC_FAILED, SYNC_SKIPPED
+from threading import Condition, Thread
+import logging
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+@injected
+class SyncScheduler(ISyncScheduler):
+    '''
+    Implementation for @see: ISyncScheduler that keeps the next synchronization time of every source and runs the due
+    sources on a fixed number of threads, from a single scheduling thread for all the processes. A source that brought
+    new data is synchronized more often, a source that is idle or failing is synchronized half as often after every
+    synchronization, up to a limit. The new sources are spread over their interval and every next time is delayed by a
+    random fraction, so that the sources do not end up synchronized all at the same time. A source that does not report
+    its outcome in time is considered failed.
+    The due sources are leased in one batch before being started, so when several processes share the database each
+    source is synchronized by only one of them, the sources leased by other processes are skipped.
+    '''
+
+    sync_workers = 4; wire.config('sync_workers', doc='''
+    The maximum number of sources synchronizations that are started at the same time.''')
+    sync_speedup = 4; wire.config('sync_speedup', doc='''
+    The sources that brought new data are synchronized this many times more often than their interval.''')
+    sync_backoff = 16; wire.config('sync_backoff', doc='''
+    The idle or failing sources are synchronized at most this many times less often than their interval, this is also
+    the number of intervals after which a synchronization that did not report its outcome is considered failed.''')
+    sync_jitter = 0.1; wire.config('sync_jitter', doc='''
+    The maximum fraction by which the next synchronization of a source is randomly delayed.''')
+    sync_lease_limit = 100; wire.config('sync_lease_limit', doc='''
+    The maximum number of sources synchronized at the same time by this process, the due sources above it are left to
+    the other processes.''')
+    syncLeases = ISyncLeases
+    # The leases of the synchronization jobs, it has to be set.
+
+    def __init__(self):
+        '''
+        Construct the synchronization scheduler.
+        '''
+        assert isinstance(self.sync_workers, int) and self.sync_workers > 0, 'Invalid sync workers %s' % self.sync_workers
+        assert isinstance(self.sync_speedup, (int, float)) and self.sync_speedup >= 1, \
+        'Invalid sync speedup %s' % self.sync_speedup
+        assert isinstance(self.sync_backoff, (int, float)) and self.sync_backoff >= 1, \
+        'Invalid sync backoff %s' % self.sync_backoff
+        assert isinstance(self.sync_jitter, (int, float)) and self.sync_jitter >= 0, \
+        'Invalid sync jitter %s' % self.sync_jitter
+        assert isinstance(self.sync_lease_limit, int), 'Invalid sync lease limit %s' % self.sync_lease_limit
+        assert isinstance(self.syncLeases, ISyncLeases), 'Invalid sync leases %s' % self.syncLeases
+
+        self._condition = Condition()
+        self._processes = []
+        self._queue = []
+        self._sequence = 0
+        self._running = 0
+        self._thread = None
+        self._pool = ThreadPoolExecutor(self.sync_workers)
+
+    def register(self, name, process, interval):
+        '''
+        @see: ISyncScheduler.register
+        '''
+        assert isinstance(name, str), 'Invalid name %s' % name
+        assert isinstance(process, ISyncProcess), 'Invalid process %s' % process
+        assert isinstance(interval, (int, float)) and interval > 0, 'Invalid interval %s' % interval
+
+        with self._condition:
+            self._processes.append(Scheduled(name, process, interval))
+            if self._thread is None:
+                self._thread = Thread(name='sources sync', target=self._schedule)
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+        log.info('Registered the %s synchronization', name)
+
+    def metrics(self):
+        '''
+        @see: ISyncScheduler.metrics
+        '''
+        now, metrics = time.time(), {}
+        with self._condition:
+            processes = list(self._processes)
+            for scheduled in processes:
+                due = [source.due for source in scheduled.sources.values() if not source.running and source.due <= now]
+                metrics[scheduled.name] = dict(sources=len(scheduled.sources), due=len(due),
+                                               running=sum(1 for source in scheduled.sources.values() if source.running),
+                                               lag=max(now - min(due) if due else 0, scheduled.lag))
+        for scheduled in processes:
+            try: stages = scheduled.process.syncMetrics()
+            except: log.exception('Cannot read the metrics of the %s synchronization', scheduled.name)
+            else:
+                if stages: metrics[scheduled.name].update(stages)
+        return metrics
+
+    # ----------------------------------------------------------------
+
+    def _schedule(self):
+        '''
+        Runs the scheduling, it never returns.
+        '''
+        while True:
+            with self._condition:
+                now, started = time.time(), []
+                discover = [scheduled for scheduled in self._processes if scheduled.discover <= now]
+                for scheduled in discover: scheduled.discover = now + scheduled.interval
+                while self._queue and self._queue[0][0] <= now:
+                    job = self._due(now, *heappop(self._queue)[2:])
+                    if job is not None: started.append(job)
+
+                if not discover and not started:
+                    wait = min(scheduled.discover for scheduled in self._processes)
+                    if self._queue: wait = min(wait, self._queue[0][0])
+                    self._condition.wait(wait - now)
+                    continue
+                limit = self.sync_lease_limit - self._running + len(started)
+
+            if started: self._start(started, limit)
+
+            for scheduled in discover:
+                try: sources = scheduled.process.syncSources()
+                except: log.exception('Cannot read the sources of the %s synchronization', scheduled.name)
+                else: self._discovered(scheduled, sources)
+
+            if not discover: continue
+            for name, metrics in self.metrics().items():
+                log.info('The %s synchronization has %d sources of which %d due and %d running, with a lag of %.1f '
+                         'seconds', name, metrics['sources'], metrics['due'], metrics['running'], metrics['lag'])
+                if 'fetched' not in metrics: continue
+                log.info('The %s synchronization fetches %.2f and writes %.2f per second, taking %.2f and %.2f seconds, '
+                         'with %d fetching, %d waiting for their host, %d queued for writing and %d writing, the fetches '
+                         'waited %.1f seconds for the writes', name, metrics['fetchRate'], metrics['writeRate'],
+                         metrics['fetchSeconds'], metrics['writeSeconds'], metrics['fetching'], metrics['waiting'],
+                         metrics['queued'], metrics['writing'], metrics['blockedSeconds'])
+
+    def _discovered(self, scheduled, sources):
+        '''
+        Updates the sources of the process, the new ones are spread over their interval.
+        '''
+        assert isinstance(scheduled, Scheduled), 'Invalid scheduled process %s' % scheduled
+        assert isinstance(sources, dict), 'Invalid sources %s' % sources
+
+        now = time.time()
+        with self._condition:
+            for key in set(scheduled.sources).difference(sources):
+                if scheduled.sources.pop(key).running: self._running -= 1
+            for key, item in sources.items():
+                source = scheduled.sources.get(key)
+                if source is None:
+                    source = scheduled.sources[key] = Source(key, item, self._interval(scheduled, item))
+                    self._enqueue(scheduled, source, now + uniform(0, source.delay))
+                else: source.item = item
+            self._condition.notify()
+
+    def _due(self, now, scheduled, source, generation):
+        '''
+        Marks the due source as running, if the source is running it did not report in time and it is considered failed.
+
+        @return: SyncJob|None
+            The job to start for the source, None if there is nothing to start.
+        '''
+        assert isinstance(scheduled, Scheduled), 'Invalid scheduled process %s' % scheduled
+        assert isinstance(source, Source), 'Invalid source %s' % source
+        if source.generation != generation or scheduled.sources.get(source.key) is not source: return
+
+        if source.running:
+            log.warning('The %s synchronization of source %s did not report in time', scheduled.name, source.key)
+            job, source.job = source.job, None
+            # the lease is released so the source can be leased again, the late job will not hold it anymore
+            if job.token is not None: self._pool.submit(self.syncLeases.release, job.name, job.token)
+            self._reported(now, scheduled, source, SYNC_FAILED)
+            return
+
+        source.running, scheduled.lag = True, now - source.due
+        self._running += 1
+        self._enqueue(scheduled, source, now + self._interval(scheduled, source.item) * self.sync_backoff)
+        source.job = SyncJob(self, scheduled, source, source.generation)
+        return source.job
+
+    def _start(self, started, limit):
+        '''
+        Leases the started jobs in one batch and runs the leased ones, the others are skipped.
+        '''
+        try: tokens = self.syncLeases.acquire([job.name for job in started], limit)
+        except:
+            log.exception('Cannot lease the synchronization jobs')
+            for job in started: job.report(SYNC_FAILED)
+            return
+
+        for job in started:
+            job.token = tokens.get(job.name)
+            if job.token is None: job.report(SYNC_SKIPPED)
+            else: self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        '''
+        Runs the synchronization of the source.
+        '''
+        assert isinstance(job, SyncJob), 'Invalid job %s' % job
+        try: job.scheduled.process.syncSource(job.source.key, job.item, job)
+        except:
+            log.exception('Cannot run the %s synchronization of source %s', job.scheduled.name, job.source.key)
+            job.report(SYNC_FAILED)
+
+    def _report(self, job, outcome):
+        '''
+        Called by the job with the outcome of the source synchronization.
+        '''
+        assert isinstance(job, SyncJob), 'Invalid job %s' % job
+        assert outcome in (SYNC_CHANGED, SYNC_UNCHANGED, SYNC_FAILED, SYNC_SKIPPED), 'Invalid outcome %s' % outcome
+        scheduled, source = job.scheduled, job.source
+        with self._condition:
+            if source.generation != job.generation or not source.running: return
+            if scheduled.sources.get(source.key) is not source: return
+            self._reported(time.time(), scheduled, source, outcome)
+            self._condition.notify()
+
+    def _reported(self, now, scheduled, source, outcome):
+        '''
+        Schedules the next synchronization of the source based on the outcome.
+        '''
+        self._running -= 1
+        interval = self._interval(scheduled, source.item)
+        if outcome == SYNC_CHANGED: source.delay = interval / self.sync_speedup
+        elif outcome == SYNC_UNCHANGED: source.delay = min(source.delay * 2, interval * self.sync_backoff)
+        elif outcome == SYNC_FAILED: source.delay = min(max(source.delay, interval) * 2, interval * self.sync_backoff)
+        source.running, source.job = False, None
+        self._enqueue(scheduled, source, now + max(source.delay, 1) * uniform(1, 1 + self.sync_jitter))
+
+    def _enqueue(self, scheduled, source, due):
+        '''
+        Places the source in the queue, the previous entries of the source are ignored.
+        '''
+        source.generation += 1
+        if not source.running: source.due = due
+        self._sequence += 1
+        heappush(self._queue, (due, self._sequence, scheduled, source, source.generation))
+
+    def _interval(self, scheduled, item):
+        '''
+        Provides the interval of the source.
+        '''
+        interval = scheduled.process.syncInterval(item)
+        if interval is None or interval <= 0: return scheduled.interval
+        return interval
+
+# --------------------------------------------------------------------
+
+class Scheduled:
+    '''
+    A registered synchronization process.
+    '''
+    __slots__ = ('name', 'process', 'interval', 'sources', 'discover', 'lag')
+
+    def __init__(self, name, process, interval):
+        self.name = name
+        self.process = process
+        self.interval = interval
+        self.sources = {}
+        self.discover = 0
+        self.lag = 0
+
+class Source:
+    '''
+    The scheduling of a synchronized source.
+    '''
+    __slots__ = ('key', 'item', 'delay', 'due', 'running', 'generation', 'job')
+
+    def __init__(self, key, item, delay):
+        self.key = key
+        self.item = item
+        self.delay = delay
+        self.due = 0
+        self.running = False
+        self.generation = 0
+        self.job = None
+
+class SyncJob(ISyncJob):
+    '''
+    Implementation for @see: ISyncJob, the job of a started source synchronization.
+    '''
+    __slots__ = ('scheduler', 'scheduled', 'source', 'item', 'generation', 'name', 'token')
+
+    def __init__(self, scheduler, scheduled, source, generation):
+        assert isinstance(scheduler, SyncScheduler), 'Invalid scheduler %s' % scheduler
+        assert isinstance(scheduled, Scheduled), 'Invalid scheduled process %s' % scheduled
+        assert isinstance(source, Source), 'Invalid source %s' % source
+
+        self.scheduler = scheduler
+        self.scheduled = scheduled
+        self.source = source
+        self.item = source.item
+        self.generation = generation
+        self.name = ('%s:%s' % (scheduled.name, source.key))[:255]
+        self.token = None
+
+    def isLeased(self):
+        '''
+        @see: ISyncJob.isLeased
+        '''
+        return self.token is not None and self.scheduler.syncLeases.holds(self.name, self.token)
+
+    def store(self, mapped, condition, values):
+        '''
+        @see: ISyncJob.store
+        '''
+        if self.token is None: return False
+        return self.scheduler.syncLeases.store(self.name, self.token, mapped, condition, values)
+
+    def report(self, outcome):
+        '''
+        @see: ISyncJob.report
+        '''
+        if self.token is not None: self.scheduler.syncLeases.release(self.name, self.token)
+        self.scheduler._report(self, outcome)
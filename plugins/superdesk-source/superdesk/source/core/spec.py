@@ -0,0 +1,207 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the specifications for the sources synchronization.
+'''
+
+import abc
+
+# --------------------------------------------------------------------
+
+SYNC_CHANGED = 'changed'
+# The outcome of a synchronization that brought new data.
+SYNC_UNCHANGED = 'unchanged'
+# The outcome of a synchronization that found no new data.
+SYNC_FAILED = 'failed'
+# The outcome of a synchronization that could not be made.
+SYNC_SKIPPED = 'skipped'
+# The outcome of a synchronization that was not made, for instance because another process owns the source.
+
+# --------------------------------------------------------------------
+
+class ISyncProcess(metaclass=abc.ABCMeta):
+    '''
+    The specification for a process that synchronizes sources, run by @see: ISyncScheduler.
+    '''
+
+    @abc.abstractclassmethod
+    def syncSources(self):
+        '''
+        Provides the sources to synchronize, the sources not provided anymore are not synchronized anymore.
+
+        @return: dictionary{object: object}
+            The sources by key, the key has to be hashable and the same for a source on every call.
+        '''
+
+    @abc.abstractclassmethod
+    def syncSource(self, key, source, job):
+        '''
+        Synchronizes the source, once done the outcome has to be reported on the job, possibly from another thread.
+
+        @param key: object
+            The key of the source.
+        @param source: object
+            The source as provided by @see: syncSources.
+        @param job: ISyncJob
+            The job of the synchronization.
+        '''
+
+    def syncInterval(self, source):
+        '''
+        Provides the synchronization interval of the source.
+
+        @param source: object
+            The source as provided by @see: syncSources.
+        @return: integer|None
+            The number of seconds between the synchronizations of the source, None for the process interval.
+        '''
+        return None
+
+    def syncMetrics(self):
+        '''
+        Provides the metrics of the process stages, reported with the scheduling metrics.
+
+        @return: dictionary{string: integer|float}|None
+            The metrics by name, None if the process has no metrics.
+        '''
+        return None
+
+class ISyncJob(metaclass=abc.ABCMeta):
+    '''
+    The specification for a source synchronization started by @see: ISyncScheduler, the job holds the lease of the
+    source for as long as it runs.
+    '''
+
+    @abc.abstractclassmethod
+    def isLeased(self):
+        '''
+        Checks if the job still holds the lease of the source, the synchronized data should be stored only if it does,
+        otherwise another process has taken over the source.
+
+        @return: boolean
+            True if the lease is still held.
+        '''
+
+    @abc.abstractclassmethod
+    def store(self, mapped, condition, values):
+        '''
+        Updates in its own transaction the synchronization state kept in the database, like the cursor of the source, the
+        update is conditioned by the lease owner and fencing token of the job so if another process has taken over the
+        source in the meantime nothing is updated.
+
+        @param mapped: class
+            The mapped class of the updated entries.
+        @param condition: ClauseElement
+            The condition of the updated entries.
+        @param values: dictionary{InstrumentedAttribute: object}
+            The values to update.
+        @return: boolean
+            True if the entries have been updated, False if the lease is not held anymore or there are no entries.
+        '''
+
+    @abc.abstractclassmethod
+    def report(self, outcome):
+        '''
+        Reports the outcome of the synchronization and releases the lease.
+
+        @param outcome: string
+            One of the SYNC_* outcomes.
+        '''
+
+class ISyncScheduler(metaclass=abc.ABCMeta):
+    '''
+    The specification for the scheduler that runs the synchronization processes.
+    '''
+
+    @abc.abstractclassmethod
+    def register(self, name, process, interval):
+        '''
+        Registers the synchronization process, its sources are read right away and then once every interval.
+
+        @param name: string
+            The name of the process.
+        @param process: ISyncProcess
+            The process to run.
+        @param interval: integer
+            The number of seconds between the synchronizations of a source that has no outcome yet.
+        '''
+
+    @abc.abstractclassmethod
+    def metrics(self):
+        '''
+        Provides the scheduling metrics of the registered processes.
+
+        @return: dictionary{string: dictionary{string: integer|float}}
+            For each process name the number of 'sources', of sources 'due' and not started yet, of sources 'running'
+            and the 'lag' in seconds between the time a source was due and the time it started, the biggest for the due
+            sources and the last started one, together with the metrics provided by the process.
+        '''
+
+class ISyncLeases(metaclass=abc.ABCMeta):
+    '''
+    The specification for the leases that partition the synchronization jobs between the processes, a leased job is run
+    only by the process holding the lease. The held leases are renewed until released, if a process stops the leases
+    expire and the jobs are taken by the other processes.
+    '''
+
+    @abc.abstractclassmethod
+    def acquire(self, jobs, limit=None):
+        '''
+        Acquires the leases of the jobs that are not leased by another process.
+
+        @param jobs: list[string]|tuple(string)
+            The jobs to acquire.
+        @param limit: integer|None
+            The maximum number of jobs to acquire, None for no limit.
+        @return: dictionary{string: integer}
+            The fencing tokens of the acquired jobs, a token is bigger than all the previous tokens of the job.
+        '''
+
+    @abc.abstractclassmethod
+    def holds(self, job, token):
+        '''
+        Checks if the lease of the job is still held with the token.
+
+        @param job: string
+            The job to check.
+        @param token: integer
+            The token the job was acquired with.
+        @return: boolean
+            True if the lease is held.
+        '''
+
+    @abc.abstractclassmethod
+    def store(self, job, token, mapped, condition, values):
+        '''
+        Updates the entries in a transaction only if the lease of the job is still held with the token, the lease is
+        checked by the update statement itself.
+
+        @param job: string
+            The job that updates.
+        @param token: integer
+            The token the job was acquired with.
+        @param mapped: class
+            The mapped class of the updated entries.
+        @param condition: ClauseElement
+            The condition of the updated entries.
+        @param values: dictionary{InstrumentedAttribute: object}
+            The values to update.
+        @return: boolean
+            True if the entries have been updated.
+        '''
+
+    @abc.abstractclassmethod
+    def release(self, job, token):
+        '''
+        Releases the lease of the job, if it is still held with the token.
+
+        @param job: string
+            The job to release.
+        @param token: integer
+            The token the job was acquired with.
+        '''
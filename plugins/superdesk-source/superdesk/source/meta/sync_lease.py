@@ -0,0 +1,32 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Contains the SQL alchemy meta for the sources synchronization leases.
+'''
+
+from sqlalchemy.dialects.mysql.base import BIGINT
+from sqlalchemy.schema import Column
+from sqlalchemy.types import String
+from superdesk.meta.metadata_superdesk import Base
+
+# --------------------------------------------------------------------
+
+class SyncLeaseMapped(Base):
+    '''
+    Provides the mapping for the sources synchronization leases, each row tells which process runs a synchronization
+    job and until when. The token is increased every time the lease is acquired, so a process that lost the lease can
+    tell by its token. This is not a REST model.
+    '''
+    __tablename__ = 'source_sync_lease'
+    __table_args__ = dict(mysql_engine='InnoDB', mysql_charset='utf8')
+
+    job = Column('job', String(255), primary_key=True)
+    owner = Column('owner', String(100))
+    token = Column('token', BIGINT(unsigned=True), nullable=False, default=0)
+    expires = Column('expires', BIGINT(unsigned=True))
+    # The time in milliseconds since the epoch at which the lease expires.
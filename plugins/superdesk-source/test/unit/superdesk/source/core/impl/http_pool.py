@@ -0,0 +1,139 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the unit testing for the pool of persistent HTTP connections.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from superdesk.source.core.impl.http_pool import HttpPool
+from threading import Thread
+import unittest
+
+# --------------------------------------------------------------------
+
+class Server(ThreadingMixIn, HTTPServer):
+    '''
+    The local server, it keeps the client ports of the requests.
+    '''
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.ports = []
+
+class Handler(BaseHTTPRequestHandler):
+    '''
+    Responds with the request path, the '/redirect' path is redirected to '/data' and the '/drop' path closes the
+    connection without telling the client.
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.ports.append(self.client_address[1])
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/data')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        content = self.path.encode('ascii')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        if self.path == '/close': self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(content)
+        if self.path == '/drop': self.close_connection = True
+
+    def log_message(self, *args): pass
+
+# --------------------------------------------------------------------
+
+class TestHttpPool(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server()
+        self.thread = Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%s' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def get(self, pool, path):
+        response = pool.request(self.url + path)
+        self.assertEqual(200, response.status)
+        content = response.read()
+        self.assertTrue(response.closed)
+        return content
+
+    def testReuse(self):
+        pool = HttpPool(2, 60, 10)
+        self.assertEqual(b'/first', self.get(pool, '/first'))
+        self.assertEqual(b'/second', self.get(pool, '/second'))
+        self.assertEqual(2, len(self.server.ports))
+        self.assertEqual(self.server.ports[0], self.server.ports[1], 'The connection is not reused')
+        pool.clear()
+
+    def testReleaseUnread(self):
+        pool = HttpPool(2, 60, 10)
+        response = pool.request(self.url + '/unread')
+        response.close()
+        self.assertTrue(response.closed)
+        self.assertEqual(b'/data', self.get(pool, '/data'))
+        self.assertNotEqual(self.server.ports[0], self.server.ports[1], 'The unread connection is reused')
+        pool.clear()
+
+    def testReleaseClosing(self):
+        pool = HttpPool(2, 60, 10)
+        self.assertEqual(b'/close', self.get(pool, '/close'))
+        self.assertEqual(b'/data', self.get(pool, '/data'))
+        self.assertNotEqual(self.server.ports[0], self.server.ports[1], 'The closed connection is reused')
+        pool.clear()
+
+    def testNoIdle(self):
+        pool = HttpPool(0, 60, 10)
+        self.get(pool, '/first')
+        self.get(pool, '/second')
+        self.assertNotEqual(self.server.ports[0], self.server.ports[1], 'The connection is kept')
+
+    def testIdleTimeout(self):
+        pool = HttpPool(2, -1, 10)
+        self.get(pool, '/first')
+        self.get(pool, '/second')
+        self.assertNotEqual(self.server.ports[0], self.server.ports[1], 'The expired connection is reused')
+        pool.clear()
+
+    def testServerDropped(self):
+        pool = HttpPool(2, 60, 10)
+        self.assertEqual(b'/drop', self.get(pool, '/drop'))
+        self.assertEqual(b'/data', self.get(pool, '/data'))
+        self.assertNotEqual(self.server.ports[0], self.server.ports[-1], 'The dropped connection is used')
+        pool.clear()
+
+    def testRedirect(self):
+        pool = HttpPool(2, 60, 10)
+        self.assertEqual(b'/data', self.get(pool, '/redirect'))
+        self.assertEqual(2, len(self.server.ports))
+        self.assertEqual(self.server.ports[0], self.server.ports[1], 'The connection is not reused for the redirect')
+        pool.clear()
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,61 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the unit testing for the incremental parsing of the JSON lists.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from io import BytesIO
+from superdesk.source.core.impl.json_stream import iterateList
+import json
+import unittest
+
+# --------------------------------------------------------------------
+
+class TestJSONStream(unittest.TestCase):
+
+    def assertChunks(self, content, name='PostList'):
+        '''
+        Checks that the list is parsed the same for all the chunk sizes, from one byte to the whole content.
+        '''
+        expected = json.loads(content.decode('UTF-8')).get(name)
+        if not isinstance(expected, list): expected = []
+        for size in range(1, len(content) + 2):
+            self.assertEqual(expected, list(iterateList(BytesIO(content), name, chunkSize=size)),
+                             'Invalid list for chunk size %s' % size)
+
+    def testValues(self):
+        self.assertChunks(b'{"x": 1, "PostList":[12.5, 1e5, true, "s"], "y": 2.5}')
+        self.assertChunks(b'{"PostList": [-3.25E-2, 0, 17, -1, 2.5e+3, null, false, [1.5, [2]], {"a": {"b": 10}}]}')
+
+    def testStrings(self):
+        self.assertChunks('{"PostList": ["\\"quoted\\" \\\\ ]}", "\\u00e9t\\u00e9", "été ☃"]}'.encode('UTF-8'))
+
+    def testSkipped(self):
+        self.assertChunks(b'{"Other": [1, 2], "Count": 10.5, "PostList": [{"CId": 3}], "Tail": {"a": [1e2]}}')
+        self.assertChunks(b'{"PostList": "not a list", "Count": 1}')
+        self.assertChunks(b'{"Count": 1}')
+
+    def testEmpty(self):
+        self.assertChunks(b'{}')
+        self.assertChunks(b' { "PostList" : [ ] } ')
+
+    def testInvalid(self):
+        for content in (b'{"PostList": [1, 2', b'{"PostList": [1 2]}', b'[1, 2]', b'{"PostList": [1,]}'):
+            for size in (1, 3, len(content)):
+                self.assertRaises(ValueError, list, iterateList(BytesIO(content), 'PostList', chunkSize=size))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
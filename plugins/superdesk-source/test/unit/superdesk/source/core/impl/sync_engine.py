@@ -0,0 +1,142 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the unit testing for the engine that runs the sources synchronizations.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from superdesk.source.core.impl.sync_engine import SyncEngine
+from threading import Event, Lock
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class Fetches:
+    '''
+    Provides the fetches that wait to be released, the maximum number of fetches running at the same time is kept for
+    each host.
+    '''
+
+    def __init__(self):
+        self.released = Event()
+        self._lock = Lock()
+        self.running = {}
+        self.maximum = {}
+
+    def fetch(self, host, data):
+        def fetch():
+            with self._lock:
+                self.running[host] = self.running.get(host, 0) + 1
+                self.maximum[host] = max(self.maximum.get(host, 0), self.running[host])
+            try:
+                if not self.released.wait(10): raise AssertionError('The fetch is not released')
+            finally:
+                with self._lock: self.running[host] -= 1
+            return data
+        return fetch
+
+# --------------------------------------------------------------------
+
+class TestSyncEngine(unittest.TestCase):
+
+    def waitFinished(self, engine, timeout=10):
+        deadline = time.time() + timeout
+        while engine.counts()[0]:
+            self.assertLess(time.time(), deadline, 'The synchronizations did not finish')
+            time.sleep(0.01)
+
+    def waitFor(self, condition, timeout=10):
+        deadline = time.time() + timeout
+        while not condition():
+            self.assertLess(time.time(), deadline, 'The condition is not met')
+            time.sleep(0.01)
+
+    def testHostLimit(self):
+        engine, fetches, written = SyncEngine(8, 2, 2), Fetches(), []
+        for k in range(6): self.assertTrue(engine.submit(('a', k), 'a', fetches.fetch('a', k), written.append))
+        for k in range(2): self.assertTrue(engine.submit(('b', k), 'b', fetches.fetch('b', k), written.append))
+
+        self.waitFor(lambda: fetches.running.get('a') == 2 and fetches.running.get('b') == 2)
+        self.assertEqual((8, 4), engine.counts())
+        self.assertEqual(4, engine.metrics()['waiting'])
+
+        fetches.released.set()
+        self.waitFinished(engine)
+        self.assertEqual([0, 0, 1, 1, 2, 3, 4, 5], sorted(written))
+        self.assertEqual({'a': 2, 'b': 2}, fetches.maximum)
+
+        metrics = engine.metrics()
+        self.assertEqual(8, metrics['fetched'])
+        self.assertEqual(8, metrics['written'])
+        for name in ('fetching', 'waiting', 'queued', 'writing', 'fetchFailed', 'writeFailed'):
+            self.assertEqual(0, metrics[name], 'Invalid %s metric' % name)
+
+    def testDuplicate(self):
+        engine, fetches = SyncEngine(2, 2, 2), Fetches()
+        self.assertTrue(engine.submit('a', 'host', fetches.fetch('host', 1), lambda data: None))
+        self.assertTrue(engine.isActive('a'))
+        self.assertFalse(engine.submit('a', 'host', fetches.fetch('host', 2), lambda data: None))
+
+        fetches.released.set()
+        self.waitFinished(engine)
+        self.assertFalse(engine.isActive('a'))
+        self.assertTrue(engine.submit('a', 'host', fetches.fetch('host', 3), lambda data: None))
+        self.waitFinished(engine)
+
+    def testContinuation(self):
+        engine, pages = SyncEngine(2, 1, 1), []
+        def write(data):
+            pages.append(data)
+            if data < 3: return (lambda: data + 1), write
+        self.assertTrue(engine.submit('a', 'host', lambda: 1, write))
+        self.waitFinished(engine)
+        self.assertEqual([1, 2, 3], pages)
+        self.assertEqual(3, engine.metrics()['written'])
+
+    def testFetchFailed(self):
+        engine, failed, written = SyncEngine(2, 1, 1), [], []
+        def fetch(): raise ValueError('Cannot fetch')
+        self.assertTrue(engine.submit('a', 'host', fetch, written.append, lambda: failed.append('a')))
+        self.assertTrue(engine.submit('b', 'host', lambda: 'b', written.append, lambda: failed.append('b')))
+        self.waitFinished(engine)
+
+        self.assertEqual(['a'], failed)
+        self.assertEqual(['b'], written)
+        metrics = engine.metrics()
+        self.assertEqual(1, metrics['fetchFailed'])
+        self.assertEqual(1, metrics['fetched'])
+
+    def testWriteFailed(self):
+        engine, failed, written = SyncEngine(2, 2, 1, 1), [], []
+        def write(data):
+            if data == 'a': raise ValueError('Cannot write')
+            written.append(data)
+        def report(): raise ValueError('Cannot report')
+        self.assertTrue(engine.submit('a', 'host', lambda: 'a', write, report))
+        self.waitFinished(engine)
+        self.assertTrue(engine.submit('b', 'host', lambda: 'b', write, lambda: failed.append('b')))
+        self.assertTrue(engine.submit('c', 'host', lambda: 'c', write))
+        self.waitFinished(engine)
+
+        self.assertEqual([], failed)
+        self.assertEqual(['b', 'c'], sorted(written), 'The failed write did not free its place in the write queue')
+        metrics = engine.metrics()
+        self.assertEqual(1, metrics['writeFailed'])
+        self.assertEqual(2, metrics['written'])
+        self.assertFalse(engine.isActive('a'))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,145 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the unit testing for the leases of the sources synchronization jobs.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from sqlalchemy.engine import create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.schema import Column
+from sqlalchemy.types import Integer, String
+from superdesk.source.core.impl.sync_lease import SyncLeases
+from superdesk.source.meta.sync_lease import SyncLeaseMapped
+from tempfile import mkdtemp
+import os
+import shutil
+import unittest
+
+# --------------------------------------------------------------------
+
+class EntryMapped(declarative_base()):
+    '''
+    The entries updated by the synchronization jobs.
+    '''
+    __tablename__ = 'entry'
+
+    id = Column('id', Integer, primary_key=True)
+    value = Column('value', String(50))
+
+# --------------------------------------------------------------------
+
+class TestSyncLeases(unittest.TestCase):
+
+    def setUp(self):
+        self.path = mkdtemp()
+        engine = create_engine('sqlite:///%s' % os.path.join(self.path, 'lease.db'), connect_args={'timeout': 60})
+        SyncLeaseMapped.__table__.create(engine)
+        EntryMapped.__table__.create(engine)
+        self.sessionCreator = sessionmaker(bind=engine)
+
+        session = self.sessionCreator()
+        session.add(EntryMapped(id=1, value='initial'))
+        session.commit()
+        session.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def leases(self, shift=0):
+        '''
+        Provides the leases of a new process, its clock is shifted by the provided milliseconds.
+        '''
+        leases = SyncLeases()
+        leases.sessionCreator = self.sessionCreator
+        ioc.initialize(leases)
+        if shift:
+            now = leases._now
+            leases._now = lambda: now() + shift
+        return leases
+
+    def store(self, leases, job, token, value):
+        return leases.store(job, token, EntryMapped, EntryMapped.id == 1, {EntryMapped.value: value})
+
+    def value(self):
+        session = self.sessionCreator()
+        try: return session.query(EntryMapped.value).filter(EntryMapped.id == 1).scalar()
+        finally: session.close()
+
+    def testAcquire(self):
+        first, second = self.leases(), self.leases()
+        self.assertNotEqual(first.owner, second.owner)
+
+        tokens = first.acquire(['a', 'b'])
+        self.assertEqual(['a', 'b'], sorted(tokens))
+        self.assertTrue(first.holds('a', tokens['a']))
+        self.assertFalse(first.holds('a', tokens['a'] + 1))
+        self.assertFalse(first.holds('c', 1))
+
+        self.assertEqual(['c'], sorted(second.acquire(['a', 'b', 'c'])), 'The held leases are acquired again')
+        self.assertFalse(second.holds('a', tokens['a']))
+        self.assertEqual({}, first.acquire(['a']), 'The held lease is acquired again by its holder')
+
+    def testLimit(self):
+        leases = self.leases()
+        self.assertEqual({}, leases.acquire(['a', 'b'], 0))
+        self.assertEqual(['a'], sorted(leases.acquire(['a', 'b'], 1)))
+        self.assertEqual(['b', 'c'], sorted(leases.acquire(['b', 'c', 'd'], 2)))
+        self.assertEqual({}, leases.acquire([]))
+
+    def testRelease(self):
+        first, second = self.leases(), self.leases()
+        token = first.acquire(['a'])['a']
+        first.release('a', token + 1)
+        self.assertTrue(first.holds('a', token), 'The lease is released with another token')
+
+        first.release('a', token)
+        self.assertFalse(first.holds('a', token))
+        taken = second.acquire(['a'])
+        self.assertEqual(['a'], list(taken))
+        self.assertGreater(taken['a'], token, 'The token is not increased')
+        self.assertFalse(self.store(first, 'a', token, 'released'))
+
+    def testExpired(self):
+        first, second = self.leases(), self.leases(2 * SyncLeases.lease_duration * 1000)
+        token = first.acquire(['a'])['a']
+        self.assertTrue(self.store(first, 'a', token, 'first'))
+        self.assertEqual('first', self.value())
+
+        taken = second.acquire(['a'])
+        self.assertEqual(token + 1, taken['a'], 'The expired lease is not taken over')
+        self.assertFalse(self.store(first, 'a', token, 'stale'), 'The stale holder stores')
+        self.assertEqual('first', self.value())
+        self.assertTrue(self.store(second, 'a', taken['a'], 'second'))
+        self.assertEqual('second', self.value())
+
+        first.release('a', token)
+        self.assertTrue(second.holds('a', taken['a']))
+        self.assertTrue(self.store(second, 'a', taken['a'], 'kept'), 'The stale holder released the new lease')
+
+    def testRenew(self):
+        first, second = self.leases(), self.leases(2 * SyncLeases.lease_duration * 1000)
+        tokens = first.acquire(['a', 'b'])
+        expires = first._now() + 2 * SyncLeases.lease_duration * 1000
+        self.assertEqual(tokens, first._transaction(first._renew, ['a', 'b'], expires))
+
+        second._now = lambda: expires + 1
+        self.assertEqual(['a'], list(second.acquire(['a'])))
+        self.assertEqual({'b': tokens['b']}, first._transaction(first._renew, ['a', 'b'], expires + 1))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
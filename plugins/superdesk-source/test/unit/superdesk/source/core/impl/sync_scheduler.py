@@ -0,0 +1,189 @@
+'''
+Created on Oct 17, 2026
+
+@package: superdesk source
+@copyright: 2026 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Mihai Nistor
+
+Provides the unit testing for the adaptive scheduler of the sources synchronizations.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from superdesk.source.core.impl.sync_scheduler import SyncScheduler, Scheduled
+from superdesk.source.core.spec import ISyncProcess, ISyncLeases, SYNC_CHANGED, \
+    SYNC_UNCHANGED, SYNC_FAILED, SYNC_SKIPPED
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class Process(ISyncProcess):
+    '''
+    The synchronization process, it keeps the synchronized sources.
+    '''
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.synced = []
+
+    def syncSources(self): return {}
+
+    def syncSource(self, key, source, job):
+        if self.fail: raise ValueError('Cannot synchronize %s' % key)
+        self.synced.append(key)
+
+class Leases(ISyncLeases):
+    '''
+    The leases, the jobs leased by other processes are refused.
+    '''
+
+    def __init__(self, others=()):
+        self.others = set(others)
+        self.token = 0
+        self.released = []
+
+    def acquire(self, jobs, limit=None):
+        tokens = {}
+        for job in jobs:
+            if job in self.others or (limit is not None and len(tokens) >= limit): continue
+            self.token += 1
+            tokens[job] = self.token
+        return tokens
+
+    def holds(self, job, token): return job not in self.others
+
+    def store(self, job, token, mapped, condition, values): return job not in self.others
+
+    def release(self, job, token): self.released.append((job, token))
+
+# --------------------------------------------------------------------
+
+class TestSyncScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.leases = Leases()
+        self.scheduler = SyncScheduler()
+        self.scheduler.syncLeases = self.leases
+        self.scheduler.sync_jitter = 0
+        ioc.initialize(self.scheduler)
+
+    def tearDown(self):
+        self.scheduler._pool.shutdown(True)
+
+    def discover(self, process, interval=10, sources=('a',)):
+        scheduled = Scheduled('test', process, interval)
+        self.scheduler._discovered(scheduled, {key: key.upper() for key in sources})
+        for source in scheduled.sources.values():
+            self.assertLessEqual(source.due, time.time() + source.delay, 'New source not spread over its interval')
+        return scheduled
+
+    def start(self, scheduled, key='a', leased=True):
+        '''
+        Makes the source due and provides its job.
+        '''
+        source = scheduled.sources[key]
+        job = self.scheduler._due(source.due, scheduled, source, source.generation)
+        self.assertIsNotNone(job)
+        self.assertTrue(source.running)
+        if leased: job.token = 1
+        return job
+
+    def assertDelay(self, scheduled, delay, key='a'):
+        source = scheduled.sources[key]
+        self.assertFalse(source.running)
+        self.assertAlmostEqual(delay, source.delay)
+        self.assertAlmostEqual(time.time() + max(delay, 1), source.due, delta=1)
+
+    def testBackoff(self):
+        scheduled = self.discover(Process())
+        for delay in (20, 40, 80, 160, 160):
+            self.start(scheduled).report(SYNC_UNCHANGED)
+            self.assertDelay(scheduled, delay)
+
+        self.start(scheduled).report(SYNC_CHANGED)
+        self.assertDelay(scheduled, 2.5)
+        self.start(scheduled).report(SYNC_UNCHANGED)
+        self.assertDelay(scheduled, 5)
+
+        self.start(scheduled).report(SYNC_FAILED)
+        self.assertDelay(scheduled, 20)
+        self.start(scheduled).report(SYNC_FAILED)
+        self.assertDelay(scheduled, 40)
+        self.start(scheduled).report(SYNC_SKIPPED)
+        self.assertDelay(scheduled, 40)
+        self.assertEqual(10, len(self.leases.released))
+        self.assertEqual(0, self.scheduler._running)
+
+    def testSourceInterval(self):
+        process = Process()
+        process.syncInterval = lambda source: 100 if source == 'B' else None
+        scheduled = self.discover(process, sources=('a', 'b'))
+        self.assertEqual(10, scheduled.sources['a'].delay)
+        self.assertEqual(100, scheduled.sources['b'].delay)
+
+        self.start(scheduled, 'b').report(SYNC_CHANGED)
+        self.assertDelay(scheduled, 25, 'b')
+
+    def testTimeout(self):
+        scheduled = self.discover(Process())
+        job = self.start(scheduled)
+        source = scheduled.sources['a']
+        self.assertEqual(source.due + 160, max(entry[0] for entry in self.scheduler._queue if entry[3] is source))
+
+        self.assertIsNone(self.scheduler._due(source.due + 160, scheduled, source, source.generation))
+        self.scheduler._pool.shutdown(True)
+        self.assertEqual([(job.name, 1)], self.leases.released, 'The lease of the late job is not released')
+        self.assertFalse(source.running)
+        self.assertEqual(20, source.delay)
+        self.assertIsNone(source.job)
+
+        job.token = None
+        job.report(SYNC_CHANGED)
+        self.assertEqual(20, source.delay, 'The report of the late job is used')
+        self.assertEqual(0, self.scheduler._running)
+
+    def testLeased(self):
+        process = Process()
+        self.leases.others.add('test:b')
+        scheduled = self.discover(process, sources=('a', 'b', 'c'))
+        jobs = [self.start(scheduled, key, False) for key in ('a', 'b', 'c')]
+        self.scheduler._start(jobs, 1)
+        self.scheduler._pool.shutdown(True)
+
+        self.assertEqual(['a'], process.synced)
+        self.assertEqual([1, None, None], [job.token for job in jobs])
+        self.assertTrue(scheduled.sources['a'].running)
+        self.assertDelay(scheduled, 10, 'b')
+        self.assertDelay(scheduled, 10, 'c')
+        self.assertEqual(1, self.scheduler._running)
+
+    def testFailed(self):
+        scheduled = self.discover(Process(True))
+        job = self.start(scheduled, leased=False)
+        self.scheduler._start([job], 10)
+        self.scheduler._pool.shutdown(True)
+
+        self.assertDelay(scheduled, 20)
+        self.assertEqual([(job.name, 1)], self.leases.released)
+
+    def testRemoved(self):
+        scheduled = self.discover(Process(), sources=('a', 'b'))
+        job = self.start(scheduled)
+        self.scheduler._discovered(scheduled, {'b': 'B'})
+        self.assertEqual(['b'], list(scheduled.sources))
+        self.assertEqual(0, self.scheduler._running)
+
+        job.report(SYNC_CHANGED)
+        self.assertEqual(0, self.scheduler._running, 'The report of a removed source is used')
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()